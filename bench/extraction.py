@@ -0,0 +1,191 @@
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Extraction regression corpus: saved chapter pages (bench/corpus/NAME.html)
+# with the pages they really have (NAME.json), one per supported site. Runs
+# extract_image_urls on each and reports precision, recall, whether the
+# order is right, and how long it took, optionally next to the old
+# Archive/V1.py extractor.
+#
+#   python bench/extraction.py                 current extractor, exit 1 on a regression
+#   python bench/extraction.py --baseline      side by side with V1
+#   python bench/extraction.py --record URL NAME [--browser]
+#
+# NAME.json: {"url": chapter URL the page came from (site branches look at
+# the domain), "source": "recorded" or "synthetic", "notes": ...,
+# "expected": [ordered page URLs], "known_bad": "why" (optional, a known
+# miss that doesn't fail the run)}
+
+ROOT = Path(__file__).resolve().parent.parent
+CORPUS = Path(__file__).resolve().parent / "corpus"
+sys.path.insert(0, str(ROOT))
+
+
+def quiet_engine():
+    from engine import ComicEngine
+
+    class CorpusEngine(ComicEngine):
+        def log_message(self, msg: str, tag: str = "info"):
+            pass
+
+    return CorpusEngine()
+
+
+def v1_extractor():
+    """V1's extract_image_urls without its window, or None if it won't import."""
+    import importlib.util
+
+    from engine import Var
+
+    spec = importlib.util.spec_from_file_location(
+        "comic_v1", ROOT / "Archive" / "V1.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    except ImportError as e:
+        print(f"Baseline skipped, Archive/V1.py needs {e.name}", file=sys.stderr)
+        return None
+    v1 = module.UniversalComicDownloader.__new__(module.UniversalComicDownloader)
+    v1.exclude_gifs_var = Var(True)
+    v1.aggressive_comments_var = Var(True)
+    v1.log_message = lambda msg, tag="info": None
+    return v1.extract_image_urls
+
+
+def load_corpus(names=None) -> list:
+    snapshots = []
+    for meta_path in sorted(CORPUS.glob("*.json")):
+        if names and meta_path.stem not in names:
+            continue
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        meta["name"] = meta_path.stem
+        meta["html"] = meta_path.with_suffix(".html").read_text(encoding="utf-8")
+        snapshots.append(meta)
+    return snapshots
+
+
+def score(extract, snap: dict, repeat: int) -> dict:
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        got = extract(snap["html"], snap["url"])
+        times.append(time.perf_counter() - started)
+    expected = snap["expected"]
+    hits = len(set(got) & set(expected))
+    return {
+        "found": len(got),
+        "expected": len(expected),
+        "precision": hits / len(got) if got else 0.0,
+        "recall": hits / len(expected) if expected else 1.0,
+        "ordered": got == expected,
+        "ms": statistics.median(times) * 1000,
+        "extra": [u for u in got if u not in expected],
+        "missing": [u for u in expected if u not in got],
+    }
+
+
+def record(url: str, name: str, browser: bool) -> int:
+    from engine import PLAYWRIGHT_AVAILABLE
+
+    engine = quiet_engine()
+    html = engine.fetch_page(url, browser and PLAYWRIGHT_AVAILABLE)
+    urls = engine.extract_image_urls(html, url)
+    CORPUS.mkdir(parents=True, exist_ok=True)
+    (CORPUS / f"{name}.html").write_text(html, encoding="utf-8")
+    meta = {
+        "url": url,
+        "source": "recorded",
+        "notes": f"Recorded {time.strftime('%Y-%m-%d')}"
+        + (" in browser mode" if browser else ""),
+        "expected": urls,
+    }
+    (CORPUS / f"{name}.json").write_text(
+        json.dumps(meta, indent=2) + "\n", encoding="utf-8"
+    )
+    print(f"Saved {name}: {len(urls)} images. Check 'expected' in {name}.json by hand,")
+    print("it's only what the extractor found today.")
+    return 0
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="Extraction accuracy and speed corpus.")
+    p.add_argument("names", nargs="*", help="snapshots to run (default: all)")
+    p.add_argument("--baseline", action="store_true", help="compare with Archive/V1.py")
+    p.add_argument("--repeat", type=int, default=5, help="timed runs each (median)")
+    p.add_argument("--json", metavar="FILE", help="write every number here")
+    p.add_argument("-v", "--verbose", action="store_true", help="list wrong URLs")
+    p.add_argument(
+        "--record", nargs=2, metavar=("URL", "NAME"), help="save a new snapshot"
+    )
+    p.add_argument("--browser", action="store_true", help="record in browser mode")
+    args = p.parse_args(argv)
+
+    if args.record:
+        return record(*args.record, args.browser)
+
+    snapshots = load_corpus(set(args.names))
+    if not snapshots:
+        p.error("no snapshots found")
+    extractors = {"current": quiet_engine().extract_image_urls}
+    if args.baseline:
+        v1 = v1_extractor()
+        if v1 is not None:
+            extractors["v1"] = v1
+
+    rows = []
+    for snap in snapshots:
+        for label, extract in extractors.items():
+            try:
+                result = score(extract, snap, max(1, args.repeat))
+            except Exception as e:
+                result = {"error": f"{type(e).__name__}: {e}"}
+            rows.append({"snapshot": snap["name"], "extractor": label, **result})
+
+    print(
+        f"{'snapshot':<14}{'extractor':<10}{'found':>7}{'prec':>7}{'recall':>8}"
+        f"{'order':>7}{'ms':>8}"
+    )
+    regressions = []
+    known = {s["name"]: s.get("known_bad") for s in snapshots}
+    for row in rows:
+        if "error" in row:
+            print(f"{row['snapshot']:<14}{row['extractor']:<10}  {row['error']}")
+        else:
+            print(
+                f"{row['snapshot']:<14}{row['extractor']:<10}"
+                f"{row['found']:>3}/{row['expected']:<3}{row['precision']:>7.2f}"
+                f"{row['recall']:>8.2f}{'ok' if row['ordered'] else 'WRONG':>7}"
+                f"{row['ms']:>8.1f}"
+            )
+            if args.verbose:
+                for u in row["extra"]:
+                    print(f"    + {u}")
+                for u in row["missing"]:
+                    print(f"    - {u}")
+        if row["extractor"] != "current":
+            continue
+        good = row.get("ordered", False)
+        if not good and not known[row["snapshot"]]:
+            regressions.append(row["snapshot"])
+        elif good and known[row["snapshot"]]:
+            print(f"    {row['snapshot']} passes now, drop its known_bad note")
+
+    for name, why in known.items():
+        if why:
+            print(f"known bad: {name}: {why}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"generated": time.time(), "results": rows}, f, indent=2)
+    if regressions:
+        print(f"\nREGRESSED: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+import html
+import io
+import os
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse
+
+# Fake comic sites on localhost, one per layout the extractor has to deal
+# with. Chapter pages are generated on the fly; images are real JPEGs when
+# Pillow is around (so conversions and exports do real work) and JPEG
+# headers padded with noise when it isn't.
+#
+#   /madara/manga/bench-comic/chapter-1/   Madara reader, lazy data-src imgs
+#   /lazy/chapter-1.html                   placeholder src, real URL in data-src
+#   /virtual/chapter-1                     comix.to style [data-page] reader,
+#                                          JS only renders pages near the viewport
+#   /sequential/chapter-1                  3 numbered images, the rest implied
+#   /hotlink/chapter-1                     images 403 without the page's cookie
+#   /throttled/chapter-1                   slow first byte, capped bandwidth
+#   /recorded/<file>                       saved pages from --recorded DIR
+
+SCENARIOS = {
+    "madara": "/madara/manga/bench-comic/chapter-1/",
+    "lazy": "/lazy/chapter-1.html",
+    "virtual": "/virtual/chapter-1",
+    "sequential": "/sequential/chapter-1",
+    "hotlink": "/hotlink/chapter-1",
+    "throttled": "/throttled/chapter-1",
+}
+
+_PLACEHOLDER = (
+    "data:image/gif;base64,R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7"
+)
+_COOKIE = "bench_pass=1"
+
+
+def make_image(index: int, width: int, height: int) -> bytes:
+    try:
+        from PIL import Image
+    except ImportError:
+        # SOI + SOF0 with the dimensions (all the size checks look at) + noise
+        sof = struct.pack(">BBHBHHB", 0xFF, 0xC0, 11, 8, height, width, 1)
+        body = os.urandom(width * height // 8)
+        return b"\xff\xd8" + sof + b"\x01\x11\x00" + body + b"\xff\xd9"
+    noise = Image.effect_noise((width, height), 40 + index % 20).convert("RGB")
+    out = io.BytesIO()
+    noise.save(out, "JPEG", quality=85)
+    return out.getvalue()
+
+
+def _page(title: str, body: str, head: str = "") -> str:
+    return (
+        "<!DOCTYPE html><html><head>"
+        f"<title>{html.escape(title)}</title>"
+        f'<meta property="og:title" content="{html.escape(title)}">'
+        f"{head}</head><body>{body}</body></html>"
+    )
+
+
+class FixtureSite:
+    """
+    The fake sites behind a ThreadingHTTPServer on 127.0.0.1. latency is
+    added before every image's first byte on /throttled/, bandwidth caps
+    each of its responses (bytes per second).
+    """
+
+    def __init__(
+        self,
+        pages: int = 20,
+        size=(800, 1200),
+        latency: float = 0.15,
+        bandwidth: int = 512 * 1024,
+        recorded=None,
+    ):
+        self.pages = pages
+        self.size = size
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.recorded = Path(recorded) if recorded else None
+        self.requests = 0
+        self._images = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def base(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def scenarios(self) -> dict:
+        urls = {name: self.base + path for name, path in SCENARIOS.items()}
+        if self.recorded:
+            for f in sorted(self.recorded.glob("*.htm*")):
+                urls[f"recorded:{f.stem}"] = f"{self.base}/recorded/{f.name}"
+        return urls
+
+    def start(self, port: int = 0):
+        # Made up front so the first scenario doesn't pay for encoding them
+        for index in range(1, self.pages + 1):
+            self.image(index)
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def handle(self):
+                try:
+                    super().handle()
+                except (BrokenPipeError, ConnectionResetError):
+                    # Client hung up early (skipped as junk from the header)
+                    pass
+
+            def do_GET(self):
+                with site._lock:
+                    site.requests += 1
+                site.handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def image(self, index: int) -> bytes:
+        with self._lock:
+            data = self._images.get(index)
+        if data is None:
+            data = make_image(index, *self.size)
+            with self._lock:
+                self._images[index] = data
+        return data
+
+    def handle(self, req):
+        path = urlparse(req.path).path
+        style = path.strip("/").split("/")[0]
+        if path.startswith("/img/"):
+            return self._image(req, path)
+        if style == "recorded" and self.recorded:
+            target = (self.recorded / path[len("/recorded/") :]).resolve()
+            if self.recorded.resolve() in target.parents and target.is_file():
+                kind = "text/html" if target.suffix.startswith(".htm") else None
+                return self._send(req, target.read_bytes(), kind)
+        builder = getattr(self, f"_{style}", None)
+        if builder is None or path != SCENARIOS.get(style):
+            return self._send(req, b"not found", "text/plain", status=404)
+        headers = {"Set-Cookie": f"{_COOKIE}; Path=/"} if style == "hotlink" else {}
+        self._send(req, builder().encode("utf-8"), "text/html", headers=headers)
+
+    def _urls(self, style: str) -> list:
+        return [f"/img/{style}/{i:03d}.jpg" for i in range(1, self.pages + 1)]
+
+    def _madara(self) -> str:
+        imgs = "".join(
+            f'<div class="page-break"><img id="image-{i}" src="{_PLACEHOLDER}"'
+            f' data-src="{url}" class="wp-manga-chapter-img"></div>'
+            for i, url in enumerate(self._urls("madara"))
+        )
+        body = (
+            '<div class="c-breadcrumb"><a href="/madara/manga/bench-comic/">Bench Comic</a></div>'
+            f'<div class="reading-content">{imgs}</div>'
+        )
+        return _page("Bench Comic - Chapter 1", body)
+
+    def _lazy(self) -> str:
+        imgs = "".join(
+            f'<p><img class="lazyload" src="/static/blank.gif" data-src="{url}"></p>'
+            for url in self._urls("lazy")
+        )
+        return _page(
+            "Bench Comic - Chapter 1", f'<div class="chapter-content">{imgs}</div>'
+        )
+
+    def _virtual(self) -> str:
+        # Server renders the first 3 pages, the reader script adds pages as
+        # they come near the viewport and drops them once far away again
+        urls = self._urls("virtual")
+        height = self.size[1]
+        pages = "".join(
+            f'<div class="rpage-page" data-page="{i}" style="height:{height}px">'
+            + (f'<img class="rpage-page__img" src="{url}">' if i <= 3 else "")
+            + "</div>"
+            for i, url in enumerate(urls, 1)
+        )
+        script = """
+<script>
+const main = document.querySelector('.rpage-main');
+function render() {
+  const view = main.getBoundingClientRect();
+  main.querySelectorAll('.rpage-page').forEach(page => {
+    const r = page.getBoundingClientRect();
+    const near = r.bottom > view.top - 1500 && r.top < view.bottom + 1500;
+    const img = page.querySelector('img');
+    if (near && !img) {
+      const n = String(page.dataset.page).padStart(3, '0');
+      page.innerHTML = '<img class="rpage-page__img" src="/img/virtual/' + n + '.jpg">';
+    } else if (!near && img) {
+      page.innerHTML = '';
+    }
+  });
+}
+main.addEventListener('scroll', render);
+render();
+</script>"""
+        body = (
+            '<div class="rpage-main" style="height:100vh;overflow-y:auto">'
+            f"{pages}</div>{script}"
+        )
+        return _page("Bench Comic - Chapter 1", body)
+
+    def _sequential(self) -> str:
+        urls = self._urls("sequential")
+        pages = "".join(
+            f'<div class="page" data-page="{i}">'
+            + (f'<img src="{url}">' if i <= 3 else "")
+            + "</div>"
+            for i, url in enumerate(urls, 1)
+        )
+        return _page(
+            "Bench Comic - Chapter 1", f'<div class="viewer-wrapper">{pages}</div>'
+        )
+
+    def _hotlink(self) -> str:
+        imgs = "".join(f'<img src="{url}">' for url in self._urls("hotlink"))
+        return _page(
+            "Bench Comic - Chapter 1", f'<div class="reading-content">{imgs}</div>'
+        )
+
+    def _throttled(self) -> str:
+        imgs = "".join(f'<img src="{url}">' for url in self._urls("throttled"))
+        return _page(
+            "Bench Comic - Chapter 1", f'<div class="reading-content">{imgs}</div>'
+        )
+
+    def _image(self, req, path: str):
+        parts = path.split("/")
+        try:
+            style, index = parts[2], int(parts[3].split(".")[0])
+        except (IndexError, ValueError):
+            return self._send(req, b"not found", "text/plain", status=404)
+        if not 1 <= index <= self.pages:
+            return self._send(req, b"not found", "text/plain", status=404)
+        if style == "hotlink" and _COOKIE not in (req.headers.get("Cookie") or ""):
+            return self._send(req, b"hotlinking not allowed", "text/plain", status=403)
+        data = self.image(index)
+        if style == "throttled":
+            time.sleep(self.latency)
+            return self._send(req, data, "image/jpeg", rate=self.bandwidth)
+        self._send(req, data, "image/jpeg")
+
+    def _send(self, req, body: bytes, kind, status=200, headers=None, rate=0):
+        try:
+            req.send_response(status)
+            if kind:
+                req.send_header("Content-Type", kind)
+            req.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                req.send_header(name, value)
+            req.end_headers()
+            if not rate:
+                req.wfile.write(body)
+                return
+            chunk = max(1024, rate // 20)
+            for i in range(0, len(body), chunk):
+                req.wfile.write(body[i : i + chunk])
+                time.sleep(chunk / rate)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
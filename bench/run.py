@@ -0,0 +1,222 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Offline benchmark: downloads every fixture chapter (see fixtures.py) with
+# the real engine, headless, and reports pages/s, MB/s, peak RSS and the
+# per-stage times from the engine's metrics. Nothing leaves localhost.
+#
+#   python bench/run.py                           every scenario, plain HTTP
+#   python bench/run.py --browser                 + Playwright against localhost
+#   python bench/run.py -s madara,throttled --pages 60 --repeat 3 --json out.json
+#
+# Every chapter runs in its own child process so peak RSS is that chapter's
+# alone and no cache carries over between runs.
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fixtures import FixtureSite  # noqa: E402
+
+# Stages shown in the table (all of them end up in --json)
+COLUMNS = ("page_fetch", "extract", "browser_pass", "image", "convert", "export")
+
+
+def peak_rss_mb() -> float:
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def run_child(url: str, browser: bool, exports: bool, verbose: bool) -> dict:
+    from engine import PLAYWRIGHT_AVAILABLE, ComicEngine
+
+    class BenchEngine(ComicEngine):
+        def log_message(self, msg: str, tag: str = "info"):
+            if verbose:
+                print(f"  {msg}", file=sys.stderr)
+
+    engine = BenchEngine()
+    engine.use_browser_var.set(browser and PLAYWRIGHT_AVAILABLE)
+    engine.skip_downloaded_var.set(False)
+    engine.dedup_var.set(False)
+    engine.disk_cache_var.set(False)
+    engine.generate_cbz_var.set(exports)
+    engine.generate_pdf_var.set(exports)
+    engine.running = True
+    engine._download_start = time.time()
+    with tempfile.TemporaryDirectory(prefix="comic-bench-") as out:
+        started = time.perf_counter()
+        result = engine.download_task(url, out)
+        wall = time.perf_counter() - started
+    if engine.converter is not None:
+        engine.converter.shutdown()
+    report = result.get("metrics") or {}
+    return {
+        "status": result["status"],
+        "found": result["found"],
+        "saved": result["saved"],
+        "wall_s": wall,
+        "pages_per_s": result["saved"] / wall if wall else 0,
+        "mb_per_s": report.get("bytes_total", 0) / 1024 / 1024 / wall if wall else 0,
+        "bytes": report.get("bytes_total", 0),
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": report.get("stages", {}),
+    }
+
+
+def stage_seconds(stages: dict, name: str) -> float:
+    # "image" is the per-image total, image.request/.transfer are inside it
+    if name == "image":
+        return (stages.get("image") or {}).get("total_s", 0)
+    return sum(
+        v["total_s"] for k, v in stages.items() if k == name or k.startswith(name + ".")
+    )
+
+
+def run_one(url: str, args, browser: bool) -> dict:
+    cmd = [sys.executable, __file__, "--child", url]
+    if browser:
+        cmd.append("--browser")
+    if args.exports:
+        cmd.append("--exports")
+    if args.verbose:
+        cmd.append("--verbose")
+    done = subprocess.run(cmd, stdout=subprocess.PIPE, text=True, timeout=args.timeout)
+    lines = done.stdout.strip().splitlines()
+    if done.returncode or not lines:
+        return {"status": f"crashed ({done.returncode})"}
+    return json.loads(lines[-1])
+
+
+def summarize(runs: list) -> dict:
+    """Median of every number over the repeats (the first run's status)."""
+    ok = [r for r in runs if "wall_s" in r]
+    if not ok:
+        return runs[0]
+    out = {"status": ok[0]["status"], "found": ok[0]["found"], "saved": ok[0]["saved"]}
+    for key in ("wall_s", "pages_per_s", "mb_per_s", "bytes", "peak_rss_mb"):
+        out[key] = statistics.median(r[key] for r in ok)
+    out["stages"] = {
+        name: statistics.median(stage_seconds(r["stages"], name) for r in ok)
+        for name in COLUMNS
+    }
+    out["image_p95_ms"] = statistics.median(
+        (r["stages"].get("image") or {}).get("p95_ms") or 0 for r in ok
+    )
+    out["runs"] = runs
+    return out
+
+
+def print_table(rows: list):
+    head = f"{'scenario':<22}{'mode':<8}{'pages':>7}{'wall':>8}{'pg/s':>7}{'MB/s':>7}{'RSS':>7}"
+    head += "".join(f"{c[:9]:>10}" for c in COLUMNS) + f"{'img p95':>9}  status"
+    print(head)
+    print("-" * len(head))
+    for row in rows:
+        r = row["result"]
+        if "wall_s" not in r:
+            print(f"{row['scenario']:<22}{row['mode']:<8}  {r['status']}")
+            continue
+        line = (
+            f"{row['scenario']:<22}{row['mode']:<8}"
+            f"{r['saved']:>3}/{r['found']:<3}{r['wall_s']:>7.2f}s"
+            f"{r['pages_per_s']:>7.1f}{r['mb_per_s']:>7.1f}{r['peak_rss_mb']:>6.0f}M"
+        )
+        line += "".join(f"{r['stages'][c]:>9.2f}s" for c in COLUMNS)
+        line += f"{r['image_p95_ms']:>7g}ms  {r['status']}"
+        print(line)
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(
+        description="Benchmark the downloader against local fixture sites."
+    )
+    p.add_argument("-s", "--scenarios", help="comma separated (default: all)")
+    p.add_argument("--browser", action="store_true", help="also run in browser mode")
+    p.add_argument("--pages", type=int, default=20, help="pages per chapter")
+    p.add_argument("--size", default="800x1200", help="image size, WxH")
+    p.add_argument("--latency", type=float, default=0.15, help="throttled TTFB (s)")
+    p.add_argument(
+        "--bandwidth", type=int, default=512, help="throttled KB/s per response"
+    )
+    p.add_argument("--recorded", metavar="DIR", help="saved chapter pages to add")
+    p.add_argument("--repeat", type=int, default=1, help="runs per scenario (median)")
+    p.add_argument("--exports", action="store_true", help="build CBZ + PDF too")
+    p.add_argument("--json", metavar="FILE", help="write every number here")
+    p.add_argument("--timeout", type=float, default=600, help="per run (s)")
+    p.add_argument("-v", "--verbose", action="store_true", help="engine log on stderr")
+    p.add_argument("--child", metavar="URL", help=argparse.SUPPRESS)
+    args = p.parse_args(argv)
+
+    if args.child:
+        print(
+            json.dumps(run_child(args.child, args.browser, args.exports, args.verbose))
+        )
+        return 0
+
+    from engine import PLAYWRIGHT_AVAILABLE
+
+    width, height = (int(n) for n in args.size.lower().split("x"))
+    site = FixtureSite(
+        pages=args.pages,
+        size=(width, height),
+        latency=args.latency,
+        bandwidth=args.bandwidth * 1024,
+        recorded=args.recorded,
+    ).start()
+    scenarios = site.scenarios()
+    if args.scenarios:
+        wanted = args.scenarios.split(",")
+        unknown = [s for s in wanted if s not in scenarios]
+        if unknown:
+            p.error(f"unknown scenario(s): {', '.join(unknown)}")
+        scenarios = {s: scenarios[s] for s in wanted}
+    modes = ["http"]
+    if args.browser:
+        if PLAYWRIGHT_AVAILABLE:
+            modes.append("browser")
+        else:
+            print("Playwright isn't installed, browser mode skipped", file=sys.stderr)
+
+    rows = []
+    try:
+        for name, url in scenarios.items():
+            for mode in modes:
+                runs = [
+                    run_one(url, args, mode == "browser") for _ in range(args.repeat)
+                ]
+                rows.append({"scenario": name, "mode": mode, "result": summarize(runs)})
+    finally:
+        site.stop()
+
+    print_table(rows)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "generated": time.time(),
+                    "python": sys.version.split()[0],
+                    "settings": {
+                        k: v
+                        for k, v in vars(args).items()
+                        if k not in ("child", "json", "verbose")
+                    },
+                    "results": rows,
+                },
+                f,
+                indent=2,
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
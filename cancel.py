@@ -0,0 +1,170 @@
+import queue
+import socket
+import threading
+from contextlib import contextmanager
+
+# Cancellation that reaches into whatever is blocking right now. ComicEngine
+# holds one CancelToken per run; cancel() wakes its sleeps, shuts the socket
+# of a response being read, and abandons a request still waiting for its
+# headers (requests has no way to close that socket from outside, the late
+# response is closed when it shows up). Playwright can only be driven from
+# its own thread, so browser code waits in short slices and checks in.
+
+
+class _Helpers:
+    """
+    Daemon threads for CancelToken.call, kept around between calls instead
+    of one new thread per request. Another is started only when all of them
+    are busy (an abandoned request holds one until its own timeout).
+    """
+
+    MAX_IDLE = 8
+
+    def __init__(self):
+        self._jobs = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._idle = 0
+
+    def submit(self, job):
+        with self._lock:
+            spawn = self._idle == 0
+            if not spawn:
+                self._idle -= 1
+        self._jobs.put(job)
+        if spawn:
+            threading.Thread(target=self._work, daemon=True).start()
+
+    def _work(self):
+        while True:
+            self._jobs.get()()
+            with self._lock:
+                if self._idle >= self.MAX_IDLE:
+                    return
+                self._idle += 1
+
+
+_helpers = _Helpers()
+
+
+class Cancelled(BaseException):
+    """
+    Raised where a cancelled run was waiting. A BaseException (like
+    asyncio.CancelledError) so the many `except Exception` retry and
+    fallback paths let it through instead of retrying.
+    """
+
+
+class CancelToken:
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = {}
+        self._next_id = 0
+
+    def cancel(self):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks = list(self._callbacks.values())
+            self._callbacks.clear()
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise Cancelled()
+
+    def sleep(self, seconds: float):
+        """time.sleep that raises Cancelled as soon as the token is cancelled."""
+        if self._event.wait(seconds):
+            raise Cancelled()
+
+    @contextmanager
+    def on_cancel(self, callback):
+        """
+        Runs callback (from the cancelling thread) if the token is cancelled
+        inside the block. Whatever error the interrupted I/O raises after
+        that comes out as Cancelled.
+        """
+        with self._lock:
+            key = self._next_id
+            self._next_id += 1
+            if not self._event.is_set():
+                self._callbacks[key] = callback
+        if self._event.is_set():
+            raise Cancelled()
+        try:
+            yield
+        except Exception:
+            if self._event.is_set():
+                raise Cancelled() from None
+            raise
+        finally:
+            with self._lock:
+                self._callbacks.pop(key, None)
+
+    def call(self, fn, *args, cleanup=None, **kwargs):
+        """
+        fn(*args, **kwargs) on a helper thread (see _Helpers). Returns its
+        result, or raises Cancelled the moment the token is cancelled; fn
+        then finishes on its own and cleanup(result) gets whatever it returns.
+        """
+        self.raise_if_cancelled()
+        done = threading.Event()
+        box = {}
+        lock = threading.Lock()
+
+        def run():
+            if box.get("abandoned"):
+                # Cancelled before a helper got to it
+                return
+            try:
+                value = fn(*args, **kwargs)
+            except BaseException as e:
+                box["error"] = e
+                done.set()
+                return
+            with lock:
+                if box.get("abandoned"):
+                    if cleanup is not None:
+                        try:
+                            cleanup(value)
+                        except Exception:
+                            pass
+                    return
+                box["value"] = value
+            done.set()
+
+        # Registered before fn starts, a cancel in between would otherwise
+        # leave nobody to clean up after it
+        with self.on_cancel(done.set):
+            _helpers.submit(run)
+            done.wait()
+        with lock:
+            if "value" not in box and "error" not in box:
+                box["abandoned"] = True
+                raise Cancelled()
+        if "error" in box:
+            raise box["error"]
+        return box["value"]
+
+
+def abort_response(response):
+    """Shuts a streamed requests response's socket, waking a blocked read."""
+    try:
+        sock = response.raw._fp.fp.raw._sock
+        sock.shutdown(socket.SHUT_RDWR)
+    except (AttributeError, OSError):
+        pass
+    try:
+        response.close()
+    except Exception:
+        pass
@@ -0,0 +1,573 @@
+import argparse
+import json
+import signal
+import sys
+import threading
+import time
+from pathlib import Path
+
+from cancel import Cancelled
+from engine import PIL_AVAILABLE, PLAYWRIGHT_AVAILABLE, ComicEngine
+from jobs import JOBS_DB, JobQueue, JobRunner, parse_urls
+from metrics import REGISTRY, serve
+from profiles import ORIGINAL, PROFILES
+from profiling import PER_THREAD, Profiler
+from series import parse_range
+from watch import WATCH_DB, Watcher, WatchList
+
+# Headless entry point: same engine as the desktop app, no tkinter anywhere.
+#
+#   python cli.py URL [URL ...] -o ~/Comics --pdf --json
+#   python cli.py -i weekend.txt --jobs 3 --connections 8
+#   python cli.py --enqueue URL ...   then later   python cli.py --run-queue
+#   python cli.py --series SERIES_URL --chapters 1-50 --jobs 3
+#   python cli.py --subscribe SERIES_URL ...   then from cron   python cli.py --watch
+#   python cli.py --watch-loop --metrics-port 9464 --report run.json
+#   python cli.py URL --cprofile ~/profiles --tracemalloc
+#
+# Exit codes
+EXIT_OK = 0  # every chapter downloaded completely
+EXIT_FAILED = 1  # at least one chapter failed outright (or had no images)
+EXIT_USAGE = 2  # bad arguments (argparse's own code)
+EXIT_PARTIAL = 3  # everything ran, but some pages failed
+EXIT_CANCELLED = 130  # Ctrl+C
+
+# Parallel chapters log from several threads, one line at a time
+_print_lock = threading.Lock()
+
+
+class CliEngine(ComicEngine):
+    def __init__(self, json_output: bool = False, quiet: bool = False, job_id=None):
+        super().__init__()
+        self.json_output = json_output
+        self.quiet = quiet
+        # Set when chapters run side by side, so their lines can be told apart
+        self.job_id = job_id
+
+    def log_message(self, msg: str, tag: str = "info"):
+        if self.json_output:
+            event = {"event": "log", "level": tag, "message": msg}
+            if self.job_id is not None:
+                event["job"] = self.job_id
+            self.emit(event)
+        elif not self.quiet or tag in ("warn", "error"):
+            stream = sys.stderr if tag in ("warn", "error") else sys.stdout
+            job = f"#{self.job_id} " if self.job_id is not None else ""
+            line = f"[{time.strftime('%H:%M:%S')}] {job}{msg}"
+            with _print_lock:
+                print(line, file=stream, flush=True)
+
+    def emit(self, event: dict):
+        # One JSON object per line on stdout, so other tools can follow along
+        line = json.dumps(event, ensure_ascii=False)
+        with _print_lock:
+            print(line, flush=True)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="comic-downloader",
+        description="Download comic chapters without the GUI.",
+    )
+    p.add_argument("urls", nargs="*", metavar="URL", help="chapter URL(s)")
+    p.add_argument(
+        "-i",
+        "--input",
+        metavar="FILE",
+        help="read chapter URLs from a file, one per line ('-' for stdin)",
+    )
+    p.add_argument(
+        "-o",
+        "--output",
+        default=None,
+        help="base folder (default: ~/Downloads/Comics)",
+    )
+
+    g = p.add_argument_group("fetching")
+    g.add_argument(
+        "--browser",
+        action=argparse.BooleanOptionalAction,
+        default=PLAYWRIGHT_AVAILABLE,
+        help="render pages with Playwright (default: on when installed)",
+    )
+    g.add_argument(
+        "--disk-cache", action="store_true", help="keep rendered pages across runs"
+    )
+
+    g = p.add_argument_group("filters")
+    g.add_argument("--keep-gifs", action="store_true", help="don't skip GIFs")
+    g.add_argument(
+        "--keep-small", action="store_true", help="don't skip icon-sized images"
+    )
+    g.add_argument(
+        "--no-filter",
+        action="store_true",
+        help="don't filter out comment avatars and social junk",
+    )
+    g.add_argument(
+        "--redownload",
+        action="store_true",
+        help="download chapters again even if the history has them",
+    )
+    g.add_argument(
+        "--dedup",
+        action="store_true",
+        help="skip pages repeated across a series' chapters",
+    )
+
+    g = p.add_argument_group("exports")
+    g.add_argument(
+        "--cbz", action=argparse.BooleanOptionalAction, default=True, help="CBZ"
+    )
+    g.add_argument(
+        "--cbz-only", action="store_true", help="CBZ with no loose image files"
+    )
+    g.add_argument("--pdf", action="store_true", help="PDF (needs Pillow)")
+    g.add_argument("--epub", action="store_true", help="fixed-layout EPUB")
+    g.add_argument(
+        "--webp-to-jpg", action="store_true", help="save WEBP/PNG pages as JPG"
+    )
+    g.add_argument(
+        "--profile",
+        choices=[ORIGINAL] + list(PROFILES),
+        default=ORIGINAL,
+        metavar="NAME",
+        help=f"resize exports for a device: {', '.join(PROFILES)}",
+    )
+    g.add_argument(
+        "--stitch", action="store_true", help="re-cut webtoon strips into pages"
+    )
+
+    g = p.add_argument_group("series")
+    g.add_argument(
+        "--series",
+        action="store_true",
+        help="the URLs are title/series pages: download their chapters",
+    )
+    g.add_argument(
+        "--chapters",
+        metavar="RANGE",
+        help="with --series, only these chapters: 1-50, 120-, 5,7,9-12",
+    )
+
+    g = p.add_argument_group("watch")
+    g.add_argument(
+        "--subscribe",
+        action="store_true",
+        help="watch the URLs (series pages) for new chapters",
+    )
+    g.add_argument("--unsubscribe", action="store_true", help="stop watching the URLs")
+    g.add_argument(
+        "--subscriptions", action="store_true", help="show watched series and exit"
+    )
+    g.add_argument(
+        "--watch",
+        action="store_true",
+        help="check watched series that are due and download their new chapters",
+    )
+    g.add_argument(
+        "--watch-loop",
+        action="store_true",
+        help="like --watch, but keep running and check again whenever a series is due",
+    )
+    g.add_argument(
+        "--every",
+        type=float,
+        default=6,
+        metavar="HOURS",
+        help="with --subscribe, how often to check (default: 6)",
+    )
+    g.add_argument(
+        "--jitter",
+        type=float,
+        default=30,
+        metavar="SECONDS",
+        help="random delay before each host is polled (default: 30)",
+    )
+    g.add_argument(
+        "--watch-db",
+        default=str(WATCH_DB),
+        metavar="PATH",
+        help="where subscriptions live (default: %(default)s)",
+    )
+
+    g = p.add_argument_group("queue")
+    g.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="chapters to download at the same time (default: 1)",
+    )
+    g.add_argument(
+        "--connections",
+        type=int,
+        default=8,
+        metavar="N",
+        help="open requests allowed across all chapters (default: 8)",
+    )
+    g.add_argument(
+        "--enqueue",
+        action="store_true",
+        help="add the URLs to the saved queue and exit",
+    )
+    g.add_argument(
+        "--run-queue",
+        action="store_true",
+        help="also download everything waiting in the saved queue",
+    )
+    g.add_argument(
+        "--retry",
+        action="store_true",
+        help="put failed, partial and cancelled jobs back in the saved queue",
+    )
+    g.add_argument("--list", action="store_true", help="show the saved queue and exit")
+    g.add_argument(
+        "--queue-db",
+        default=str(JOBS_DB),
+        metavar="PATH",
+        help="where the saved queue lives (default: %(default)s)",
+    )
+
+    g = p.add_argument_group("profiling")
+    g.add_argument(
+        "--cprofile",
+        metavar="DIR",
+        help="profile page fetch, extraction, the image loop and exports;"
+        " writes .prof files and summary.txt to a new folder in DIR",
+    )
+    g.add_argument(
+        "--tracemalloc",
+        action="store_true",
+        help="with --cprofile: also record what each of those allocates (slow)",
+    )
+    g.add_argument(
+        "--profile-top",
+        type=int,
+        default=25,
+        metavar="N",
+        help="functions listed per section in summary.txt (default: 25)",
+    )
+
+    g = p.add_argument_group("output")
+    g.add_argument(
+        "--json",
+        action="store_true",
+        help="JSON lines on stdout: log events and one result per chapter",
+    )
+    g.add_argument(
+        "-q", "--quiet", action="store_true", help="only warnings and errors"
+    )
+    g.add_argument(
+        "--report",
+        metavar="FILE",
+        help="write per-chapter timings, throughput and cache hit rates as JSON",
+    )
+    g.add_argument(
+        "--metrics-port",
+        type=int,
+        metavar="PORT",
+        help="serve live totals on http://127.0.0.1:PORT/metrics (and /metrics.json)",
+    )
+    return p
+
+
+def configure(engine: ComicEngine, args):
+    if args.output:
+        engine.output_var.set(args.output)
+    engine.use_browser_var.set(args.browser and PLAYWRIGHT_AVAILABLE)
+    engine.disk_cache_var.set(args.disk_cache)
+    engine.exclude_gifs_var.set(not args.keep_gifs)
+    engine.skip_tiny_var.set(not args.keep_small)
+    engine.aggressive_comments_var.set(not args.no_filter)
+    engine.dedup_var.set(args.dedup)
+    engine.skip_downloaded_var.set(not args.redownload)
+    engine.generate_cbz_var.set(args.cbz)
+    engine.archive_only_var.set(args.cbz_only)
+    engine.generate_pdf_var.set(args.pdf)
+    engine.generate_epub_var.set(args.epub)
+    engine.convert_webp_var.set(args.webp_to_jpg)
+    engine.profile_var.set(args.profile)
+    engine.stitch_var.set(args.stitch)
+
+
+def exit_code(results: list, cancelled: bool) -> int:
+    if cancelled:
+        return EXIT_CANCELLED
+    statuses = {r["status"] for r in results}
+    if statuses & {"failed", "empty"}:
+        return EXIT_FAILED
+    if "partial" in statuses:
+        return EXIT_PARTIAL
+    return EXIT_OK
+
+
+def read_urls(args) -> list:
+    urls = list(args.urls)
+    if args.input:
+        if args.input == "-":
+            text = sys.stdin.read()
+        else:
+            with open(args.input, encoding="utf-8") as f:
+                text = f.read()
+        urls += parse_urls(text)
+    return list(dict.fromkeys(urls))
+
+
+def expand_series(engine: CliEngine, urls: list, ranges: list) -> list:
+    chapters = []
+    for url in urls:
+        try:
+            found = engine.load_series(url, engine.use_browser_var.get(), ranges)
+        except Exception as e:
+            engine.log_message(f"✗ Couldn't read {url}: {str(e)[:150]}", "error")
+            continue
+        chapters += [c.url for c in found]
+    return list(dict.fromkeys(chapters))
+
+
+def print_jobs(engine: CliEngine, queue: JobQueue):
+    jobs = queue.jobs()
+    if engine.json_output:
+        for job in jobs:
+            engine.emit({"event": "job", **job})
+        return
+    for job in jobs:
+        error = f"  ({job['error']})" if job["error"] else ""
+        print(f"{job['id']:>5}  {job['state']:>9}  {job['url']}{error}")
+    if not jobs:
+        print("Queue is empty")
+
+
+def print_subscriptions(engine: CliEngine, watchlist: WatchList):
+    subs = watchlist.series()
+    if engine.json_output:
+        for sub in subs:
+            engine.emit({"event": "subscription", **sub})
+        return
+    for sub in subs:
+        due = (
+            time.strftime("%Y-%m-%d %H:%M", time.localtime(sub["next_check"]))
+            if sub["next_check"] > time.time()
+            else "now"
+        )
+        error = f"  ({sub['error']})" if sub["error"] else ""
+        print(f"{sub['chapters']:>5} ch  next check {due}  {sub['url']}{error}")
+    if not subs:
+        print("Not watching anything")
+
+
+def manage_subscriptions(engine: CliEngine, watchlist: WatchList, urls, args):
+    for url in urls:
+        if args.subscribe:
+            added = watchlist.add(
+                url, engine.output_var.get(), engine.settings(), args.every * 3600
+            )
+            engine.log_message(
+                f"✓ Watching {url}" if added else f"Already watching {url}",
+                "ok" if added else "info",
+            )
+        elif watchlist.remove(url):
+            engine.log_message(f"✓ Stopped watching {url}", "ok")
+        else:
+            engine.log_message(f"Wasn't watching {url}", "warn")
+    if args.subscriptions:
+        print_subscriptions(engine, watchlist)
+
+
+def poll(engine: CliEngine, watcher: Watcher):
+    engine.log_message("Checking watched series...", "info")
+    found = watcher.poll()
+    if engine.json_output:
+        for url, new in found.items():
+            engine.emit({"event": "watch", "series": url, "new": new})
+    total = sum(len(new) for new in found.values())
+    engine.log_message(
+        f"✓ Checked {len(found)} series, {total} new chapter(s)",
+        "ok" if total else "info",
+    )
+
+
+def write_report(path: str, results: list):
+    report = {
+        "generated": time.time(),
+        "chapters": [
+            {k: r.get(k) for k in ("job", "url", "status", "found", "saved", "metrics")}
+            for r in results
+        ],
+        "totals": REGISTRY.snapshot(),
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.pdf and not PIL_AVAILABLE:
+        parser.error("--pdf needs Pillow (pip install pillow)")
+    if args.jobs < 1 or args.connections < 1:
+        parser.error("--jobs and --connections need to be at least 1")
+    if args.tracemalloc and not args.cprofile:
+        parser.error("--tracemalloc only works together with --cprofile")
+    try:
+        urls = read_urls(args)
+    except OSError as e:
+        parser.error(f"can't read {args.input}: {e}")
+    try:
+        ranges = parse_range(args.chapters)
+    except ValueError as e:
+        parser.error(str(e))
+    if ranges and not args.series:
+        parser.error("--chapters only makes sense with --series")
+    if args.subscribe and args.unsubscribe:
+        parser.error("--subscribe or --unsubscribe, not both")
+    if (args.subscribe or args.unsubscribe) and not urls:
+        parser.error("--subscribe/--unsubscribe need series URLs")
+    polling = args.watch or args.watch_loop
+    saved = args.enqueue or args.run_queue or args.retry or args.list or polling
+    manage = args.subscribe or args.unsubscribe or args.subscriptions
+    if not urls and not saved and not manage:
+        parser.error("no URLs given (pass them as arguments or with --input)")
+
+    engine = CliEngine(json_output=args.json, quiet=args.quiet)
+    configure(engine, args)
+
+    server = None
+    if args.metrics_port is not None:
+        try:
+            server = serve(args.metrics_port)
+        except OSError as e:
+            parser.error(f"can't serve metrics on port {args.metrics_port}: {e}")
+        engine.log_message(
+            f"Metrics on http://127.0.0.1:{args.metrics_port}/metrics", "info"
+        )
+
+    watchlist = WatchList(args.watch_db) if manage or polling else None
+    if manage:
+        manage_subscriptions(engine, watchlist, urls, args)
+        if not polling:
+            return EXIT_OK
+        urls = []
+
+    runner = None
+
+    # First Ctrl+C cancels every running chapter and series check right away
+    # (pages already saved are kept) and starts nothing new, a second one
+    # kills the process. Installed this early so reading a series page can
+    # be cancelled too.
+    def interrupt(signum, frame):
+        engine.log_message("Cancelling - dropping whatever's in flight...", "warn")
+        engine.cancel()
+        if runner is not None:
+            runner.stop()
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+
+    signal.signal(signal.SIGINT, interrupt)
+
+    if args.series and urls:
+        try:
+            urls = expand_series(engine, urls, ranges)
+        except Cancelled:
+            engine.log_message("✗ Cancelled while reading the series", "warn")
+            return EXIT_CANCELLED
+        if not urls and not saved:
+            return EXIT_FAILED
+
+    # Plain URL runs go through a throwaway in-memory queue, the saved one is
+    # only touched when asked for
+    queue = JobQueue(args.queue_db if saved else ":memory:")
+    if args.retry:
+        engine.log_message(f"Requeued {queue.retry()} job(s)", "info")
+    if args.list:
+        print_jobs(engine, queue)
+        return EXIT_OK
+    added = queue.add(urls, engine.output_var.get(), engine.settings())
+    if urls and len(added) < len(urls):
+        engine.log_message(
+            f"{len(urls) - len(added)} URL(s) were already waiting in the queue",
+            "info",
+        )
+    watcher = None
+    if polling:
+        watcher = Watcher(watchlist, queue, engine, jitter=args.jitter)
+        poll(engine, watcher)
+    if args.enqueue:
+        engine.log_message(f"✓ Queued {len(added)} chapter(s)", "ok")
+        return EXIT_OK
+
+    profiler = None
+    if args.cprofile:
+        profiler = Profiler(
+            Path(args.cprofile) / time.strftime("%Y%m%d-%H%M%S"),
+            memory=args.tracemalloc,
+            top=args.profile_top,
+        )
+        if args.jobs > 1 and not PER_THREAD:
+            engine.log_message(
+                "Profiling with --jobs > 1 on Python 3.12+: chapters overlapping another one's profiled section aren't profiled",
+                "warn",
+            )
+
+    def make_engine(job):
+        job_id = job["id"] if args.jobs > 1 else None
+        job_engine = CliEngine(json_output=args.json, quiet=args.quiet, job_id=job_id)
+        job_engine.profiler = profiler
+        return job_engine
+
+    def report(job, result):
+        if args.json:
+            engine.emit({"event": "result", **result})
+
+    runner = JobRunner(
+        queue,
+        make_engine,
+        workers=args.jobs,
+        connections=args.connections,
+        on_update=report,
+    )
+    if engine.cancel_token.cancelled:
+        # Ctrl+C came before there was a runner to stop
+        runner.stop()
+
+    try:
+        results = runner.run()
+        while args.watch_loop and not runner.stopped:
+            # Sleep until the next series is due (at least a minute, so a
+            # broken clock can't turn this into a busy loop)
+            due = watchlist.next_due() or time.time() + 3600
+            if runner.wait_stopped(max(60, due - time.time())):
+                break
+            poll(engine, watcher)
+            results = runner.run()
+    except KeyboardInterrupt:
+        results = list(runner.results)
+    cancelled = runner.stopped
+
+    code = exit_code(results, cancelled)
+    if args.json:
+        engine.emit({"event": "summary", "exit_code": code, "results": results})
+    elif not args.quiet:
+        for r in results:
+            print(f"{r['status']:>9}  {r['saved']}/{r['found']}  {r['url']}")
+    if args.report:
+        try:
+            write_report(args.report, results)
+        except OSError as e:
+            engine.log_message(f"Couldn't write the report: {e}", "error")
+    if profiler is not None:
+        try:
+            summary = profiler.write()
+            engine.log_message(f"Profile written to {summary}", "info")
+        except OSError as e:
+            engine.log_message(f"Couldn't write the profile: {e}", "error")
+        profiler.close()
+    if server is not None:
+        server.shutdown()
+    queue.close()
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
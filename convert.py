@@ -0,0 +1,218 @@
+import hashlib
+import io
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+# Everything a worker process runs has to live at module level (and in a
+# module that doesn't pull in tkinter) so it can be pickled on spawn.
+
+
+def flatten(img, mode: str = "RGB"):
+    """Drops alpha onto a white background and converts to RGB (or L)."""
+    from PIL import Image
+
+    if img.mode in ("RGBA", "LA", "P"):
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        if img.mode == "P":
+            img = img.convert("RGBA")
+        background.paste(
+            img, mask=img.split()[-1] if img.mode in ("RGBA", "LA") else None
+        )
+        img = background
+    if img.mode != mode:
+        img = img.convert(mode)
+    return img
+
+
+def to_jpeg_bytes(data: bytes, quality: int = 95) -> bytes:
+    from PIL import Image
+
+    img = flatten(Image.open(io.BytesIO(data)))
+    out = io.BytesIO()
+    img.save(out, format="JPEG", quality=quality, optimize=True)
+    return out.getvalue()
+
+
+def convert_to_file(data: bytes, dest: str, quality: int = 95) -> int:
+    jpg = to_jpeg_bytes(data, quality)
+    tmp = dest + ".part"
+    with open(tmp, "wb") as f:
+        f.write(jpg)
+    os.replace(tmp, dest)
+    return len(jpg)
+
+
+class ConversionStage:
+    """
+    Runs CPU-heavy Pillow work in a process pool so the download loop never
+    waits on an encode. submit() blocks once max_pending jobs are in flight,
+    which keeps memory bounded when the network outruns the CPUs.
+    """
+
+    def __init__(self, workers: int = None, max_pending: int = None):
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.max_pending = max_pending or self.workers * 2
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._pending = set()
+        self._idle = threading.Condition()
+        self._executor = None
+        # metrics.Metrics of the chapter being converted, if anyone's asking
+        self.metrics = None
+
+    def _pool(self):
+        if self._executor is None:
+            try:
+                # Imported here: it drags in multiprocessing, which nothing
+                # needs until the first conversion
+                from concurrent.futures import ProcessPoolExecutor
+
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            except (OSError, NotImplementedError, ImportError):
+                # No working multiprocessing (frozen build, locked-down box):
+                # threads still overlap with downloads, Pillow drops the GIL
+                self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def submit(self, fn, *args, on_done=None):
+        self._slots.acquire()
+        started = time.perf_counter()
+        try:
+            future = self._pool().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        with self._idle:
+            self._pending.add(future)
+
+        def _release(f):
+            if self.metrics is not None:
+                self.metrics.observe("convert", time.perf_counter() - started)
+            try:
+                if on_done:
+                    on_done(f)
+            finally:
+                self._slots.release()
+                with self._idle:
+                    self._pending.discard(f)
+                    self._idle.notify_all()
+
+        future.add_done_callback(_release)
+        return future
+
+    def wait(self):
+        # Returns once every submitted job *and* its on_done callback is done
+        with self._idle:
+            self._idle.wait_for(lambda: not self._pending)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+class ConversionCache:
+    """
+    Content-addressed store of converted frames for one job. Keys are the
+    SHA-256 of the source bytes plus the target format/quality, so the same
+    page is decoded and encoded once no matter how many exports ask for it.
+    Converted files live in cache_dir, which should sit next to the output
+    so they can be hardlinked into place.
+    """
+
+    def __init__(self, stage: ConversionStage, cache_dir, quality: int = 95):
+        self.stage = stage
+        self.cache_dir = Path(cache_dir)
+        self.quality = quality
+        self.fmt = "jpeg"
+        self._futures = {}
+        self._by_path = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def key_for(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        return f"{digest}-{self.fmt}-q{self.quality}"
+
+    def submit(self, data: bytes, source_path=None, on_done=None) -> str:
+        """
+        Starts (or joins) the conversion of data. on_done(future, dest) runs
+        once the converted file exists; for a fresh conversion it runs before
+        ConversionStage.wait() returns.
+        """
+        key = self.key_for(data)
+        dest = self._dest(key)
+        with self._lock:
+            proxy = self._futures.get(key)
+            fresh = proxy is None
+            if fresh:
+                proxy = Future()
+                self._futures[key] = proxy
+                self.misses += 1
+            else:
+                self.hits += 1
+            if source_path is not None:
+                self._by_path[str(source_path)] = key
+        if on_done:
+            proxy.add_done_callback(lambda f: on_done(f, dest))
+        if fresh:
+            # The stage may block here until a slot frees up, so this has to
+            # happen outside the lock
+            def relay(f):
+                if f.cancelled():
+                    proxy.cancel()
+                elif f.exception() is not None:
+                    proxy.set_exception(f.exception())
+                else:
+                    proxy.set_result(dest)
+
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                self.stage.submit(
+                    convert_to_file, data, str(dest), self.quality, on_done=relay
+                )
+            except Exception as e:
+                proxy.set_exception(e)
+        return key
+
+    def submit_path(self, source_path) -> str:
+        with self._lock:
+            key = self._by_path.get(str(source_path))
+        if key is not None:
+            return key
+        return self.submit(Path(source_path).read_bytes(), source_path)
+
+    def converted(self, source_path) -> Path:
+        """Path of the converted file, converting now if nobody asked yet."""
+        key = self.submit_path(source_path)
+        with self._lock:
+            future = self._futures[key]
+        return future.result()
+
+    def close(self):
+        # Waits for anything still in flight, then drops the cache files.
+        # Hardlinks handed out via on_done stay where they were linked to.
+        with self._lock:
+            futures = list(self._futures.values())
+            self._futures.clear()
+            self._by_path.clear()
+        for f in futures:
+            try:
+                f.result()
+            except Exception:
+                pass
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def _dest(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.jpg"
+
+
+def link_or_copy(src, dest):
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copyfile(src, dest)
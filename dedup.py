@@ -0,0 +1,210 @@
+import hashlib
+import io
+import threading
+import time
+from pathlib import Path
+
+# Remembers every page downloaded for a series so the ones that show up in
+# chapter after chapter (credits, recruitment banners, "read on X" promos)
+# can be recognised and skipped. Pages are matched three ways:
+#   - head fingerprint: size + hash of the first bytes, checked as soon as
+#     the response starts so the rest of the body never comes down
+#   - SHA-256 of the whole file
+#   - 64-bit dHash, for the same banner re-encoded at another quality.
+#     Looked up through 8-bit bands of the hash: two hashes within
+#     max_distance (< 8) bits of each other always share at least one band,
+#     so only pages sharing a band are compared instead of the whole series
+
+HEAD_BYTES = 4096
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    series TEXT NOT NULL,
+    chapter TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    phash INTEGER,
+    head TEXT,
+    size INTEGER NOT NULL,
+    path TEXT,
+    seen REAL NOT NULL,
+    PRIMARY KEY (series, chapter, sha256)
+);
+CREATE INDEX IF NOT EXISTS pages_head ON pages (series, head);
+CREATE INDEX IF NOT EXISTS pages_sha ON pages (sha256);
+CREATE TABLE IF NOT EXISTS phash_bands (
+    series TEXT NOT NULL,
+    band INTEGER NOT NULL,
+    chapter TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    phash INTEGER NOT NULL,
+    PRIMARY KEY (series, band, chapter, sha256)
+);
+"""
+
+# Bands for pages recorded before phash_bands existed, band = n * 256 + byte n
+_BACKFILL = """
+INSERT OR IGNORE INTO phash_bands (series, band, chapter, sha256, phash)
+SELECT series, {n} * 256 + ((phash >> {shift}) & 255), chapter, sha256, phash
+FROM pages WHERE phash IS NOT NULL
+"""
+
+
+def head_fingerprint(head: bytes, total: int):
+    """Fingerprint from the first HEAD_BYTES of a body and its full size."""
+    if not total or len(head) < min(total, HEAD_BYTES):
+        return None
+    return f"{total}:{hashlib.sha1(head[:HEAD_BYTES]).hexdigest()}"
+
+
+def dhash(data: bytes):
+    """64-bit difference hash as a signed int (what SQLite stores), or None."""
+    try:
+        from PIL import Image
+
+        img = Image.open(io.BytesIO(data))
+        if img.format == "JPEG":
+            img.draft("L", (64, 64))
+        img = img.convert("L").resize((9, 8), Image.BOX)
+    except Exception:
+        return None
+    px = img.tobytes()
+    bits = 0
+    for y in range(8):
+        for x in range(8):
+            bits = bits << 1 | (px[y * 9 + x] > px[y * 9 + x + 1])
+    # Near-flat pages (blank gutters, solid fills) all hash to roughly the
+    # same value, so they're useless for matching
+    if not 8 <= bin(bits).count("1") <= 56:
+        return None
+    return bits - (1 << 64) if bits >= 1 << 63 else bits
+
+
+def _distance(a: int, b: int) -> int:
+    return bin((a ^ b) & 0xFFFFFFFFFFFFFFFF).count("1")
+
+
+def _bands(phash: int) -> list:
+    return [n * 256 + ((phash >> (8 * n)) & 255) for n in range(8)]
+
+
+class PageInfo:
+    def __init__(self, data: bytes):
+        self.size = len(data)
+        self.sha256 = hashlib.sha256(data).hexdigest()
+        self.head = head_fingerprint(data[:HEAD_BYTES], len(data))
+        self.phash = dhash(data)
+        self.junk = False
+        self.existing = None
+        # Chapters it was matched in, and whether only by dHash (could be
+        # a real page that just looks alike)
+        self.matches = []
+        self.near = False
+
+
+class PageIndex:
+    """
+    SQLite index of downloaded pages, shared by every series. A page counts
+    as junk once it has turned up in junk_after different chapters of the
+    same series (counting the one being downloaded).
+    """
+
+    def __init__(self, db_path, junk_after: int = 3, max_distance: int = 6):
+        import sqlite3
+
+        self.db_path = Path(db_path).expanduser()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.junk_after = junk_after
+        self.max_distance = min(max_distance, 7)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        with self._db:
+            fresh = not self._db.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'phash_bands'"
+            ).fetchone()
+            self._db.executescript(_SCHEMA)
+            if fresh:
+                for n in range(8):
+                    self._db.execute(_BACKFILL.format(n=n, shift=8 * n))
+
+    def is_junk_head(self, series: str, chapter: str, head: str) -> bool:
+        if head is None:
+            return False
+        with self._lock:
+            (count,) = self._db.execute(
+                "SELECT COUNT(DISTINCT chapter) FROM pages"
+                " WHERE series = ? AND head = ? AND chapter != ?",
+                (series, head, chapter),
+            ).fetchone()
+        return count >= self.junk_after - 1
+
+    def check(self, series: str, chapter: str, data: bytes) -> PageInfo:
+        """
+        Hashes data and looks it up: info.junk says skip it, info.existing
+        is a file already on disk with the exact same bytes (or None).
+        """
+        info = PageInfo(data)
+        candidates = []
+        with self._lock:
+            chapters = {
+                row[0]
+                for row in self._db.execute(
+                    "SELECT chapter FROM pages"
+                    " WHERE series = ? AND sha256 = ? AND chapter != ?",
+                    (series, info.sha256, chapter),
+                )
+            }
+            if info.phash is not None and len(chapters) < self.junk_after - 1:
+                bands = _bands(info.phash)
+                candidates = self._db.execute(
+                    "SELECT DISTINCT chapter, phash FROM phash_bands"
+                    f" WHERE series = ? AND band IN ({', '.join('?' * len(bands))})"
+                    " AND chapter != ?",
+                    (series, *bands, chapter),
+                ).fetchall()
+            for (path,) in self._db.execute(
+                "SELECT path FROM pages WHERE sha256 = ? AND path IS NOT NULL",
+                (info.sha256,),
+            ):
+                p = Path(path)
+                if p.is_file() and p.stat().st_size == info.size:
+                    info.existing = p
+                    break
+        exact = len(chapters)
+        for other, phash in candidates:
+            if _distance(phash, info.phash) <= self.max_distance:
+                chapters.add(other)
+        info.junk = len(chapters) >= self.junk_after - 1
+        info.matches = sorted(chapters)
+        info.near = exact < self.junk_after - 1
+        return info
+
+    def record(self, series: str, chapter: str, info: PageInfo, path=None):
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages"
+                " (series, chapter, sha256, phash, head, size, path, seen)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    series,
+                    chapter,
+                    info.sha256,
+                    info.phash,
+                    info.head,
+                    info.size,
+                    str(path) if path else None,
+                    time.time(),
+                ),
+            )
+            if info.phash is not None:
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO phash_bands"
+                    " (series, band, chapter, sha256, phash) VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (series, band, chapter, info.sha256, info.phash)
+                        for band in _bands(info.phash)
+                    ],
+                )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,2918 @@
+import re
+import time
+import threading
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, urljoin
+from pathlib import Path
+import base64
+import hashlib
+import shutil
+from collections import Counter
+from contextlib import contextmanager
+from importlib.util import find_spec
+
+from cancel import Cancelled, CancelToken, abort_response
+from dedup import PageIndex, head_fingerprint
+from history import HistoryIndex
+from convert import ConversionCache, ConversionStage, link_or_copy, to_jpeg_bytes
+from exporters import CbzWriter, EpubWriter, PdfWriter, sniff_file
+from imagesniff import image_size
+from metrics import REGISTRY, Metrics
+from page_cache import PageCache
+from profiles import ORIGINAL, ProfileRenderer, get_profile, render_bytes
+from profiling import PER_THREAD
+from series import find_chapters, in_range
+from stitch import STITCH_DIR, stitch_pages
+
+# Only check that the optional packages are installed; importing them takes
+# longer than the rest of startup put together. requests, bs4, Playwright and
+# Pillow are imported inside the code paths that use them.
+PLAYWRIGHT_AVAILABLE = find_spec("playwright") is not None
+PIL_AVAILABLE = find_spec("PIL") is not None
+
+# What get_output_directory falls back to when the title says nothing useful
+FALLBACK_NAMES = {"Unknown Comic", "Comic", "Chapter", "Unknown"}
+
+
+class Var:
+    """Stand-in for a tk variable (get/set) when there's no Tk around."""
+
+    def __init__(self, value=None):
+        self._value = value
+
+    def get(self):
+        return self._value
+
+    def set(self, value):
+        self._value = value
+
+
+class ImagePipeline:
+    """
+    Producer/consumer hand-off between page discovery and the download loop.
+    Pages are numbered by their place in the chapter: URLs submitted before
+    settle() (the browser's first snapshot, which can miss pages in the
+    middle) are held back until the final page order is in, anything
+    submitted after that goes on the end. Image bytes the browser already
+    intercepted are kept so the loop can skip the network for them: only for
+    pages that are queued and not downloaded yet, plus a capped holding area
+    for bodies that show up before their URL is known to be a page (most of
+    those are ads and avatars).
+    """
+
+    # Bytes kept for not-yet-submitted URLs, oldest dropped first
+    PENDING_LIMIT = 64 * 1024 * 1024
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._seen = set()
+        self._held = []
+        self._taken = set()
+        self._bodies = {}
+        self._pending = {}
+        self._pending_bytes = 0
+        self._closed = False
+        self._settled = threading.Event()
+        self.total = 0
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def settled(self) -> bool:
+        return self._settled.is_set()
+
+    def submit(self, url: str) -> int:
+        with self._lock:
+            if self._closed or url in self._seen:
+                return 0
+            self._seen.add(url)
+            self.total += 1
+            index = self.total
+            body = self._pending.pop(url, None)
+            if body is not None:
+                self._pending_bytes -= len(body)
+                self._bodies[url] = body
+            if not self._settled.is_set():
+                self._held.append(url)
+                return index
+        self._queue.put((index, url))
+        return index
+
+    def settle(self, urls: list):
+        """Numbers the held pages by their place in urls (the final page order)."""
+        with self._lock:
+            if self._settled.is_set():
+                return
+            order = [url for url in dict.fromkeys(urls) if url in self._seen]
+            placed = set(order)
+            order += [url for url in self._held if url not in placed]
+            self._held = []
+            self._settled.set()
+        for index, url in enumerate(order, 1):
+            self._queue.put((index, url))
+
+    def held(self) -> list:
+        """Submitted URLs still waiting for settle() that have no body yet."""
+        with self._lock:
+            return [
+                url
+                for url in self._held
+                if url not in self._bodies and url not in self._taken
+            ]
+
+    def wait_settled(self, timeout: float = None) -> bool:
+        return self._settled.wait(timeout)
+
+    def knows(self, url: str) -> bool:
+        with self._lock:
+            return url in self._seen
+
+    def offer_body(self, url: str, body: bytes):
+        if not body:
+            return
+        with self._lock:
+            if url in self._taken:
+                return
+            if url in self._seen:
+                self._bodies.setdefault(url, body)
+            elif not self._closed and url not in self._pending:
+                self._pending[url] = body
+                self._pending_bytes += len(body)
+                while self._pending_bytes > self.PENDING_LIMIT:
+                    dropped = self._pending.pop(next(iter(self._pending)))
+                    self._pending_bytes -= len(dropped)
+
+    def take_body(self, url: str):
+        # The loop has this page now, whatever shows up for it later is dropped
+        with self._lock:
+            self._taken.add(url)
+            return self._bodies.pop(url, None)
+
+    def close(self):
+        with self._lock:
+            held = list(self._held)
+        # Nothing better to go on than the order they came in
+        self.settle(held)
+        with self._lock:
+            self._closed = True
+            self._pending.clear()
+            self._pending_bytes = 0
+        self._queue.put(None)
+
+    def discard(self):
+        with self._lock:
+            self._closed = True
+            self._bodies.clear()
+            self._pending.clear()
+            self._pending_bytes = 0
+        self._settled.set()
+
+    def __iter__(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            yield item
+
+
+class ComicEngine:
+    """
+    Finds, downloads and exports chapters, with no UI attached. Settings and
+    progress live in *_var holders with get()/set(): the desktop app passes
+    a make_var that builds thread-safe wrappers around tk variables, the CLI
+    uses plain Vars. With an EventBus, log lines and progress are emitted as
+    events for the UI thread to pick up; without one they're printed (or a
+    subclass overrides log_message/log_progress).
+    """
+
+    # The *_var names (minus _var) that make up a job's settings
+    SETTINGS = (
+        "use_browser",
+        "exclude_gifs",
+        "skip_tiny",
+        "aggressive_comments",
+        "convert_webp",
+        "convert_webp_cbz",
+        "generate_pdf",
+        "generate_epub",
+        "generate_cbz",
+        "archive_only",
+        "disk_cache",
+        "profile",
+        "stitch",
+        "dedup",
+        "skip_downloaded",
+    )
+
+    def __init__(self, make_var=None, events=None):
+        make_var = make_var or (lambda kind, value: Var(value))
+        self.events = events
+
+        self.url_var = make_var(str, "")
+        self.output_var = make_var(str, str(Path.home() / "Downloads" / "Comics"))
+        self.use_browser_var = make_var(bool, PLAYWRIGHT_AVAILABLE)
+        self.exclude_gifs_var = make_var(bool, True)
+        self.skip_tiny_var = make_var(bool, True)
+        self.aggressive_comments_var = make_var(bool, True)
+        self.convert_webp_var = make_var(bool, False)
+        self.convert_webp_cbz_var = make_var(bool, True)
+        self.generate_pdf_var = make_var(bool, False)
+        self.generate_epub_var = make_var(bool, False)
+        self.generate_cbz_var = make_var(bool, True)
+        self.archive_only_var = make_var(bool, False)
+        self.disk_cache_var = make_var(bool, False)
+        self.profile_var = make_var(str, ORIGINAL)
+        self.stitch_var = make_var(bool, False)
+        self.dedup_var = make_var(bool, False)
+        self.skip_downloaded_var = make_var(bool, True)
+
+        self.page_cache = PageCache(ttl=15 * 60)
+        self.page_cache_dir = Path.home() / ".cache" / "comic-downloader" / "pages"
+        self.converter = None
+        self.convert_cache = None
+        self.profile_renderer = None
+        self.page_index = None
+        self.page_index_path = Path.home() / ".cache" / "comic-downloader" / "pages.db"
+        self.history = None
+        self.history_path = Path.home() / ".cache" / "comic-downloader" / "history.db"
+        # Semaphore shared by jobs running side by side (see jobs.JobRunner)
+        self.connections = None
+        # Timings of the current (or last) chapter, see metrics.py
+        self.metrics = Metrics()
+        # profiling.Profiler when a run is being profiled
+        self.profiler = None
+
+        # Tripped by cancel(), wakes whatever the run is blocked on
+        self.cancel_token = CancelToken()
+        self.running = False
+        self.total_images = 0
+        self._download_start = 0
+
+        self.current_status = make_var(str, "Ready to start")
+        self.progress_value = make_var(float, 0)
+        self.progress_label = make_var(str, "0%")
+        self.current_step = make_var(str, "")
+        self.images_found = make_var(str, "Images found: 0")
+        self.images_downloaded = make_var(str, "Downloaded: 0/0")
+
+    def log_message(self, msg: str, tag: str = "info"):
+        if self.events is not None:
+            self.events.emit("log", message=msg, level=tag, time=time.time())
+        else:
+            print(f"[{time.strftime('%H:%M:%S')}] {msg}")
+
+    def log_progress(self, current: int, total: int, label: str = ""):
+        if self.events is not None and total > 0:
+            elapsed = time.time() - self._download_start if self._download_start else 0
+            self.events.emit(
+                "progress",
+                current=current,
+                total=total,
+                label=label,
+                elapsed=elapsed,
+                time=time.time(),
+            )
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    @running.setter
+    def running(self, value: bool):
+        # Starting again after a cancel needs an untripped token
+        if value and self.cancel_token.cancelled:
+            self.cancel_token = CancelToken()
+        self._running = value
+
+    def settings(self) -> dict:
+        return {name: getattr(self, f"{name}_var").get() for name in self.SETTINGS}
+
+    def apply_settings(self, settings: dict):
+        for name, value in settings.items():
+            if name in self.SETTINGS:
+                getattr(self, f"{name}_var").set(value)
+
+    @contextmanager
+    def _connection(self):
+        # Holds one slot of the shared connection budget, if there is one
+        if self.connections is None:
+            yield
+            return
+        with self.connections:
+            yield
+
+    @contextmanager
+    def _profiled(self, name: str):
+        if self.profiler is None or name is None:
+            yield
+            return
+        with self.profiler.section(name):
+            yield
+
+    def _request(self, method: str, url: str, **kwargs):
+        # requests.request, but a cancel doesn't wait for it (see cancel.py)
+        import requests
+
+        return self.cancel_token.call(
+            requests.request, method, url, cleanup=lambda r: r.close(), **kwargs
+        )
+
+    def _browser_pause(self, page, ms: int):
+        # page.wait_for_timeout in short slices, Playwright can only be
+        # driven from its own thread so it can't be woken from outside
+        token = self.cancel_token
+        while ms > 0:
+            token.raise_if_cancelled()
+            page.wait_for_timeout(min(ms, 250))
+            ms -= 250
+        token.raise_if_cancelled()
+
+    def _browser_goto(self, page, url: str, wait_until: str, timeout: int):
+        # page.goto returns once the response starts, the wait for the page
+        # to settle happens in slices (see _browser_pause)
+        from playwright.sync_api import TimeoutError as PlaywrightTimeout
+
+        token = self.cancel_token
+        deadline = time.monotonic() + timeout / 1000
+        response = page.goto(url, wait_until="commit", timeout=timeout)
+        while True:
+            token.raise_if_cancelled()
+            left_ms = (deadline - time.monotonic()) * 1000
+            try:
+                page.wait_for_load_state(wait_until, timeout=max(1, min(left_ms, 500)))
+                return response
+            except PlaywrightTimeout:
+                if left_ms <= 500:
+                    raise
+
+    def update_status(self, text: str):
+        self.current_status.set(text)
+
+    def cancel(self):
+        token = self.cancel_token
+        self.running = False
+        token.cancel()
+
+    def download_task(self, chapter_url: str, base_dir: str) -> dict:
+        """
+        Downloads one chapter and builds the selected exports. Returns a
+        summary dict; status is ok, partial, empty, cancelled, failed or
+        skipped (downloaded before).
+        """
+        result = {
+            "url": chapter_url,
+            "status": "failed",
+            "output_dir": None,
+            "found": 0,
+            "saved": 0,
+            "failed": 0,
+            "exports": [],
+            "error": None,
+        }
+        import requests
+
+        saved_paths = []
+        pipeline = ImagePipeline()
+        cbz = None
+        loop = None
+        archive_only = False
+        success = 0
+        failed = 0
+        metrics = self.metrics = Metrics()
+        if self.converter is not None:
+            self.converter.metrics = metrics
+        REGISTRY.chapter_started()
+        try:
+            history = self._get_history() if self.skip_downloaded_var.get() else None
+            if history is not None:
+                known = history.lookup(chapter_url)
+                if known is not None:
+                    return self._already_downloaded(result, known)
+
+            use_browser = self.use_browser_var.get() and PLAYWRIGHT_AVAILABLE
+
+            self.current_step.set("Step 1/4: Fetching page...")
+            self.update_status(
+                f"Loading chapter page using {'Browser Mode' if use_browser else 'Direct Request'}..."
+            )
+            self.log_message(
+                f"Method: {'Browser Mode (Playwright)' if use_browser else 'Direct HTTP Request'}",
+                "info",
+            )
+            if use_browser:
+                # The browser side runs in the background from here on, the
+                # loop starts on the pages of its first snapshot while it's
+                # still scrolling
+                first = {"ready": threading.Event()}
+                threading.Thread(
+                    target=self._browser_producer,
+                    args=(chapter_url, pipeline, first),
+                    daemon=True,
+                ).start()
+                with self.cancel_token.on_cancel(first["ready"].set):
+                    first["ready"].wait()
+                self.cancel_token.raise_if_cancelled()
+                if "error" in first:
+                    raise first["error"]
+                html, image_urls = first["html"], first["image_urls"]
+            else:
+                html, image_urls = self.load_chapter(chapter_url, use_browser)
+            self.log_message("✓ Page loaded successfully", "ok")
+
+            if not image_urls:
+                self.log_message(
+                    "✗ Found absolutely nothing. This page is a ghost town.", "error"
+                )
+                if not use_browser:
+                    self.log_message(
+                        "Try enabling Browser Mode - maybe that'll help", "warn"
+                    )
+                result["status"] = "empty"
+                return result
+
+            output_dir = self.get_output_directory(html, chapter_url, base_dir)
+            comic, chapter = output_dir.parent.name, output_dir.name
+            if history is not None and not {comic, chapter} & FALLBACK_NAMES:
+                # Same comic and chapter under another URL (mirror, new slug)
+                known = history.lookup_identity(comic, chapter, image_urls)
+                if known is not None:
+                    history.record(
+                        chapter_url,
+                        known["comic"],
+                        known["chapter"],
+                        known["output_dir"],
+                        known["pages"],
+                        known["bytes"],
+                        known["archives"],
+                        known["page_hashes"],
+                        image_urls,
+                    )
+                    return self._already_downloaded(result, known)
+            self.log_message(f"Save location: {output_dir}", "info")
+
+            self.total_images = len(image_urls)
+            self.images_found.set(f"Images found: {self.total_images}")
+            self.log_message(f"✓ Found {self.total_images} images to download", "ok")
+
+            output_dir.mkdir(parents=True, exist_ok=True)
+            questionable_dir = output_dir / "_questionable_images"
+            page_hashes = {}
+            page_bytes = 0
+            result["output_dir"] = str(output_dir)
+
+            # Pages repeated across the series' chapters (credits, promos)
+            # are skipped, exact repeats that are kept get hardlinked
+            page_index = self._get_page_index() if self.dedup_var.get() else None
+            is_junk_head = None
+            dedup_stats = Counter()
+            if page_index is not None:
+                series, chapter = str(output_dir.parent), output_dir.name
+
+                def check_head(head):
+                    junk = page_index.is_junk_head(series, chapter, head)
+                    dedup_stats["skipped"] += junk
+                    return junk
+
+                is_junk_head = check_head
+
+            self.current_step.set("Step 3/4: Downloading images...")
+
+            # Everything the HTML gave us is queued right away; the browser pass
+            # runs alongside the downloads and appends whatever extra pages it
+            # finds (virtualized SPAs) as it scrolls. Pages of an early
+            # snapshot are only numbered once the scroll has put them in
+            # order, until then they're fetched ahead (see _fetch_ahead).
+            for img_url in image_urls:
+                pipeline.submit(img_url)
+
+            # The CBZ is filled in as pages land instead of after the fact.
+            # In archive-only mode it's the *only* place pages go: no loose
+            # files, and a cancelled run leaves a resumable partial archive.
+            # With a device profile or stitching the CBZ is built after the
+            # download from the finished pages (archive-only mode resizes in
+            # memory instead).
+            archive_only = self.archive_only_var.get()
+            profile = get_profile(self.profile_var.get()) if PIL_AVAILABLE else None
+            stitch = self.stitch_var.get() and PIL_AVAILABLE
+            if archive_only and stitch:
+                self.log_message(
+                    "CBZ Only mode: strips can't be stitched without the files, skipping that",
+                    "warn",
+                )
+            build_later = profile is not None or stitch
+            if archive_only or (self.generate_cbz_var.get() and not build_later):
+                cbz = CbzWriter(
+                    output_dir / f"{output_dir.name}.cbz", resume=archive_only
+                )
+                if cbz.done:
+                    self.log_message(
+                        f"↻ Resuming: {len(cbz.done)} pages already in the partial archive",
+                        "info",
+                    )
+
+            if not use_browser:
+                pipeline.close()
+
+            headers = {
+                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+                "Referer": chapter_url,
+                "Accept": "image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8",
+                "Accept-Language": "en-US,en;q=0.9",
+                "Accept-Encoding": "gzip, deflate, br",
+                "Connection": "keep-alive",
+                "Sec-Ch-Ua": '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
+                "Sec-Ch-Ua-Mobile": "?0",
+                "Sec-Ch-Ua-Platform": '"Windows"',
+                "Sec-Fetch-Dest": "image",
+                "Sec-Fetch-Mode": "no-cors",
+                "Sec-Fetch-Site": "cross-site",
+            }
+            if not pipeline.settled:
+                self._fetch_ahead(pipeline, headers)
+
+            loop = pipeline
+            if self.profiler is not None:
+                loop = self.profiler.iterate("image_loop", pipeline)
+            for i, img_url in loop:
+                if self.total_images != pipeline.total:
+                    self.total_images = pipeline.total
+                    self.images_found.set(f"Images found: {self.total_images}")
+
+                if not self.running:
+                    self.log_message("", "info")
+                    self.log_message("=" * 60, "warn")
+                    self.log_message(
+                        f"✗ Cancelled: User said 'nah I'm good' - Saved {success}/{self.total_images} images",
+                        "warn",
+                    )
+                    self.log_message("=" * 60, "warn")
+                    break
+
+                self.update_status(f"Downloading image {i} of {self.total_images}...")
+                self.images_downloaded.set(f"Downloaded: {success}/{self.total_images}")
+                filename = f"{i:03d}{Path(urlparse(img_url).path).suffix or '.jpg'}"
+                save_path = output_dir / filename
+
+                self.log_message(f"[{i:03d}/{self.total_images}] {filename}", "info")
+                self.log_message(f"  {img_url}", "info")
+
+                if not self.running:
+                    self.log_message("  ✗ Cancelled", "warn")
+                    break
+
+                placed = False
+                image_started = time.perf_counter()
+                try:
+                    if not self.running:
+                        break
+
+                    if archive_only and img_url in cbz.done:
+                        cbz.skip(i)
+                        placed = True
+                        success += 1
+                        self.log_message("  ✓ Already in archive from last run", "ok")
+                        continue
+
+                    content = pipeline.take_body(img_url)
+                    if use_browser:
+                        metrics.cache("browser_body", content is not None)
+
+                    if content is not None:
+                        self.log_message(
+                            f"  Size: {len(content) // 1024} KB (already grabbed by the browser or fetched ahead)",
+                            "info",
+                        )
+                    else:
+                        try:
+                            with self._connection():
+                                # requests opens a fresh connection per get(),
+                                # so DNS + connect + TTFB all land in "request"
+                                with metrics.stage("image.request"):
+                                    r = self._request(
+                                        "get",
+                                        img_url,
+                                        headers=headers,
+                                        timeout=20,
+                                        stream=True,
+                                        allow_redirects=True,
+                                    )
+                                r.raise_for_status()
+                                # A cancel shuts the socket under the read
+                                abort = self.cancel_token.on_cancel(
+                                    lambda: abort_response(r)
+                                )
+                                with metrics.stage("image.transfer"), abort:
+                                    content, skipped = self._read_image_response(
+                                        r, is_junk_head
+                                    )
+                            if content is None:
+                                self.log_message(
+                                    f"  ⚠ Skipped ({skipped}, body never downloaded)",
+                                    "warn",
+                                )
+                                continue
+                            size_kb = len(content) // 1024
+                            self.log_message(f"  Size: {size_kb} KB", "info")
+                        except requests.exceptions.HTTPError as e:
+                            if "403" in str(e) and use_browser and PLAYWRIGHT_AVAILABLE:
+                                self.log_message(
+                                    "  Got 403'd, trying browser mode...", "warn"
+                                )
+                                with self._connection():
+                                    content = self.download_image_with_browser(
+                                        img_url, chapter_url
+                                    )
+                                if content:
+                                    size_kb = len(content) // 1024
+                                    self.log_message(f"  Size: {size_kb} KB", "info")
+                            else:
+                                raise
+
+                    if content is None:
+                        raise ValueError("Image download returned nothing, L")
+                    metrics.add_bytes(img_url, len(content))
+
+                    if self._looks_suspicious(len(content), image_size(content)):
+                        if self.skip_tiny_var.get() or archive_only:
+                            self.log_message(
+                                "  ⚠ Skipped (sus smol boi - probably emoji/icon)",
+                                "warn",
+                            )
+                            continue
+                        else:
+                            questionable_dir.mkdir(parents=True, exist_ok=True)
+                            questionable_path = questionable_dir / filename
+                            with open(questionable_path, "wb") as f:
+                                f.write(content)
+                            self.log_message(
+                                f"  ⚠ Quarantined to _questionable_images ({len(content) // 1024} KB)",
+                                "warn",
+                            )
+                            continue
+
+                    page_info = None
+                    if page_index is not None:
+                        page_info = page_index.check(series, chapter, content)
+                        if page_info.junk:
+                            page_index.record(series, chapter, page_info)
+                            dedup_stats["skipped"] += 1
+                            seen_in = ", ".join(page_info.matches[:3])
+                            self.log_message(
+                                f"  ⚠ Skipped (seen in {seen_in} - credits/promo page)",
+                                "warn",
+                            )
+                            if page_info.near:
+                                # Only looks like those, keep it in case it's
+                                # a real page that happens to resemble them
+                                questionable_dir.mkdir(parents=True, exist_ok=True)
+                                with open(
+                                    questionable_dir / f"repeat_{filename}", "wb"
+                                ) as f:
+                                    f.write(content)
+                                self.log_message(
+                                    "  Lookalike, not an exact copy: kept in _questionable_images",
+                                    "warn",
+                                )
+                            continue
+
+                    if archive_only:
+                        self._add_to_archive(
+                            cbz, i, img_url, filename, content, profile
+                        )
+                    elif (
+                        self.convert_webp_var.get()
+                        and PIL_AVAILABLE
+                        and filename.lower().endswith((".webp", ".png"))
+                    ):
+                        # Encoding happens in the conversion pool, we move on
+                        # to the next download straight away
+                        self._convert_in_background(
+                            content,
+                            save_path,
+                            saved_paths,
+                            on_saved=cbz and (lambda p, i=i: cbz.add(i, p)),
+                        )
+                    else:
+                        if page_info is not None and page_info.existing:
+                            # Same bytes already on disk (another chapter or
+                            # an earlier run): link instead of a second copy
+                            if page_info.existing.resolve() != save_path.resolve():
+                                link_or_copy(page_info.existing, save_path)
+                            dedup_stats["linked"] += 1
+                        else:
+                            with open(save_path, "wb") as f:
+                                f.write(content)
+                        saved_paths.append(save_path)
+                        if cbz is not None:
+                            if (
+                                filename.lower().endswith(".webp")
+                                and self.convert_webp_cbz_var.get()
+                                and PIL_AVAILABLE
+                            ):
+                                self._add_converted_to_cbz(cbz, i, content, save_path)
+                            else:
+                                cbz.add(i, save_path)
+                    placed = True
+                    page_hashes[i] = (
+                        page_info.sha256
+                        if page_info is not None
+                        else hashlib.sha256(content).hexdigest()
+                    )
+                    page_bytes += len(content)
+                    if page_info is not None:
+                        page_index.record(
+                            series,
+                            chapter,
+                            page_info,
+                            save_path if save_path in saved_paths else None,
+                        )
+
+                    success += 1
+                    metrics.count("images")
+                    self.images_downloaded.set(
+                        f"Downloaded: {success}/{self.total_images}"
+                    )
+                    perc = (i / self.total_images) * 100
+                    self.progress_value.set(perc)
+                    self.progress_label.set(f"{int(perc)}%")
+                    self.log_message(f"  ✓ Saved", "ok")
+
+                    self.cancel_token.sleep(0.05)
+
+                except Cancelled:
+                    self.log_message(
+                        f"  ✗ Cancelled mid-image - Saved {success}/{self.total_images} images",
+                        "warn",
+                    )
+                    break
+                except Exception as e:
+                    failed += 1
+                    metrics.count("image_errors")
+                    self.log_message(f"  ✗ Failed: {str(e)[:100]}", "error")
+                finally:
+                    if cbz is not None and not placed:
+                        cbz.skip(i)
+                    metrics.observe("image", time.perf_counter() - image_started)
+
+            if loop is not pipeline:
+                # Ends the profiled section even when the loop was cut short
+                loop.close()
+
+            if self.converter is not None:
+                self.update_status("Waiting for image conversions to finish...")
+                self.converter.wait()
+
+            if self.running:
+                self.log_message("", "info")
+                self.log_message("=" * 60, "info")
+                self.log_message(
+                    f"✓ All done! Successfully yoinked {success}/{self.total_images} images",
+                    "ok",
+                )
+                self.log_message(f"Location: {output_dir}", "info")
+                if dedup_stats:
+                    self.log_message(
+                        f"Dedup: skipped {dedup_stats['skipped']} repeated pages, hardlinked {dedup_stats['linked']}",
+                        "info",
+                    )
+                self.log_message("=" * 60, "info")
+            else:
+                pass
+
+            exports_created = []
+            if cbz is not None and archive_only and not self.running:
+                partial = cbz.close(partial=True)
+                self.log_message(
+                    f"↻ Kept {cbz.pages} pages in {partial.name}, run the same URL again to resume",
+                    "warn",
+                )
+            if cbz is not None and self.running:
+                self.current_step.set("Step 4/4: Finishing CBZ file...")
+                self.update_status("Finalizing CBZ archive...")
+                try:
+                    started = time.perf_counter()
+                    with metrics.stage("export.cbz"):
+                        cbz_path = cbz.close()
+                    self.log_message(
+                        f"✓ CBZ archive created: {cbz_path.name} ({cbz.pages} pages)",
+                        "ok",
+                    )
+                    self.log_message(
+                        f"  CBZ finalized in {time.perf_counter() - started:.1f}s (streamed during download)",
+                        "info",
+                    )
+                    exports_created.append("CBZ")
+                except Exception as e:
+                    self.log_message(f"✗ CBZ creation failed: {e}", "error")
+
+            formats = []
+            if self.generate_cbz_var.get() and cbz is None:
+                formats.append("CBZ")
+            if self.generate_pdf_var.get() and PIL_AVAILABLE:
+                formats.append("PDF")
+            if self.generate_epub_var.get():
+                formats.append("EPUB")
+            if formats and archive_only:
+                self.log_message(
+                    f"CBZ Only mode: skipping {', '.join(formats)} (no loose images to build from)",
+                    "warn",
+                )
+                formats = []
+            if self.running and formats and saved_paths:
+                self.current_step.set(f"Step 4/4: Creating {' + '.join(formats)}...")
+                self.update_status(f"Generating {', '.join(formats)} side by side...")
+                exports_created += self.run_exports(output_dir, formats, saved_paths)
+
+            if exports_created:
+                self.log_message(
+                    f"✓ Generated formats: {', '.join(exports_created)}", "ok"
+                )
+
+            self.current_step.set("Complete!")
+            self.update_status("All done! Ready for next download")
+
+            result.update(
+                found=self.total_images,
+                saved=success,
+                failed=failed,
+                exports=exports_created,
+            )
+            if not self.running:
+                result["status"] = "cancelled"
+            elif failed or not success:
+                result["status"] = "partial" if success else "failed"
+            else:
+                result["status"] = "ok"
+                if history is not None:
+                    history.record(
+                        chapter_url,
+                        output_dir.parent.name,
+                        output_dir.name,
+                        output_dir,
+                        success,
+                        page_bytes,
+                        [
+                            p
+                            for p in output_dir.iterdir()
+                            if p.suffix.lower() in (".cbz", ".pdf", ".epub")
+                        ],
+                        [page_hashes[i] for i in sorted(page_hashes)],
+                        image_urls,
+                    )
+
+        except Cancelled:
+            if success or failed:
+                self.log_message(
+                    f"✗ Cancelled - Saved {success}/{self.total_images} images",
+                    "warn",
+                )
+            else:
+                self.log_message("✗ Cancelled before any pages came down", "warn")
+            if result["output_dir"] is not None:
+                result["found"] = self.total_images
+            result.update(saved=success, failed=failed)
+            result["status"] = "cancelled"
+        except Exception as e:
+            self.log_message(f"Everything exploded: {e}", "error")
+            result["error"] = str(e)
+        finally:
+            pipeline.discard()
+            if loop is not None and loop is not pipeline:
+                loop.close()
+            if cbz is not None and archive_only:
+                # Whatever made it into the archive is kept for the next run
+                cbz.close(partial=True)
+            elif cbz is not None:
+                cbz.abort()
+            if self.convert_cache is not None:
+                metrics.cache("convert", True, self.convert_cache.hits)
+                metrics.cache("convert", False, self.convert_cache.misses)
+                self.convert_cache.close()
+                self.convert_cache = None
+            self._close_profile_renderer()
+            metrics.finish()
+            if metrics.stages:
+                self.log_message(f"⏱ {metrics.summary()}", "info")
+            result["metrics"] = metrics.report()
+            REGISTRY.chapter_finished(metrics, result["status"])
+            self._finish()
+        return result
+
+    def _get_converter(self) -> ConversionStage:
+        if self.converter is None:
+            self.converter = ConversionStage()
+        self.converter.metrics = self.metrics
+        return self.converter
+
+    def _get_history(self) -> HistoryIndex:
+        if self.history is None:
+            self.history = HistoryIndex(self.history_path)
+        return self.history
+
+    def _already_downloaded(self, result: dict, known: dict) -> dict:
+        when = time.strftime("%Y-%m-%d", time.localtime(known["downloaded"]))
+        self.log_message(
+            f"✓ Already got this one on {when} ({known['pages']} pages), skipping",
+            "ok",
+        )
+        self.log_message(f"  {known['output_dir']}", "info")
+        self.log_message(
+            "  Untick Skip Downloaded (or --redownload) to grab it again", "info"
+        )
+        result.update(
+            status="skipped",
+            output_dir=known["output_dir"],
+            found=known["pages"],
+            saved=known["pages"],
+            exports=[Path(a).suffix[1:].upper() for a in known["archives"]],
+        )
+        return result
+
+    def _get_page_index(self) -> PageIndex:
+        if self.page_index is None:
+            self.page_index = PageIndex(self.page_index_path)
+        return self.page_index
+
+    def _profile_pages(self, output_dir: Path, pages: list) -> list:
+        # Pages resized for the selected device, or the originals untouched.
+        # The renderer is shared, so formats built side by side resize once.
+        profile = get_profile(self.profile_var.get()) if PIL_AVAILABLE else None
+        if profile is None or (pages and pages[0].parent.name == STITCH_DIR):
+            # Stitched pages are already cut to the profile
+            return pages
+        if self.profile_renderer is None:
+            self.profile_renderer = ProfileRenderer(
+                self._get_converter(), output_dir / f".profile-{profile.slug}", profile
+            )
+        return self.profile_renderer.render_all(pages)
+
+    def _close_profile_renderer(self):
+        if self.profile_renderer is not None:
+            self.profile_renderer.close()
+            self.profile_renderer = None
+
+    def _get_convert_cache(self, output_dir: Path) -> ConversionCache:
+        if self.convert_cache is None:
+            self.convert_cache = ConversionCache(
+                self._get_converter(), output_dir / ".converted", quality=95
+            )
+        return self.convert_cache
+
+    def _convert_in_background(
+        self, content: bytes, save_path: Path, saved_paths, on_saved=None
+    ):
+        jpg_path = save_path.with_suffix(".jpg")
+
+        def done(future, converted):
+            try:
+                future.result()
+                link_or_copy(converted, jpg_path)
+                saved_paths.append(jpg_path)
+                if on_saved:
+                    on_saved(jpg_path)
+                self.log_message(
+                    f"  ✓ Converted {save_path.name} to JPG ({len(content) // 1024} KB → {jpg_path.stat().st_size // 1024} KB)",
+                    "ok",
+                )
+            except Exception as e:
+                with open(save_path, "wb") as f:
+                    f.write(content)
+                saved_paths.append(save_path)
+                if on_saved:
+                    on_saved(save_path)
+                self.log_message(
+                    f"  ⚠ Conversion of {save_path.name} failed ({str(e)[:50]}), saved anyway",
+                    "warn",
+                )
+
+        self._get_convert_cache(save_path.parent).submit(content, on_done=done)
+
+    def _add_to_archive(
+        self, cbz, index: int, url: str, filename: str, content, profile=None
+    ):
+        # Archive-only: bytes go from the network straight into the CBZ.
+        # Conversions and device resizes run in the pool and hand their
+        # buffers to the writer.
+        low = filename.lower()
+        stem = Path(filename).stem
+        if profile is not None:
+            job = (render_bytes, content, profile)
+        elif PIL_AVAILABLE and (
+            (self.convert_webp_var.get() and low.endswith((".webp", ".png")))
+            or (self.convert_webp_cbz_var.get() and low.endswith(".webp"))
+        ):
+            job = (to_jpeg_bytes, content, 95)
+        else:
+            cbz.add(index, arcname=filename, data=content, url=url)
+            return
+
+        def done(future):
+            try:
+                result = future.result()
+                if isinstance(result, bytes):
+                    cbz.add(index, arcname=stem + ".jpg", data=result, url=url)
+                elif len(result) == 1:
+                    cbz.add(index, arcname=stem + ".jpg", data=result[0], url=url)
+                else:
+                    parts = [
+                        (f"{stem}-{n:02d}.jpg", data)
+                        for n, data in enumerate(result, 1)
+                    ]
+                    cbz.add_parts(index, parts, url=url)
+            except Exception as e:
+                cbz.add(index, arcname=filename, data=content, url=url)
+                self.log_message(
+                    f"  ⚠ Conversion of {filename} failed ({str(e)[:50]}), archived as-is",
+                    "warn",
+                )
+
+        self._get_converter().submit(*job, on_done=done)
+
+    def _add_converted_to_cbz(self, cbz, index: int, content: bytes, save_path: Path):
+        # Soooo cbz breaks from webp image idk why, so the CBZ gets a JPG copy.
+        # It's converted once through the shared cache and added when ready.
+        def done(future, converted):
+            try:
+                future.result()
+                cbz.add(index, converted, save_path.stem + ".jpg")
+            except Exception:
+                cbz.add(index, save_path)
+                self.log_message(
+                    f"  Couldn't convert {save_path.name} for the CBZ, added as-is",
+                    "warn",
+                )
+
+        self._get_convert_cache(save_path.parent).submit(
+            content, source_path=save_path, on_done=done
+        )
+
+    def _looks_suspicious(self, size: int, dims, complete: bool = True) -> bool:
+        # dims is (format, width, height) from the header sniffer, or None.
+        # complete=False means we only have the first chunk, so an unreadable
+        # header isn't evidence of anything yet.
+        if size < 15 * 1024:
+            return True
+        if dims is None:
+            return complete and size < 50 * 1024
+        _, width, height = dims
+        if not width or not height:
+            return complete
+        if width < 200 and height < 200:
+            return True
+        if size < 50 * 1024:
+            if width < 200 or height < 200:
+                return True
+            if width / height > 8 or height / width > 8:
+                return True
+        return False
+
+    def _fetch_ahead(self, pipeline, headers: dict):
+        # While the browser is still scrolling the first snapshot's pages
+        # can't be numbered yet (some in between may still turn up), so they
+        # are downloaded into the pipeline now and saved once the order is in
+        pages = pipeline.held()
+        if pages:
+            self.log_message(
+                f"Fetching {len(pages)} pages ahead while the browser finishes scrolling...",
+                "info",
+            )
+        budget = pipeline.PENDING_LIMIT
+        for url in pages:
+            if pipeline.settled or budget <= 0:
+                return
+            try:
+                with self._connection():
+                    r = self._request(
+                        "get", url, headers=headers, timeout=20, stream=True
+                    )
+                    r.raise_for_status()
+                    abort = self.cancel_token.on_cancel(lambda: abort_response(r))
+                    with self.metrics.stage("image.transfer"), abort:
+                        content, _ = self._read_image_response(r)
+            except Cancelled:
+                raise
+            except Exception:
+                # The loop has another go at it
+                continue
+            if content:
+                pipeline.offer_body(url, content)
+                budget -= len(content)
+        with self.cancel_token.on_cancel(pipeline.close):
+            pipeline.wait_settled()
+        self.cancel_token.raise_if_cancelled()
+
+    def _read_image_response(self, r, is_junk_head=None):
+        # Peek at the first chunk of a streamed response. If the header
+        # already gives it away as an icon (or a page the dedup index knows
+        # is junk), drop the connection before the rest of the body comes
+        # down. Returns (content, reason) with content None when skipped.
+        chunks = r.iter_content(chunk_size=64 * 1024)
+        head = next(chunks, b"")
+        total = int(r.headers.get("Content-Length") or 0)
+        if total and not r.headers.get("Content-Encoding"):
+            if self.skip_tiny_var.get() and self._looks_suspicious(
+                total, image_size(head), complete=False
+            ):
+                r.close()
+                return None, "sus smol boi - header says emoji/icon"
+            if is_junk_head and is_junk_head(head_fingerprint(head, total)):
+                r.close()
+                return None, "seen in other chapters - credits/promo page"
+        return head + b"".join(chunks), None
+
+    def _browser_producer(self, chapter_url: str, pipeline, first: dict):
+        # The page load, then the batch pass for pages only the browser sees.
+        # first["ready"] is set as soon as download_task can go on: with the
+        # first snapshot's html/image_urls, the finished load's, or "error".
+        ready = first["ready"]
+
+        def early(html):
+            if ready.is_set():
+                return
+            urls = self.extract_image_urls(html, chapter_url)
+            if urls:
+                self.log_message(
+                    f"✓ {len(urls)} images on the page already, downloading while the browser scrolls",
+                    "ok",
+                )
+                for url in urls:
+                    pipeline.submit(url)
+                first.update(html=html, image_urls=urls, early=True)
+                ready.set()
+
+        def on_image(url, body=None):
+            pipeline.offer_body(url, body)
+            if pipeline.knows(url) or not self._is_valid_image_url(url, chapter_url):
+                return
+            index = pipeline.submit(url)
+            if index:
+                self.log_message(
+                    f"  + Browser found extra page {index:03d} (total now: {pipeline.total})",
+                    "info",
+                )
+
+        # A cancel ends the download loop's wait for more pages right away,
+        # even while the browser is stuck in a call
+        stop_waiting = self.cancel_token.on_cancel(pipeline.close)
+        try:
+            with stop_waiting:
+                self._browser_pass(chapter_url, pipeline, first, early, on_image)
+        except Cancelled:
+            self.log_message("Browser pass cancelled", "warn")
+        finally:
+            ready.set()
+            pipeline.close()
+
+    def _browser_pass(self, chapter_url, pipeline, first, early, on_image):
+        ready = first["ready"]
+        try:
+            html, image_urls = self.load_chapter(
+                chapter_url, True, on_image=pipeline.offer_body, on_html=early
+            )
+        except Exception as e:
+            if not ready.is_set():
+                first["error"] = e
+            else:
+                self.log_message(
+                    f"Browser page load fell over halfway: {str(e)[:100]}", "warn"
+                )
+            return
+        except Cancelled as e:
+            first["error"] = e
+            raise
+        if not ready.is_set():
+            first.update(html=html, image_urls=image_urls)
+            ready.set()
+        if not image_urls or pipeline.closed:
+            return
+        # Whatever the scroll added to the first snapshot, in page order
+        added = sum(1 for url in image_urls if pipeline.submit(url))
+        pipeline.settle(image_urls)
+        if added and "early" in first:
+            self.log_message(
+                f"  + Scrolling turned up {added} more pages (total now: {pipeline.total})",
+                "info",
+            )
+
+        known = pipeline.total
+        self.log_message("Attempting batch download with browser...", "info")
+        with self._connection(), self.metrics.stage("browser_pass"):
+            browser_urls = self.batch_download_with_browser(
+                chapter_url,
+                image_urls,
+                on_image=on_image,
+                on_body=pipeline.offer_body,
+            )
+        if browser_urls:
+            self.log_message(
+                f"✓ Browser pass captured {len(browser_urls)} images, {pipeline.total - known} of them new",
+                "ok",
+            )
+
+    def load_chapter(self, url: str, use_browser: bool, on_image=None, on_html=None):
+        # Test URL and Start Download share this so the second one is free
+        self.page_cache.persist_dir = (
+            self.page_cache_dir if self.disk_cache_var.get() else None
+        )
+        key = PageCache.make_key(
+            url,
+            browser=use_browser,
+            gifs=self.exclude_gifs_var.get(),
+            comments=self.aggressive_comments_var.get(),
+        )
+        cached = self.page_cache.get(key)
+        self.metrics.cache("page", bool(cached))
+        if cached:
+            age = int(time.time() - cached["created"])
+            self.log_message(
+                f"✓ Reusing page from {age}s ago ({len(cached['image_urls'])} images), no refetch needed",
+                "ok",
+            )
+            self.current_step.set("Step 2/4: Finding images...")
+            return cached["html"], list(cached["image_urls"])
+
+        fetch = "page_fetch.browser" if use_browser else "page_fetch.http"
+        # on_html means the image loop starts while this is still scrolling,
+        # with one profiler per process (3.12+) that one gets it
+        section = "fetch_page" if PER_THREAD or on_html is None else None
+        with self._connection(), self.metrics.stage(fetch):
+            with self._profiled(section):
+                html = self.fetch_page(
+                    url, use_browser, on_image=on_image, on_html=on_html
+                )
+        self.metrics.add_bytes(url, len(html.encode("utf-8", "replace")))
+
+        self.current_step.set("Step 2/4: Finding images...")
+        self.update_status("Analyzing page and extracting image URLs...")
+        with self.metrics.stage("extract"), self._profiled("extract_image_urls"):
+            image_urls = self.extract_image_urls(html, url)
+        if image_urls:
+            self.page_cache.put(key, url, html, image_urls)
+        return html, image_urls
+
+    def load_series(self, url: str, use_browser: bool, ranges=None) -> list:
+        """Chapters of a title/series page, oldest first, filtered to ranges."""
+        self.log_message(f"Reading chapter list: {url}", "info")
+        with self._connection():
+            html = self.fetch_page(url, use_browser)
+        chapters = find_chapters(html, url)
+
+        if not chapters and "manga-chapters-holder" in html:
+            # Madara themes load the list over AJAX after the page is up
+            self.log_message("Chapter list is lazy-loaded, asking for it...", "info")
+            with self._connection():
+                r = self._request(
+                    "post",
+                    url.rstrip("/") + "/ajax/chapters/",
+                    headers={"User-Agent": "Mozilla/5.0", "Referer": url},
+                    timeout=25,
+                )
+            if r.ok:
+                chapters = find_chapters(r.text, url)
+
+        if not chapters:
+            self.log_message(
+                "✗ No chapter list on that page, is it a series page?", "error"
+            )
+            return []
+        picked = [c for c in chapters if in_range(c, ranges)]
+        numbers = [c.number for c in picked if c.number is not None]
+        span = f" (ch. {numbers[0]:g}-{numbers[-1]:g})" if numbers else ""
+        self.log_message(
+            f"✓ Found {len(chapters)} chapters, {len(picked)} picked{span}", "ok"
+        )
+        return picked
+
+    def batch_download_with_browser(
+        self, chapter_url: str, image_urls: list, on_image=None, on_body=None
+    ) -> list:
+        if not PLAYWRIGHT_AVAILABLE:
+            return []
+        from playwright.sync_api import sync_playwright
+
+        try:
+            self.log_message("Launching sneaky browser...", "info")
+            with sync_playwright() as p:
+                browser = p.chromium.launch(
+                    headless=True,
+                    args=[
+                        "--disable-blink-features=AutomationControlled",
+                        "--no-sandbox",
+                    ],
+                )
+                context = browser.new_context(
+                    user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+                    viewport={"width": 1920, "height": 1080},
+                    ignore_https_errors=True,
+                )
+
+                context.add_init_script("""
+                    Object.defineProperty(navigator, 'webdriver', {
+                        get: () => undefined
+                    });
+                """)
+
+                page = context.new_page()
+
+                # Set up network interception BEFORE navigation to catch ALL image responses
+                intercepted_images = {}
+
+                def _on_response(response):
+                    try:
+                        url = response.url
+                        if response.status == 200 and len(url) > 20:
+                            ct = response.headers.get("content-type", "")
+                            if "image" in ct:
+                                body = response.body()
+                                if body and len(body) > 1000:
+                                    intercepted_images[url] = body
+                                    if on_body:
+                                        on_body(url, body)
+                    except:
+                        pass
+
+                page.on("response", _on_response)
+
+                self.log_message("Loading page...", "info")
+                self._browser_goto(page, chapter_url, "networkidle", 60000)
+                self._browser_pause(page, 5000)
+
+                has_virtualization = page.evaluate("""
+                    () => {
+                        return document.querySelectorAll('[data-page]').length > 10 ||
+                               document.querySelectorAll('.rpage-page').length > 0;
+                    }
+                """)
+
+                images_data = {}
+
+                if has_virtualization:
+                    self.log_message(
+                        "Detected virtualized SPA - using network interception to capture all images...",
+                        "info",
+                    )
+
+                    # Find the actual scroll container (comix.to uses .rpage-main, not window)
+                    scroll_container_js = page.evaluate("""
+                        () => {
+                            const main = document.querySelector('.rpage-main');
+                            if (main && (main.scrollHeight > main.clientHeight || getComputedStyle(main).overflow !== 'visible')) {
+                                return '.rpage-main';
+                            }
+                            const inner = document.querySelector('.rpage-main__inner');
+                            if (inner && inner.scrollHeight > inner.clientHeight) {
+                                return '.rpage-main__inner';
+                            }
+                            return null;
+                        }
+                    """)
+                    self.log_message(
+                        f"  Scroll container: {scroll_container_js or 'window'}", "info"
+                    )
+
+                    # Get total page count from [data-page] attributes (scoped to reader container only)
+                    container_selector = scroll_container_js or ".rpage-main"
+                    page_info = page.evaluate(f"""
+                        () => {{
+                            const container = document.querySelector('{container_selector}') || document;
+                            const pages = container.querySelectorAll('.rpage-page[data-page]');
+                            const nums = [];
+                            for (const p of pages) {{
+                                const n = parseInt(p.getAttribute('data-page'));
+                                if (!isNaN(n)) nums.push(n);
+                            }}
+                            nums.sort((a, b) => a - b);
+                            return nums;
+                        }}
+                    """)
+
+                    if page_info:
+                        total_pages = len(page_info)
+                        self.log_message(
+                            f"  Found {total_pages} pages in reader container (data-page attributes), scrolling to each...",
+                            "info",
+                        )
+
+                        url_to_page = {}
+
+                        for idx, page_num in enumerate(page_info):
+                            if not self.running:
+                                break
+
+                            # Scroll the specific page element into view to trigger image load
+                            page.evaluate(f"""
+                                () => {{
+                                    const container = document.querySelector('{container_selector}') || document;
+                                    const el = container.querySelector('.rpage-page[data-page="{page_num}"]');
+                                    if (el) el.scrollIntoView({{behavior: 'instant', block: 'center'}});
+                                }}
+                            """)
+
+                            self._browser_pause(page, 500)
+
+                            # Trigger lazy load AND record the image URL immediately (fresh, not virtualized)
+                            page_src = page.evaluate(f"""
+                                () => {{
+                                    const container = document.querySelector('{container_selector}') || document;
+                                    const el = container.querySelector('.rpage-page[data-page="{page_num}"]');
+                                    if (!el) return null;
+                                    const img = el.querySelector('img.rpage-page__img');
+                                    if (!img) return null;
+                                    if (img.dataset && img.dataset.src && (!img.src || img.src.includes('data:'))) {{
+                                        img.src = img.dataset.src;
+                                    }}
+                                    return img.src && !img.src.includes('data:') ? img.src : null;
+                                }}
+                            """)
+
+                            self._browser_pause(page, 300)
+
+                            if page_src:
+                                url_to_page[page_src] = page_num
+                                if on_image:
+                                    on_image(page_src)
+
+                            if (idx + 1) % 10 == 0 or idx + 1 == total_pages:
+                                self.log_message(
+                                    f"  Scrolled to page {idx + 1}/{total_pages}, intercepted {len(intercepted_images)} images...",
+                                    "info",
+                                )
+
+                        # Wait a bit for any remaining in-flight requests
+                        self._browser_pause(page, 2000)
+
+                        # Filter intercepted images to only comic CDN images, strip query params & deduplicate
+                        comic_cdn_domains = {"wowpic4.store", "wowpic", "ek10"}
+                        filtered_by_domain = {}
+                        for url, body in intercepted_images.items():
+                            domain = urlparse(url).netloc
+                            if any(d in domain for d in comic_cdn_domains):
+                                base_url = urljoin(url, urlparse(url).path)
+                                if base_url not in filtered_by_domain:
+                                    filtered_by_domain[base_url] = body
+
+                        # Also match base URLs (without query params) for url_to_page
+                        url_to_page_normalized = {}
+                        for url, page_num in url_to_page.items():
+                            url_to_page_normalized[url] = page_num
+                            base_url = urljoin(url, urlparse(url).path)
+                            if base_url != url:
+                                url_to_page_normalized[base_url] = page_num
+
+                        # Sort filtered images by their data-page number
+                        sorted_urls = sorted(
+                            filtered_by_domain.keys(),
+                            key=lambda u: url_to_page_normalized.get(u, 999999),
+                        )
+
+                        # Only keep URLs that have a page mapping (excludes thumbnails, related chapters, etc.)
+                        mapped_urls = [
+                            u
+                            for u in sorted_urls
+                            if url_to_page_normalized.get(u, 999999) <= total_pages
+                        ]
+                        unmapped_count = len(sorted_urls) - len(mapped_urls)
+                        if unmapped_count:
+                            self.log_message(
+                                f"  Skipped {unmapped_count} unmapped CDN images (thumbnails, related chapters, etc.)",
+                                "info",
+                            )
+
+                        # Convert intercepted network responses to base64 for images_data (in page order)
+                        for url in mapped_urls:
+                            body = filtered_by_domain[url]
+                            images_data[url] = base64.b64encode(body).decode("ascii")
+
+                        self.log_message(
+                            f"  Network interception captured {len(images_data)} unique images",
+                            "ok",
+                        )
+
+                        # If network interception didn't get everything, fall back to
+                        # DOM scanning + fetch for whatever is currently visible
+                        if len(images_data) < total_pages:
+                            self.log_message(
+                                f"  Network got {len(images_data)}/{total_pages}, supplementing with DOM scan...",
+                                "info",
+                            )
+                            # Scroll back to top and do a full pass
+                            if scroll_container_js:
+                                page.evaluate(f"""
+                                    () => {{
+                                        const el = document.querySelector('{scroll_container_js}');
+                                        if (el) el.scrollTop = 0;
+                                    }}
+                                """)
+                            else:
+                                page.evaluate("window.scrollTo(0, 0)")
+                            self._browser_pause(page, 1000)
+
+                            for idx, page_num in enumerate(page_info):
+                                if not self.running:
+                                    break
+                                if len(images_data) >= total_pages:
+                                    break
+
+                                page.evaluate(f"""
+                                    () => {{
+                                        const container = document.querySelector('{container_selector}') || document;
+                                        const el = container.querySelector('.rpage-page[data-page="{page_num}"]');
+                                        if (el) el.scrollIntoView({{behavior: 'instant', block: 'center'}});
+                                    }}
+                                """)
+                                self._browser_pause(page, 400)
+
+                                # Grab whatever img src is currently in the DOM for this page
+                                dom_scan_js = f"""
+                                    const container = document.querySelector('{container_selector}') || document;
+                                    const imgs = container.querySelectorAll('.rpage-page__img');
+                                    for (const img of imgs) {{
+                                        const src = img.src || img.dataset.src;
+                                        if (!src || src.includes('data:image') || existingKeys.includes(src)) continue;
+                                        if (img.tagName === 'CANVAS') continue;
+                                        if (!img.complete || !img.naturalWidth) continue;
+                                        results[src] = true;
+                                    }}
+                                """
+                                new_urls = page.evaluate(
+                                    """(existingKeys) => {
+                                        const results = {};
+                                        """
+                                    + dom_scan_js
+                                    + """
+                                        return Object.keys(results);
+                                    }
+                                """,
+                                    list(images_data.keys()),
+                                )
+
+                                for img_url in new_urls:
+                                    if img_url in images_data:
+                                        continue
+                                    try:
+                                        b64 = page.evaluate(
+                                            """
+                                            async (url) => {
+                                                try {
+                                                    const resp = await fetch(url, {mode: 'cors'});
+                                                    const buf = await resp.arrayBuffer();
+                                                    const bytes = new Uint8Array(buf);
+                                                    let binary = '';
+                                                    for (let i = 0; i < bytes.length; i++) {
+                                                        binary += String.fromCharCode(bytes[i]);
+                                                    }
+                                                    return btoa(binary);
+                                                } catch(e) {
+                                                    return null;
+                                                }
+                                            }
+                                        """,
+                                            img_url,
+                                        )
+                                        if b64 and len(b64) > 100:
+                                            images_data[img_url] = b64
+                                            if on_image:
+                                                on_image(img_url, base64.b64decode(b64))
+                                    except:
+                                        pass
+
+                            self.log_message(
+                                f"  After DOM supplement: {len(images_data)} images total",
+                                "ok",
+                            )
+                    else:
+                        # Fallback: pixel-based scrolling if no data-page attributes found
+                        self.log_message(
+                            "  No data-page attributes found, falling back to pixel scroll...",
+                            "info",
+                        )
+                        scroll_pos = 0
+                        scroll_step = 1500
+                        stale_count = 0
+                        total_est = len(image_urls) if image_urls else 150
+
+                        for target_page in range(0, total_est + 1):
+                            if not self.running:
+                                break
+
+                            if scroll_container_js:
+                                page.evaluate(f"""
+                                    () => {{
+                                        const el = document.querySelector('{scroll_container_js}');
+                                        if (el) el.scrollTop = {scroll_pos};
+                                    }}
+                                """)
+                            else:
+                                page.evaluate(f"window.scrollTo(0, {scroll_pos})")
+
+                            self._browser_pause(page, 400)
+
+                            batch = page.evaluate(
+                                """
+                                (existingKeys) => {
+                                    const results = {};
+                                    const imgs = document.querySelectorAll('.rpage-page__img');
+                                    for (const img of imgs) {
+                                        const src = img.src || img.dataset.src;
+                                        if (!src || src.includes('data:image') || existingKeys.includes(src)) continue;
+                                        if (img.tagName === 'CANVAS') continue;
+                                        if (!img.complete || !img.naturalWidth) continue;
+                                        results[src] = 'pending_fetch';
+                                    }
+                                    return results;
+                                }
+                            """,
+                                list(images_data.keys()),
+                            )
+
+                            for img_url in batch:
+                                if img_url in images_data:
+                                    continue
+                                try:
+                                    b64 = page.evaluate(
+                                        """
+                                        async (url) => {
+                                            try {
+                                                const resp = await fetch(url, {mode: 'cors'});
+                                                const buf = await resp.arrayBuffer();
+                                                const bytes = new Uint8Array(buf);
+                                                let binary = '';
+                                                for (let i = 0; i < bytes.length; i++) {
+                                                    binary += String.fromCharCode(bytes[i]);
+                                                }
+                                                return btoa(binary);
+                                            } catch(e) {
+                                                return null;
+                                            }
+                                        }
+                                    """,
+                                        img_url,
+                                    )
+                                    if b64 and len(b64) > 100:
+                                        images_data[img_url] = b64
+                                        if on_image:
+                                            on_image(img_url, base64.b64decode(b64))
+                                except:
+                                    pass
+
+                            new_count = len(images_data)
+                            if target_page % 10 == 0:
+                                self.log_message(
+                                    f"  Captured {new_count} images so far (scroll ~{scroll_pos}px)...",
+                                    "info",
+                                )
+
+                            if new_count > 0 and new_count == stale_count:
+                                stale_count += 1
+                                if stale_count > 15:
+                                    self.log_message(
+                                        "  No new images for a while, stopping scroll...",
+                                        "info",
+                                    )
+                                    break
+                            else:
+                                stale_count = 0
+
+                            scroll_pos += scroll_step
+
+                else:
+                    self.log_message(
+                        "Scrolling like a madman to trigger lazy images...", "info"
+                    )
+                    page_height = page.evaluate("document.body.scrollHeight")
+                    viewport_height = page.evaluate("window.innerHeight")
+
+                    scroll_steps = max(20, int(page_height / viewport_height) + 5)
+                    for i in range(scroll_steps):
+                        page.evaluate(
+                            f"window.scrollTo(0, {i * viewport_height * 0.8})"
+                        )
+                        self._browser_pause(page, 400)
+
+                    page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+                    self._browser_pause(page, 3000)
+
+                    # Final grab for non-SPA: fetch-based to avoid CORS canvas taint
+                    self.log_message("Ripping images from browser memory...", "info")
+                    all_urls = page.evaluate("""
+                        () => {
+                            const urls = [];
+                            const images = document.querySelectorAll('img');
+                            for (const img of images) {
+                                const src = img.src || img.dataset.src || img.dataset.lazySrc;
+                                if (!src || src.includes('data:image') || src.includes('1x1')) continue;
+                                if (!img.complete || !img.naturalWidth || !img.naturalHeight) continue;
+                                urls.push(src);
+                            }
+                            return urls;
+                        }
+                    """)
+                    for img_url in all_urls:
+                        if img_url in images_data:
+                            continue
+                        try:
+                            b64 = page.evaluate(
+                                """
+                                async (url) => {
+                                    try {
+                                        const resp = await fetch(url, {mode: 'cors'});
+                                        const buf = await resp.arrayBuffer();
+                                        const bytes = new Uint8Array(buf);
+                                        let binary = '';
+                                        for (let i = 0; i < bytes.length; i++) {
+                                            binary += String.fromCharCode(bytes[i]);
+                                        }
+                                        return btoa(binary);
+                                    } catch(e) {
+                                        return null;
+                                    }
+                                }
+                            """,
+                                img_url,
+                            )
+                            if b64 and len(b64) > 100:
+                                images_data[img_url] = b64
+                                if on_image:
+                                    on_image(img_url, base64.b64decode(b64))
+                        except:
+                            pass
+
+                context.close()
+                browser.close()
+
+                return list(images_data.keys())
+
+        except Exception as e:
+            self.log_message(f"Browser batch download failed: {str(e)[:100]}", "warn")
+            return []
+
+    def download_image_with_browser(self, img_url: str, referer_url: str) -> bytes:
+        if not PLAYWRIGHT_AVAILABLE:
+            raise RuntimeError("Playwright not installed, can't browser mode this")
+        from playwright.sync_api import sync_playwright
+
+        try:
+            with sync_playwright() as p:
+                browser = p.chromium.launch(
+                    headless=True,
+                    args=[
+                        "--disable-blink-features=AutomationControlled",
+                        "--no-sandbox",
+                        "--disable-web-security",
+                        "--disable-features=IsolateOrigins,site-per-process",
+                    ],
+                )
+                context = browser.new_context(
+                    user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+                    viewport={"width": 1920, "height": 1080},
+                    extra_http_headers={
+                        "Accept": "image/avif,image/webp,image/apng,image/*,*/*;q=0.8",
+                        "Accept-Language": "en-US,en;q=0.9",
+                    },
+                    ignore_https_errors=True,
+                )
+
+                context.add_init_script("""
+                    Object.defineProperty(navigator, 'webdriver', {
+                        get: () => undefined
+                    });
+                """)
+
+                page = context.new_page()
+
+                try:
+                    self._browser_goto(page, referer_url, "networkidle", 30000)
+                    self._browser_pause(page, 2000)
+                    page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+                    self._browser_pause(page, 1000)
+                except Exception as e:
+                    self.log_message(f"    Page threw a tantrum: {str(e)[:50]}", "warn")
+
+                try:
+                    img_selector = f'img[src="{img_url}"], img[data-src="{img_url}"]'
+                    if page.locator(img_selector).count() > 0:
+                        img_data = page.evaluate(f"""
+                            async () => {{
+                                const img = document.querySelector('img[src="{img_url}"], img[data-src="{img_url}"]');
+                                if (!img) return null;
+                                const canvas = document.createElement('canvas');
+                                canvas.width = img.naturalWidth;
+                                canvas.height = img.naturalHeight;
+                                const ctx = canvas.getContext('2d');
+                                ctx.drawImage(img, 0, 0);
+                                return canvas.toDataURL('image/webp').split(',')[1];
+                            }}
+                        """)
+
+                        if img_data:
+                            content = base64.b64decode(img_data)
+                            context.close()
+                            browser.close()
+                            return content
+                except:
+                    pass
+
+                response = self._browser_goto(page, img_url, "domcontentloaded", 20000)
+                if response and response.ok:
+                    content = response.body()
+                    context.close()
+                    browser.close()
+                    return content
+                else:
+                    context.close()
+                    browser.close()
+                    raise ValueError(
+                        f"Download failed with status {response.status if response else 'unknown'}"
+                    )
+
+        except Exception as e:
+            raise RuntimeError(f"Browser download error: {str(e)}")
+
+    def fetch_page(
+        self, url: str, use_browser: bool, on_image=None, on_html=None
+    ) -> str:
+        domain = urlparse(url).netloc.lower()
+        if "rawkuma.net" in domain:
+            self.log_message(
+                f"{domain} detected, using direct HTTP fetch instead of browser.",
+                "info",
+            )
+            r = self._request(
+                "get", url, headers={"User-Agent": "Mozilla/5.0"}, timeout=30
+            )
+            r.raise_for_status()
+            return r.text
+
+        if use_browser and PLAYWRIGHT_AVAILABLE:
+            from playwright.sync_api import sync_playwright
+
+            for attempt in range(1, 4):
+                try:
+                    with sync_playwright() as p:
+                        browser = p.chromium.launch(
+                            headless=True,
+                            args=[
+                                "--disable-blink-features=AutomationControlled",
+                                "--no-sandbox",
+                            ],
+                        )
+                        context = browser.new_context(
+                            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+                            viewport={"width": 1280, "height": 900},
+                        )
+                        page = context.new_page()
+
+                        if on_image:
+                            # Images the browser loads while scrolling get handed
+                            # over, so the download loop doesn't fetch them again
+                            def _on_response(response):
+                                try:
+                                    if response.status != 200:
+                                        return
+                                    ct = response.headers.get("content-type", "")
+                                    if "image" in ct:
+                                        body = response.body()
+                                        if body and len(body) > 1000:
+                                            on_image(response.url, body)
+                                except Exception:
+                                    pass
+
+                            page.on("response", _on_response)
+
+                        def safe_eval(script, *args):
+                            try:
+                                if args:
+                                    return page.evaluate(script, *args)
+                                return page.evaluate(script)
+                            except Exception as e:
+                                self.log_message(
+                                    f"  Browser evaluate failed: {str(e)[:120]}",
+                                    "warn",
+                                )
+                                return None
+
+                        try:
+                            is_spa = any(
+                                d in domain for d in ["comix.to", "cocomic.co"]
+                            )
+                            is_mangaball = "mangaball.net" in domain
+
+                            if is_spa or is_mangaball:
+                                self.log_message(
+                                    f"{domain} detected - using networkidle...",
+                                    "info",
+                                )
+                                self._browser_goto(page, url, "networkidle", 90000)
+                            else:
+                                self.log_message(
+                                    f"Navigating to {domain} using domcontentloaded...",
+                                    "info",
+                                )
+                                self._browser_goto(page, url, "domcontentloaded", 60000)
+
+                            try:
+                                page.wait_for_load_state(
+                                    (
+                                        "networkidle"
+                                        if is_spa or is_mangaball
+                                        else "domcontentloaded"
+                                    ),
+                                    timeout=15000,
+                                )
+                            except Exception:
+                                pass
+
+                            if is_mangaball:
+                                try:
+                                    page.wait_for_selector(
+                                        "#mangaPages, .manga-pages", timeout=60000
+                                    )
+                                except Exception:
+                                    self.log_message(
+                                        "mangaball.net selector did not appear before timeout.",
+                                        "warn",
+                                    )
+
+                            self._browser_pause(page, 2500)
+
+                            lazy_images_js = """
+                                () => {
+                                    document.querySelectorAll('img[data-src], img[data-lazy], img[data-lazy-src], img[data-original]').forEach(img => {
+                                        if (img.dataset.src) img.src = img.dataset.src;
+                                        if (img.dataset.lazy) img.src = img.dataset.lazy;
+                                        if (img.dataset.lazySrc) img.src = img.dataset.lazySrc;
+                                        if (img.dataset.original) img.src = img.dataset.original;
+                                    });
+                                }
+                            """
+                            safe_eval(lazy_images_js)
+
+                            if on_html:
+                                # First look at the page before the long scroll
+                                try:
+                                    on_html(page.content())
+                                except Exception as e:
+                                    self.log_message(
+                                        f"  Early snapshot failed: {str(e)[:100]}",
+                                        "warn",
+                                    )
+
+                            if is_spa:
+                                scroll_container = safe_eval("""
+                                    () => {
+                                        const main = document.querySelector('.rpage-main');
+                                        if (main && (main.scrollHeight > main.clientHeight || getComputedStyle(main).overflow !== 'visible')) {
+                                            return '.rpage-main';
+                                        }
+                                        const inner = document.querySelector('.rpage-main__inner');
+                                        if (inner && inner.scrollHeight > inner.clientHeight) {
+                                            return '.rpage-main__inner';
+                                        }
+                                        return null;
+                                    }
+                                """)
+                                self.log_message(
+                                    f"  SPA scroll container: {scroll_container or 'window'}",
+                                    "info",
+                                )
+
+                                scroll_pos = 0
+                                scroll_step = 2000
+                                while True:
+                                    if scroll_container:
+                                        safe_eval(f"""
+                                            () => {{
+                                                const el = document.querySelector('{scroll_container}');
+                                                if (el) el.scrollTop = {scroll_pos};
+                                            }}
+                                        """)
+                                    else:
+                                        safe_eval(f"window.scrollTo(0, {scroll_pos})")
+                                    self._browser_pause(page, 300)
+                                    at_bottom = safe_eval(f"""
+                                        () => {{
+                                            const el = {scroll_container and f"document.querySelector('{scroll_container}')" or "window"};
+                                            const scrollTop = el === window ? window.scrollY : el.scrollTop;
+                                            const scrollHeight = el === window ? document.body.scrollHeight : el.scrollHeight;
+                                            const clientHeight = el === window ? window.innerHeight : el.clientHeight;
+                                            return (scrollTop + clientHeight) >= scrollHeight - 100;
+                                        }}
+                                    """)
+                                    if at_bottom and scroll_pos > 2000:
+                                        break
+                                    scroll_pos += scroll_step
+                                self._browser_pause(page, 2000)
+                            else:
+                                page_height = (
+                                    safe_eval("document.body.scrollHeight") or 0
+                                )
+                                viewport_height = (
+                                    safe_eval("window.innerHeight") or 1080
+                                )
+                                scroll_steps = max(
+                                    25, int(page_height / viewport_height) + 5
+                                )
+
+                                for i in range(scroll_steps):
+                                    safe_eval(
+                                        f"window.scrollTo(0, {i * viewport_height * 0.75})"
+                                    )
+                                    self._browser_pause(page, 500)
+
+                            safe_eval("window.scrollTo(0, document.body.scrollHeight)")
+                            self._browser_pause(page, 2000)
+                            safe_eval("window.scrollTo(0, 0)")
+                            self._browser_pause(page, 1000)
+
+                            html = page.content()
+                            if len(html) < 4000:
+                                raise ValueError("Sus page, too short")
+                            return html
+                        finally:
+                            try:
+                                context.close()
+                            except Exception:
+                                pass
+                            try:
+                                browser.close()
+                            except Exception:
+                                pass
+                except Exception as e:
+                    self.log_message(
+                        f"Browser attempt {attempt}/3 failed: {str(e)[:100]}", "warn"
+                    )
+                    self.cancel_token.sleep(2.5)
+            raise RuntimeError("Browser gave up after 3 tries, site too stronk")
+
+        r = self._request("get", url, headers={"User-Agent": "Mozilla/5.0"}, timeout=25)
+        r.raise_for_status()
+        return r.text
+
+    def extract_image_urls(self, html: str, base_url: str) -> list:
+        from bs4 import BeautifulSoup
+
+        with self.metrics.stage("parse"):
+            soup = BeautifulSoup(html, "html.parser")
+        # Kept in page (DOM) order, it's the tiebreak when num_key can't tell
+        candidates = {}
+
+        domain = urlparse(base_url).netloc.lower()
+        self.log_message(f"Scraping: {domain}", "info")
+        if "mangaball.net" in domain:
+            self.log_message(
+                "mangaball.net support is currently broken/WIP. The downloader will skip special mangaball extraction.",
+                "warn",
+            )
+
+        def num_key(s):
+            patterns = [
+                r"ch[_-]?\d+[_-](\d+)",
+                r"/(\d+)\.(?:jpg|jpeg|png|webp)",
+                r"/(\d+)-[a-z]+\.(?:jpg|jpeg|png|webp)",
+                r"page[_-]?(\d+)",
+                r"c_\d+_(\d+)",
+                r"(\d+)(?:-\d+)?\.(?:jpg|jpeg|png|webp)",
+            ]
+            for pattern in patterns:
+                m = re.search(pattern, s.lower())
+                if m:
+                    return int(m.group(1))
+            return 999999  # idk
+
+        # rawkuma.net: extract images from the reader section and CDN src patterns
+        if "rawkuma.net" in domain:
+            rawkuma_imgs = soup.select(
+                "section[data-image-data] img, img[src*='rcdn.kyut.dev']"
+            )
+            if rawkuma_imgs:
+                for img in rawkuma_imgs:
+                    for src in self._get_img_sources(img, base_url):
+                        if src:
+                            candidates[src] = None
+                if candidates:
+                    ordered = sorted(candidates, key=num_key)
+                    self.log_message(
+                        f"rawkuma.net: extracted {len(ordered)} images from reader HTML",
+                        "ok",
+                    )
+                    return ordered
+
+        # mangaball.net support is currently disabled and is in WIP .
+        # if "mangaball.net" in domain:
+        #     page_items = soup.select("#mangaPages .manga-page[data-page]")
+        #     ordered = []
+        #     if page_items:
+        #         def page_num(el):
+        #             try:
+        #                 return int(el.get("data-page", "999999"))
+        #             except (ValueError, TypeError):
+        #                 return 999999
+
+        #         page_items.sort(key=page_num)
+        #         for page_item in page_items:
+        #             img = page_item.select_one("img")
+        #             if img:
+        #                 for src in self._get_img_sources(img, base_url):
+        #                     if src:
+        #                         ordered.append(src)
+
+        #     if not ordered:
+        #         alt_imgs = soup.select("#mangaPages img, .manga-pages img, img.manga-image")
+        #         for img in alt_imgs:
+        #             for src in self._get_img_sources(img, base_url):
+        #                 if src:
+        #                     ordered.append(src)
+
+        #     ordered = [u for u in ordered if u]
+        #     if ordered:
+        #         ordered = sorted(ordered, key=num_key)
+        #         self.log_message(
+        #             f"mangaball.net: extracted {len(ordered)} page images sorted for download",
+        #             "ok",
+        #         )
+        #         self.log_message(
+        #             f"Got {len(ordered)} clean images ready to download", "ok"
+        #         )
+        #         return ordered
+
+        # comix.to: extract ONLY from rpage-page__img, sorted by data-page number
+        if "comix.to" in domain:
+            pages = soup.select(".rpage-page[data-page]")
+            if pages:
+
+                def page_num(el):
+                    try:
+                        return int(el.get("data-page", "999999"))
+                    except (ValueError, TypeError):
+                        return 999999
+
+                pages.sort(key=page_num)
+                ordered = []
+                for p in pages:
+                    img = p.select_one("img.rpage-page__img")
+                    if img:
+                        for src in self._get_img_sources(img, base_url):
+                            if src and "wowpic" in src:
+                                ordered.append(src)
+                if ordered:
+                    self.log_message(
+                        f"comix.to: extracted {len(ordered)} page images sorted by data-page",
+                        "ok",
+                    )
+                    self.log_message(
+                        f"Got {len(ordered)} clean images ready to download", "ok"
+                    )
+                    return ordered
+
+        selectors = [
+            # Comix.to (React SPA)
+            "img.rpage-page__img",
+            ".rpage-page img",
+            ".rpage-main img",
+            # Cocomic.co / Madara theme
+            ".reading-content img.wp-manga-chapter-img",
+            ".entry-content img.wp-manga-chapter-img",
+            ".page-break img.wp-manga-chapter-img",
+            ".reading-content .page-break img",
+            # FlameComics
+            ".mantine-Stack-root img[alt*='Chapter']",
+            ".m_6d731127 img",
+            # MangaBall
+            "img.manga-image",
+            "img.lazy-load",
+            "img.lazy-loaded",
+            # KuraManga
+            ".container img[alt*='Chapter']",
+            # LuaComic
+            ".container .flex img.lazy",
+            ".container .flex img",
+            # uhhh just patterns
+            "section[aria-label*='Chapter'] img.lazy-image",
+            "figure[data-index] img.mr-img",
+            "figure[data-index] img",
+            ".read-viewer .page img",
+            ".read-viewer img",
+            ".viewer-wrapper img",
+            "div.page-break img",
+            ".main-col-inner img",
+            "#readerarea img",
+            ".reading-content img",
+            ".page-break img",
+            ".chapter-content img",
+            ".wt_viewer img",
+            "#chapter_area img",
+            ".manga-reader img",
+            "[aria-label*='Chapter'] img",
+            ".read-container img",
+            "#chapter_boxImages img",
+            "#toon_img img",
+            ".image_story img",
+            ".imageChap img",
+            ".img-responsive.image-chapter",
+            ".mr-img",
+            "article.prose img",
+            "main#main-content img",
+            ".manga-pages img",
+            ".manga-page img",
+            ".page-container img",
+            "img.manga-image",
+        ]
+
+        for sel in selectors:
+            elements = soup.select(sel)
+            if elements:
+                self.log_message(
+                    f"Hit: {len(elements)} images with {sel[:30]}...", "info"
+                )
+                for img in elements:
+                    for src in self._get_img_sources(img, base_url):
+                        if src:
+                            candidates[src] = None
+
+        if len(candidates) < 6:
+            self.log_message("Plan B: searching all containers for images...", "warn")
+            containers = soup.find_all(["div", "section", "article", "main"])
+            best = max(containers, key=lambda d: len(d.find_all("img")), default=None)
+            if best:
+                imgs = best.find_all("img")
+                self.log_message(f"Found container with {len(imgs)} images", "info")
+                for img in imgs:
+                    for src in self._get_img_sources(img, base_url):
+                        if src:
+                            candidates[src] = None
+
+        if len(candidates) < 5:
+            self.log_message(
+                "Plan C: unleashing the regex beast (that was cringe)", "warn"
+            )
+            rx = re.findall(
+                r'https?://[^\s"\'<>]+\.(?:jpe?g|png|webp|avif)(?:\?[^\s"\'<>]*)?',
+                html,
+                re.I,
+            )
+            candidates.update(dict.fromkeys(rx))
+
+        filtered = []
+        seen = set()
+        for u in candidates:
+            if u in seen:
+                continue
+            seen.add(u)
+            if self._is_valid_image_url(u, base_url):
+                filtered.append(u)
+
+        filtered.sort(key=num_key)
+
+        completed_urls = self._complete_sequential_patterns(filtered, base_url, soup)
+        if len(completed_urls) > len(filtered):
+            self.log_message(
+                f"🔍 Pattern detection: Found {len(completed_urls) - len(filtered)} additional images!",
+                "ok",
+            )
+            filtered = completed_urls
+
+        self.log_message(f"Got {len(filtered)} clean images ready to download", "ok")
+        return filtered
+
+    def _complete_sequential_patterns(
+        self, urls: list, base_url: str, soup=None
+    ) -> list:
+        if len(urls) < 3:
+            return urls
+
+        # Try to find a common base URL and number pattern
+        # Pattern: /path/01.ext, 02.ext, 03.ext, etc.
+        pattern_match = re.search(r"^(.*?)(\d{2,3})(\.[\w]+)(?:\?.*)?$", urls[0])
+        if not pattern_match:
+            return urls
+
+        base_part = pattern_match.group(1)
+        ext_part = pattern_match.group(3)
+
+        verified = True
+        numbers_found = []
+        number_strings = []
+        for url in urls[:5]:
+            match = re.search(
+                r"^" + re.escape(base_part) + r"(\d{2,3})" + re.escape(ext_part), url
+            )
+            if match:
+                number_strings.append(match.group(1))
+                numbers_found.append(int(match.group(1)))
+            else:
+                verified = False
+                break
+
+        if not verified or len(numbers_found) < 2:
+            return urls
+
+        # Check if the HTML hints at how many images there should be
+        # Look for progress bar like "1/11" or count empty page divs
+        expected_count = self._estimate_total_images(soup)
+
+        if expected_count <= len(urls):
+            return urls  # We already have all images (this should work for comix.to where they show all images but some are hidden until you scroll)
+
+        min_num = min(numbers_found)
+        max_num = max(numbers_found)
+        if expected_count > max_num:
+            max_num = expected_count
+        complete_urls = []
+        existing_urls_set = set(urls)
+        num_digits = (
+            len(number_strings[0]) if number_strings else 2
+        )  # Gonna use original string length to preserve the leading zeros
+
+        for num in range(min_num, max_num + 1):
+            url = f"{base_part}{num:0{num_digits}d}{ext_part}"
+            if url in existing_urls_set:
+                complete_urls.append(next(u for u in urls if u.startswith(url)))
+            else:
+                complete_urls.append(url)
+
+        return complete_urls if len(complete_urls) > len(urls) else urls
+
+    def _estimate_total_images(self, soup) -> int:
+        """
+        This function right here is just to estimate how many images should be on the page based on the HTML structure.
+        pattern right?????? right?????!!!!!!!!.
+        """
+        if not soup:
+            return 0
+
+        # Method 0: comix.to uses data-page attributes on page containers
+        page_elements = soup.select("[data-page]")
+        if page_elements:
+            max_page = max(
+                (
+                    int(el.get("data-page", 0))
+                    for el in page_elements
+                    if el.get("data-page", "").isdigit()
+                ),
+                default=0,
+            )
+            if max_page > 0:
+                self.log_message(
+                    f"detected {max_page} pages from data-page attributes (comix.to)",
+                    "info",
+                )
+                return max_page
+
+        # Method 1: count empty page divs in viewer wrappers (comix.to style)
+        page_divs = soup.select(
+            ".viewer-wrapper .page, .read-viewer .page, .rpage-page"
+        )
+        if page_divs:
+            total_divs = len(page_divs)
+            if total_divs > 0:
+                self.log_message(
+                    f"detected {total_divs} page containers in HTML", "info"
+                )
+                return total_divs
+
+        # Method 2: look for progress bar line like "1/11"
+        progress = soup.select_one(".progress-line")
+        if progress:
+            text = progress.get_text(strip=True)
+            # extract numbers like "111" meaning page 1 to 11
+            if len(text) >= 2 and text.isdigit():
+                # pattern: "111" = page 1 to 11
+                last_digit = int(text[-1])
+                remaining = text[:-1]
+                if remaining.isdigit():
+                    total = int(remaining + text[-1])
+                    if total > last_digit:
+                        self.log_message(
+                            f"detected {total} pages from progress bar", "info"
+                        )
+                        return total
+
+        return 0
+
+    def _get_img_sources(self, img, base):
+        attrs = [
+            "data-src",
+            "src",
+            "data-lazy-src",
+            "data-original",
+            "data-lazy",
+            "data-srcset",
+            "srcset",
+        ]
+        srcs = []
+        for a in attrs:
+            v = img.get(a)
+            if v and v.strip():
+                if any(
+                    p in v.lower()
+                    for p in ["/1x1.", "placeholder", "loading", "lazy.", "data:image"]
+                ):
+                    continue
+                if a in ["srcset", "data-srcset"]:
+                    v = v.split(",")[0].strip().split()[0]
+                full = self.normalize_url(v, base)
+                if full and full.startswith(("http://", "https://")):
+                    srcs.append(full)
+        return srcs
+
+    def normalize_url(self, src: str, base: str) -> str:
+        src = (src or "").strip()
+        if not src:
+            return ""
+        if src.startswith("//"):
+            return "https:" + src
+        if src.startswith("/"):
+            return urljoin(base, src)
+        if not src.startswith(("http://", "https://")):
+            return urljoin(base, src)
+        return src
+
+    def _is_valid_image_url(self, url: str, chapter_url: str) -> bool:
+        if not url.startswith(("http", "https")):
+            return False
+
+        low = url.lower()
+
+        if self.exclude_gifs_var.get() and low.endswith(".gif"):
+            return False
+
+        placeholders = [
+            "/1x1.",
+            "placeholder",
+            "loading.",
+            "lazy.",
+            "blank.",
+            "transparent.",
+        ]
+        if any(p in low for p in placeholders):
+            return False
+
+        junk = [
+            "logo",
+            "banner",
+            "icon",
+            "avatar",
+            "thumb",
+            "cover.webp",
+            "cover.jpg",
+            "ad-",
+            "advert",
+            "emoji",
+            "999.png",
+            "discord.webp",
+            "facebook",
+            "twitter",
+            "instagram",
+            "patreon",
+            "kofi",
+            "paypal",
+            "donate",
+            "sprite",
+            "button",
+            "read_on_flame",
+            "commission",
+            "message.png",
+            "reaction",
+            "sticker",
+            "emote",
+            "smil",
+            "face-",
+            "icon-",
+            "ui-",
+        ]
+
+        if self.aggressive_comments_var.get():
+            junk += ["comment", "disqus", "reply", "fb_", "social", "share", "widget"]
+
+        if any(k in low for k in junk):
+            return False
+
+        good = [
+            ".jpg",
+            ".jpeg",
+            ".png",
+            ".webp",
+            "cdn",
+            "scans",
+            "storage",
+            "media",
+            "image",
+            "chapter",
+            "manga",
+            "manhwa",
+            "manhua",
+            "tnlycdn",
+            "lastation",
+            "toonily",
+            "manhwazone",
+            "manhwatop",
+            "comix",
+            "wowpic",
+            "data.",
+            "flamecomics",
+            "mangaball",
+            "kuramanga",
+            "luacomic",
+            "shadowabyss",
+            "jigglypuff",
+            "poke-black-and-white",
+            "cocomic",
+            "img.cocomic",
+            "rpage",
+        ]
+
+        return any(x in low for x in good)
+
+    def get_output_directory(self, html: str, url: str, base_dir: str) -> Path:
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(html, "html.parser")
+
+        og_title = soup.find("meta", property="og:title")
+        title = (og_title["content"] if og_title else soup.title.string or "").strip()
+
+        if " - " in title:
+            parts = [p.strip() for p in title.split(" - ")]
+            comic = parts[0]
+            chapter = " - ".join(parts[1:])
+        elif "Chapter" in title or "Episode" in title:
+            if "Chapter" in title:
+                comic, chapter = title.split("Chapter", 1)
+            else:
+                comic, chapter = title.split("Episode", 1)
+            comic = comic.strip()
+            chapter = ("Chapter" if "Chapter" in title else "Episode") + chapter.strip()
+        else:
+            comic = "Unknown Comic"
+            chapter = title or "Chapter"
+
+        comic = (
+            re.sub(
+                r"(Manhwa|Manga|Manhua|Read|Online|Latest).*", "", comic, flags=re.I
+            ).strip()
+            or "Comic"
+        )
+        chapter = (
+            re.sub(
+                r"(Chapter|Episode|Ch\.?|Ep\.?)\s*", "Ch. ", chapter, flags=re.I
+            ).strip()
+            or "Chapter"
+        )
+
+        return Path(base_dir) / self._sanitize(comic) / self._sanitize(chapter)
+
+    def _sanitize(self, s: str) -> str:
+        s = re.sub(r'[<>:"/\\|?*]', "", s)
+        return re.sub(r"\s+", " ", s).strip()[:85] or "Unknown"
+
+    def _complete_sequential_urls(self, urls: list, html: str) -> list:
+        if len(urls) < 3:
+            return urls  # 3 to detect pattern
+
+        # numbered URLs like 01.webp, 02.webp, and etc
+        pattern_match = re.search(r"(.+/)(\d{2,3})\.(webp|jpg|jpeg|png)", urls[0])
+        if not pattern_match:
+            return urls
+
+        base_url = pattern_match.group(1)
+        first_num = int(pattern_match.group(2))
+        ext = pattern_match.group(3)
+        num_digits = len(pattern_match.group(2))
+
+        # verification on all URLs that follow this pattern
+        sequential = []
+        for url in urls:
+            match = re.search(r"(\d{2,3})\." + ext + r"$", url)
+            if match and url.startswith(base_url):
+                sequential.append(int(match.group(1)))
+
+        if len(sequential) < 3:
+            return urls  # pattern doesn't match enough URLs
+
+        # checking for the page count in HTML( with the common patterns)
+        page_indicators = [
+            r"<div>(\d+)</div>.*?progress",  # progress bar
+            r'"pages?"\s*:\s*(\d+)',  # JSON page count
+            r"Page\s+\d+\s+of\s+(\d+)",  # "Page 1 of 11"
+            r"(\d+)\s+pages?",  # "11 pages"
+        ]
+
+        max_page = max(sequential)
+        for pattern in page_indicators:
+            match = re.search(pattern, html, re.I)
+            if match:
+                detected_count = int(match.group(1))
+                if detected_count > max_page and detected_count < 200:
+                    max_page = detected_count
+                    self.log_message(
+                        f"Detected {detected_count} total pages (completing lazy-loaded URLs...)",
+                        "info",
+                    )
+                    break
+
+        # generates missing URLs
+        completed = list(urls)
+        existing_nums = set(sequential)
+
+        for num in range(first_num, max_page + 1):
+            if num not in existing_nums:
+                padded_num = str(num).zfill(num_digits)
+                new_url = f"{base_url}{padded_num}.{ext}"
+                completed.append(new_url)
+
+        # we sort by numbers
+        def get_num(url):
+            match = re.search(r"(\d{2,3})\." + ext + r"$", url)
+            return int(match.group(1)) if match else 9999
+
+        return sorted(completed, key=get_num)
+
+    def generate_cbz(self, output_dir: Path, image_paths: list, cache=None):
+        owns_renderer = self.profile_renderer is None
+        try:
+            cbz_path = output_dir / f"{output_dir.name}.cbz"
+            image_paths = self._profile_pages(
+                output_dir, self._ordered_pages(output_dir, image_paths)
+            )
+            owns_cache = False
+            if not (self.convert_webp_cbz_var.get() and PIL_AVAILABLE):
+                cache = None
+            elif cache is None:
+                owns_cache = self.convert_cache is None
+                cache = self._get_convert_cache(output_dir)
+            if cache is not None:
+                # Queue every conversion up front (no-op for pages the download
+                # loop already started), then write them out in order below
+                for img_path in image_paths:
+                    if img_path.suffix.lower() == ".webp":
+                        cache.submit_path(img_path)
+
+            writer = CbzWriter(cbz_path)
+            try:
+                for index, img_path in enumerate(image_paths, 1):
+                    # Soooo cbz breaks from webp image idk why, so i just added a convert to JPG
+                    if cache and img_path.suffix.lower() == ".webp":
+                        jpg_name = img_path.stem + ".jpg"
+                        try:
+                            writer.add(index, cache.converted(img_path), jpg_name)
+                            self.log_message(
+                                f"  Converted {img_path.name} → {jpg_name}", "info"
+                            )
+                        except Exception:
+                            # Conversion failed, so just add the original (we YOLO this)
+                            writer.add(index, img_path)
+                            self.log_message(
+                                f"  Couldn't convert {img_path.name}, added as-is",
+                                "warn",
+                            )
+                    else:
+                        writer.add(index, img_path)
+                writer.close()
+            finally:
+                writer.abort()
+                if cache is not None and owns_cache:
+                    cache.close()
+                    self.convert_cache = None
+
+            self.log_message(f"✓ CBZ archive created: {cbz_path.name}", "ok")
+            return True
+        except Exception as e:
+            self.log_message(f"✗ CBZ creation failed: {e}", "error")
+            return False
+        finally:
+            if owns_renderer:
+                self._close_profile_renderer()
+
+    def _ordered_pages(self, output_dir: Path, image_paths=None) -> list:
+        if image_paths is None:
+            image_paths = [
+                p
+                for p in output_dir.iterdir()
+                if p.suffix.lower() in (".jpg", ".jpeg", ".png", ".webp")
+            ]
+        return sorted(
+            image_paths,
+            key=lambda x: (
+                int(re.search(r"(\d+)", x.stem).group(1))
+                if re.search(r"(\d+)", x.stem)
+                else 0
+            ),
+        )
+
+    def run_exports(self, output_dir: Path, formats: list, image_paths=None) -> list:
+        # The page list and every header are read once here and shared, then
+        # all formats build side by side (conversions go through the shared
+        # cache, so a page needed by two formats is still converted once)
+        owns_renderer = self.profile_renderer is None
+        pages = self._ordered_pages(output_dir, image_paths)
+        if self.stitch_var.get() and PIL_AVAILABLE:
+            try:
+                pages = self._stitch_pages(output_dir, pages)
+            except Exception as e:
+                self.log_message(
+                    f"  ⚠ Stitching failed ({str(e)[:60]}), exporting the strips as they are",
+                    "warn",
+                )
+                shutil.rmtree(output_dir / STITCH_DIR, ignore_errors=True)
+        if (
+            get_profile(self.profile_var.get())
+            and PIL_AVAILABLE
+            and not (pages and pages[0].parent.name == STITCH_DIR)
+        ):
+            started = time.perf_counter()
+            before = sum(p.stat().st_size for p in pages)
+            pages = self._profile_pages(output_dir, pages)
+            after = sum(p.stat().st_size for p in pages)
+            self.log_message(
+                f"  Resized {len(pages)} pages for {self.profile_var.get()} in {time.perf_counter() - started:.1f}s ({before // 1024} KB → {after // 1024} KB)",
+                "info",
+            )
+        headers = {p: sniff_file(p) for p in pages}
+        # Made here, not by the builders: two of them racing to create it
+        # would each think they own it, and the first done would delete
+        # .converted under the other
+        owns_cache = self.convert_cache is None
+        cache = None
+        if PIL_AVAILABLE and (
+            "PDF" in formats or ("CBZ" in formats and self.convert_webp_cbz_var.get())
+        ):
+            cache = self._get_convert_cache(output_dir)
+        builders = {
+            "CBZ": lambda: self.generate_cbz(output_dir, pages, cache),
+            "PDF": lambda: self.generate_pdf(output_dir, pages, headers, cache),
+            "EPUB": lambda: self.generate_epub(output_dir, pages, headers),
+        }
+
+        def timed(name):
+            started = time.perf_counter()
+            with self._profiled(f"generate_{name.lower()}"):
+                ok = builders[name]()
+            seconds = time.perf_counter() - started
+            self.metrics.observe(f"export.{name.lower()}", seconds)
+            return ok, seconds
+
+        created = []
+        try:
+            # One at a time when profiled on 3.12+, side by side they'd miss
+            # each other (see profiling.py)
+            workers = len(formats)
+            if self.profiler is not None and not PER_THREAD:
+                workers = 1
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+                jobs = [(name, pool.submit(timed, name)) for name in formats]
+                for name, job in jobs:
+                    ok, seconds = job.result()
+                    if ok:
+                        created.append(name)
+                        self.log_message(f"  {name} built in {seconds:.1f}s", "info")
+        finally:
+            if cache is not None and owns_cache:
+                cache.close()
+                self.convert_cache = None
+            if owns_renderer:
+                self._close_profile_renderer()
+            shutil.rmtree(output_dir / STITCH_DIR, ignore_errors=True)
+        return created
+
+    def _stitch_pages(self, output_dir: Path, pages: list) -> list:
+        # Strips are joined and re-cut to the device's screen when a profile
+        # is picked (never wider than the source), else to a 2:3 page at the
+        # width most strips share
+        widths = Counter(h[1] for h in map(sniff_file, pages) if h)
+        if not widths:
+            raise ValueError("couldn't read the strip sizes")
+        width = widths.most_common(1)[0][0]
+        profile = get_profile(self.profile_var.get())
+        if profile:
+            width = min(width, profile.width)
+            page_height = round(profile.height * width / profile.width)
+            grayscale, quality = profile.grayscale, profile.quality
+        else:
+            page_height = width * 3 // 2
+            grayscale, quality = False, 90
+
+        started = time.perf_counter()
+        stitcher = stitch_pages(
+            pages, output_dir / STITCH_DIR, width, page_height, grayscale, quality
+        )
+        dropped = f", {stitcher.dropped} blank dropped" if stitcher.dropped else ""
+        self.log_message(
+            f"  Stitched {len(pages)} strips into {len(stitcher.pages)} pages of {width}x{page_height}{dropped} in {time.perf_counter() - started:.1f}s",
+            "info",
+        )
+        return stitcher.pages
+
+    def generate_pdf(self, output_dir: Path, pages=None, headers=None, cache=None):
+        writer = None
+        owns_cache = False
+        owns_renderer = self.profile_renderer is None
+        try:
+            images = self._profile_pages(
+                output_dir, pages or self._ordered_pages(output_dir)
+            )
+            headers = headers or {}
+            if not images:
+                raise ValueError("No images found for PDF generation")
+
+            # JPEGs are embedded untouched. Everything else is converted once
+            # through the shared cache (queued up front so the pool works
+            # ahead of the writer) and then embedded the same way.
+            needs_convert = set()
+            for p in images:
+                sniffed = headers.get(p) if p in headers else sniff_file(p)
+                if not sniffed or sniffed[0] != "jpeg":
+                    needs_convert.add(p)
+            if needs_convert:
+                if cache is None:
+                    owns_cache = self.convert_cache is None
+                    cache = self._get_convert_cache(output_dir)
+                for p in images:
+                    if p in needs_convert:
+                        cache.submit_path(p)
+
+            pdf_path = output_dir / f"{output_dir.name}.pdf"
+            writer = PdfWriter(pdf_path, resolution=100.0)
+            passed_through = 0
+            for p in images:
+                if p in needs_convert:
+                    try:
+                        writer.add_jpeg(cache.converted(p).read_bytes())
+                    except Exception:
+                        # Same YOLO as the CBZ: convert this one right here
+                        writer.add_jpeg(to_jpeg_bytes(p.read_bytes()))
+                        self.log_message(
+                            f"  Cached conversion of {p.name} fell over, converted it inline",
+                            "warn",
+                        )
+                    continue
+                data = p.read_bytes()
+                try:
+                    writer.add_jpeg(data)
+                    passed_through += 1
+                except ValueError:
+                    writer.add_jpeg(to_jpeg_bytes(data))
+            writer.close()
+
+            self.log_message(
+                f"✓ PDF document created: {pdf_path.name} ({writer.pages} pages, {passed_through} JPEGs passed through)",
+                "ok",
+            )
+            return True
+        except Exception as e:
+            self.log_message(f"✗ PDF generation failed: {e}", "error")
+            return False
+        finally:
+            if writer is not None:
+                writer.abort()
+            if cache is not None and owns_cache:
+                cache.close()
+                self.convert_cache = None
+            if owns_renderer:
+                self._close_profile_renderer()
+
+    def generate_epub(self, output_dir: Path, pages=None, headers=None):
+        writer = None
+        owns_renderer = self.profile_renderer is None
+        try:
+            images = self._profile_pages(
+                output_dir, pages or self._ordered_pages(output_dir)
+            )
+            headers = headers or {}
+            if not images:
+                raise ValueError("No images found for EPUB generation")
+
+            epub_path = output_dir / f"{output_dir.name}.epub"
+            writer = EpubWriter(
+                epub_path,
+                title=f"{output_dir.parent.name} - {output_dir.name}",
+                author="Downloaded via Universal Comic Downloader",
+                language="en",
+            )
+            for img_path in images:
+                writer.add_image(img_path, headers.get(img_path))
+            writer.close()
+
+            self.log_message(
+                f"✓ EPUB ebook created: {epub_path.name} ({writer.pages} fixed-layout pages)",
+                "ok",
+            )
+            return True
+        except Exception as e:
+            self.log_message(f"✗ EPUB generation failed: {e}", "error")
+            return False
+        finally:
+            if writer is not None:
+                writer.abort()
+            if owns_renderer:
+                self._close_profile_renderer()
+
+    def _finish(self):
+        self.running = False
+        self.update_status("Ready")
+        if self.total_images:
+            self.progress_value.set(100)
+            self.progress_label.set("100%")
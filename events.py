@@ -0,0 +1,67 @@
+import queue
+import threading
+
+# The engine runs on worker threads, but Tk may only be touched from the
+# thread that owns the window. Instead of poking widgets directly, the engine
+# emits events here and the GUI drains them in batches on its own thread.
+
+
+class EventBus:
+    """Thread-safe FIFO of (kind, data) events. emit() never blocks."""
+
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+
+    def emit(self, kind: str, **data):
+        self._queue.put((kind, data))
+
+    def drain(self, limit: int = 1000) -> list:
+        events = []
+        while len(events) < limit:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return events
+
+
+class BusVar:
+    """
+    Wraps a Tk variable so any thread can get()/set() it. Reads come from a
+    plain cached value; set() only records the value and emits a "var"
+    event, and the GUI thread copies it into the Tk variable with apply()
+    when it drains the bus. Edits made through widgets flow back into the
+    cache through a trace.
+    """
+
+    def __init__(self, bus: EventBus, tk_var):
+        self.tk_var = tk_var
+        self._bus = bus
+        self._value = tk_var.get()
+        self._lock = threading.Lock()
+        self._applying = False
+        tk_var.trace_add("write", self._on_write)
+
+    def get(self):
+        with self._lock:
+            return self._value
+
+    def set(self, value):
+        with self._lock:
+            self._value = value
+        self._bus.emit("var", var=self, value=value)
+
+    def apply(self, value):
+        # GUI thread only
+        self._applying = True
+        try:
+            self.tk_var.set(value)
+        finally:
+            self._applying = False
+
+    def _on_write(self, *args):
+        if self._applying:
+            return
+        value = self.tk_var.get()
+        with self._lock:
+            self._value = value
@@ -0,0 +1,489 @@
+import json
+import os
+import threading
+import time
+import uuid
+import zipfile
+from html import escape
+from pathlib import Path
+
+from imagesniff import image_size, jpeg_info
+
+# Formats that are already compressed; deflating them again burns CPU for a
+# fraction of a percent, so they go into archives as ZIP_STORED
+STORED_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".avif"}
+
+
+def compress_type_for(name: str) -> int:
+    if Path(name).suffix.lower() in STORED_SUFFIXES:
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+class CbzWriter:
+    """
+    Appends pages to a CBZ while the chapter is still downloading. Pages are
+    identified by their page index and always land in the archive in that
+    order: anything that arrives early waits (as a path, not a bitmap) until
+    the pages before it are added or skip()ped. The archive is written as
+    <name>.part and only renamed once close() succeeds.
+
+    With resume=True a partial archive left by close(partial=True) is
+    reopened for appending, and `done` maps the source URLs already inside
+    it to their entry names (from the .manifest.json next to it).
+    """
+
+    def __init__(self, path, resume: bool = False):
+        self.path = Path(path)
+        self._part = self.path.with_name(self.path.name + ".part")
+        self.manifest_path = self.path.with_name(self.path.name + ".manifest.json")
+        self._lock = threading.Lock()
+        self._next = 1
+        self._waiting = {}
+        self._urls = {}
+        self.done = {}
+        self.pages = 0
+        self._zf = self._reopen() if resume else None
+        if self._zf is None:
+            self._zf = zipfile.ZipFile(self._part, "w")
+
+    def _reopen(self):
+        try:
+            manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+            zf = zipfile.ZipFile(self._part, "a")
+        except (OSError, ValueError, zipfile.BadZipFile):
+            return None
+        names = set(zf.namelist())
+        self.done = {
+            url: name
+            for url, name in manifest.get("pages", {}).items()
+            if name in names
+        }
+        self._urls = dict(self.done)
+        self.pages = len(self.done)
+        return zf
+
+    def add(
+        self, index: int, path=None, arcname: str = None, data=None, url: str = None
+    ):
+        """Queue page `index`, either a file on disk or an in-memory buffer."""
+        if arcname is None:
+            arcname = Path(path).name
+        with self._lock:
+            if self._zf is None:
+                return
+            self._waiting[index] = (arcname, path, data, url)
+            self._flush()
+
+    def add_parts(self, index: int, parts: list, url: str = None):
+        """Queue page `index` as several (arcname, data) entries (a sliced page)."""
+        with self._lock:
+            if self._zf is None:
+                return
+            self._waiting[index] = [(name, None, data, url) for name, data in parts]
+            self._flush()
+
+    def skip(self, index: int):
+        with self._lock:
+            if self._zf is None:
+                return
+            self._waiting.setdefault(index, None)
+            self._flush()
+
+    def close(self, partial: bool = False) -> Path:
+        """
+        Finish the archive. partial=True keeps it as <name>.part and writes
+        the manifest so a later CbzWriter(path, resume=True) can carry on.
+        """
+        with self._lock:
+            if self._zf is None:
+                return self.path
+            # Whatever is still waiting goes in as-is, gaps and all
+            for index in sorted(self._waiting):
+                self._write(self._waiting[index])
+            self._waiting.clear()
+            self._zf.close()
+            self._zf = None
+        if partial:
+            tmp = self.manifest_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"pages": self._urls}), encoding="utf-8")
+            os.replace(tmp, self.manifest_path)
+            return self._part
+        os.replace(self._part, self.path)
+        try:
+            self.manifest_path.unlink()
+        except OSError:
+            pass
+        return self.path
+
+    def abort(self):
+        with self._lock:
+            if self._zf is None:
+                return
+            self._zf.close()
+            self._zf = None
+            self._waiting.clear()
+        try:
+            self._part.unlink()
+        except OSError:
+            pass
+
+    def _flush(self):
+        while self._next in self._waiting:
+            self._write(self._waiting.pop(self._next))
+            self._next += 1
+
+    def _write(self, entry):
+        if entry is None:
+            return
+        if isinstance(entry, list):
+            for part in entry:
+                self._write(part)
+            return
+        arcname, path, data, url = entry
+        ctype = compress_type_for(arcname)
+        if data is not None:
+            # memoryview/getbuffer() goes straight to the zip, no extra copy
+            info = zipfile.ZipInfo(arcname, time.localtime()[:6])
+            info.compress_type = ctype
+            self._zf.writestr(info, data)
+        else:
+            self._zf.write(path, arcname, compress_type=ctype)
+        if url:
+            self._urls[url] = arcname
+        self.pages += 1
+
+
+class PdfWriter:
+    """
+    Minimal image-only PDF writer that streams one page at a time. JPEG data
+    is embedded as-is (DCTDecode), so nothing gets decoded; anything else has
+    to be handed over as JPEG by the caller. Only the xref table (a few bytes
+    per page) is kept in memory.
+    """
+
+    def __init__(self, path, resolution: float = 100.0):
+        self.path = Path(path)
+        self.resolution = resolution
+        self._part = self.path.with_name(self.path.name + ".part")
+        self._f = open(self._part, "wb")
+        self._offsets = {}
+        self._kids = []
+        self._next_obj = 3  # 1 = catalog, 2 = page tree, both written last
+        self._f.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    @property
+    def pages(self) -> int:
+        return len(self._kids)
+
+    def add_jpeg(self, data: bytes):
+        info = jpeg_info(data)
+        if info is None:
+            raise ValueError("not a baseline/progressive JPEG")
+        width, height, components = info
+        colorspace = {1: b"/DeviceGray", 3: b"/DeviceRGB", 4: b"/DeviceCMYK"}.get(
+            components
+        )
+        if colorspace is None:
+            raise ValueError(f"unsupported JPEG with {components} components")
+
+        image_obj = self._reserve()
+        extra = b""
+        if components == 4:
+            # Adobe CMYK JPEGs are stored inverted
+            extra = b" /Decode [1 0 1 0 1 0 1 0]"
+        self._begin(image_obj)
+        self._f.write(
+            b"<< /Type /XObject /Subtype /Image /Width %d /Height %d"
+            b" /ColorSpace %s /BitsPerComponent 8 /Filter /DCTDecode%s"
+            b" /Length %d >>\nstream\n" % (width, height, colorspace, extra, len(data))
+        )
+        self._f.write(data)
+        self._f.write(b"\nendstream\nendobj\n")
+
+        w_pt = width * 72.0 / self.resolution
+        h_pt = height * 72.0 / self.resolution
+        content = b"q %.2f 0 0 %.2f 0 0 cm /Im0 Do Q" % (w_pt, h_pt)
+        content_obj = self._reserve()
+        self._begin(content_obj)
+        self._f.write(b"<< /Length %d >>\nstream\n" % len(content))
+        self._f.write(content)
+        self._f.write(b"\nendstream\nendobj\n")
+
+        page_obj = self._reserve()
+        self._begin(page_obj)
+        self._f.write(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f]"
+            b" /Resources << /XObject << /Im0 %d 0 R >> >> /Contents %d 0 R >>\n"
+            b"endobj\n" % (w_pt, h_pt, image_obj, content_obj)
+        )
+        self._kids.append(page_obj)
+
+    def close(self) -> Path:
+        if self._f is None:
+            return self.path
+        kids = b" ".join(b"%d 0 R" % k for k in self._kids)
+        self._begin(2)
+        self._f.write(
+            b"<< /Type /Pages /Kids [%s] /Count %d >>\nendobj\n"
+            % (kids, len(self._kids))
+        )
+        self._begin(1)
+        self._f.write(b"<< /Type /Catalog /Pages 2 0 R >>\nendobj\n")
+
+        xref_at = self._f.tell()
+        count = self._next_obj
+        self._f.write(b"xref\n0 %d\n0000000000 65535 f \n" % count)
+        for num in range(1, count):
+            self._f.write(b"%010d 00000 n \n" % self._offsets[num])
+        self._f.write(
+            b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+            % (count, xref_at)
+        )
+        self._f.close()
+        self._f = None
+        os.replace(self._part, self.path)
+        return self.path
+
+    def abort(self):
+        if self._f is None:
+            return
+        self._f.close()
+        self._f = None
+        try:
+            self._part.unlink()
+        except OSError:
+            pass
+
+    def _reserve(self) -> int:
+        num = self._next_obj
+        self._next_obj += 1
+        return num
+
+    def _begin(self, num: int):
+        self._offsets[num] = self._f.tell()
+        self._f.write(b"%d 0 obj\n" % num)
+
+
+EPUB_MEDIA_TYPES = {
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+    "gif": "image/gif",
+    "webp": "image/webp",
+    "avif": "image/avif",
+}
+
+
+class EpubWriter:
+    """
+    Fixed-layout (pre-paginated) EPUB 3 writer that streams each image
+    straight from disk into the OCF zip. Page viewports come from the
+    header-sniffed image size, media types from the actual file contents
+    instead of the extension. Only the manifest entries stay in memory.
+    """
+
+    def __init__(self, path, title: str, author: str = "", language: str = "en"):
+        self.path = Path(path)
+        self.title = title
+        self.author = author
+        self.language = language
+        self.identifier = f"urn:uuid:{uuid.uuid4()}"
+        self._part = self.path.with_name(self.path.name + ".part")
+        self._zf = zipfile.ZipFile(self._part, "w", zipfile.ZIP_DEFLATED)
+        self._pages = []
+
+        # mimetype has to be the first entry and stored uncompressed
+        self._zf.writestr(
+            zipfile.ZipInfo("mimetype"),
+            "application/epub+zip",
+            compress_type=zipfile.ZIP_STORED,
+        )
+        self._zf.writestr("META-INF/container.xml", _EPUB_CONTAINER)
+
+    @property
+    def pages(self) -> int:
+        return len(self._pages)
+
+    def add_image(self, path, sniffed=None):
+        """
+        Add one page. sniffed is the (format, width, height) header info if
+        the caller already has it, otherwise the file header is read here.
+        """
+        path = Path(path)
+        if sniffed is None:
+            sniffed = sniff_file(path)
+        fmt = sniffed[0] if sniffed else None
+        size = sniffed[1:] if sniffed else None
+        if size is None:
+            size = _pillow_size(path) or (1000, 1500)
+        media_type = EPUB_MEDIA_TYPES.get(fmt) or _media_type_from_suffix(path)
+
+        n = len(self._pages) + 1
+        ext = ".jpg" if fmt == "jpeg" else (f".{fmt}" if fmt else path.suffix.lower())
+        image_name = f"images/page_{n:03d}{ext}"
+        page_name = f"page_{n:03d}.xhtml"
+
+        self._zf.write(
+            path, f"OEBPS/{image_name}", compress_type=compress_type_for(image_name)
+        )
+        width, height = size
+        self._zf.writestr(
+            f"OEBPS/{page_name}",
+            _EPUB_PAGE.format(n=n, src=image_name, width=width, height=height),
+        )
+        self._pages.append((n, image_name, page_name, media_type, width, height))
+
+    def close(self) -> Path:
+        if self._zf is None:
+            return self.path
+        self._zf.writestr("OEBPS/nav.xhtml", self._nav())
+        self._zf.writestr("OEBPS/toc.ncx", self._ncx())
+        self._zf.writestr("OEBPS/content.opf", self._opf())
+        self._zf.close()
+        self._zf = None
+        os.replace(self._part, self.path)
+        return self.path
+
+    def abort(self):
+        if self._zf is None:
+            return
+        self._zf.close()
+        self._zf = None
+        try:
+            self._part.unlink()
+        except OSError:
+            pass
+
+    def _opf(self) -> str:
+        manifest = [
+            '<item id="nav" href="nav.xhtml" media-type="application/xhtml+xml" properties="nav"/>',
+            '<item id="ncx" href="toc.ncx" media-type="application/x-dtbncx+xml"/>',
+        ]
+        spine = []
+        for n, image_name, page_name, media_type, _, _ in self._pages:
+            cover = ' properties="cover-image"' if n == 1 else ""
+            manifest.append(
+                f'<item id="image_{n}" href="{image_name}" media-type="{media_type}"{cover}/>'
+            )
+            manifest.append(
+                f'<item id="page_{n}" href="{page_name}" media-type="application/xhtml+xml"/>'
+            )
+            spine.append(f'<itemref idref="page_{n}"/>')
+        modified = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        return _EPUB_OPF.format(
+            identifier=escape(self.identifier),
+            title=escape(self.title),
+            author=escape(self.author),
+            language=escape(self.language),
+            modified=modified,
+            manifest="\n    ".join(manifest),
+            spine="\n    ".join(spine),
+        )
+
+    def _nav(self) -> str:
+        items = "\n".join(
+            f'      <li><a href="{page}">Page {n}</a></li>'
+            for n, _, page, _, _, _ in self._pages
+        )
+        return _EPUB_NAV.format(title=escape(self.title), items=items)
+
+    def _ncx(self) -> str:
+        points = "\n".join(
+            f'    <navPoint id="p{n}" playOrder="{n}"><navLabel><text>Page {n}</text>'
+            f'</navLabel><content src="{page}"/></navPoint>'
+            for n, _, page, _, _, _ in self._pages
+        )
+        return _EPUB_NCX.format(
+            identifier=escape(self.identifier), title=escape(self.title), points=points
+        )
+
+
+def sniff_file(path):
+    """image_size() for a file on disk, reading only the first 64 KB."""
+    with open(path, "rb") as f:
+        return image_size(f.read(64 * 1024))
+
+
+def _pillow_size(path):
+    try:
+        from PIL import Image
+
+        with Image.open(path) as img:
+            return img.size
+    except Exception:
+        return None
+
+
+def _media_type_from_suffix(path: Path) -> str:
+    suffix = path.suffix.lower().lstrip(".")
+    return EPUB_MEDIA_TYPES.get("jpeg" if suffix == "jpg" else suffix, "image/jpeg")
+
+
+_EPUB_CONTAINER = """<?xml version="1.0" encoding="UTF-8"?>
+<container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">
+  <rootfiles>
+    <rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/>
+  </rootfiles>
+</container>
+"""
+
+_EPUB_OPF = """<?xml version="1.0" encoding="UTF-8"?>
+<package xmlns="http://www.idpf.org/2007/opf" version="3.0" unique-identifier="bookid"
+         prefix="rendition: http://www.idpf.org/vocab/rendition/#">
+  <metadata xmlns:dc="http://purl.org/dc/elements/1.1/">
+    <dc:identifier id="bookid">{identifier}</dc:identifier>
+    <dc:title>{title}</dc:title>
+    <dc:creator>{author}</dc:creator>
+    <dc:language>{language}</dc:language>
+    <meta property="dcterms:modified">{modified}</meta>
+    <meta property="rendition:layout">pre-paginated</meta>
+    <meta property="rendition:orientation">portrait</meta>
+    <meta property="rendition:spread">none</meta>
+    <meta name="cover" content="image_1"/>
+  </metadata>
+  <manifest>
+    {manifest}
+  </manifest>
+  <spine toc="ncx">
+    {spine}
+  </spine>
+</package>
+"""
+
+_EPUB_PAGE = """<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE html>
+<html xmlns="http://www.w3.org/1999/xhtml" xmlns:epub="http://www.idpf.org/2007/ops">
+<head>
+  <title>Page {n}</title>
+  <meta name="viewport" content="width={width}, height={height}"/>
+  <style>html, body {{ margin: 0; padding: 0; }} img {{ display: block; width: {width}px; height: {height}px; }}</style>
+</head>
+<body>
+  <img src="{src}" alt="Page {n}"/>
+</body>
+</html>
+"""
+
+_EPUB_NAV = """<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE html>
+<html xmlns="http://www.w3.org/1999/xhtml" xmlns:epub="http://www.idpf.org/2007/ops">
+<head><title>{title}</title></head>
+<body>
+  <nav epub:type="toc" id="toc">
+    <ol>
+{items}
+    </ol>
+  </nav>
+</body>
+</html>
+"""
+
+_EPUB_NCX = """<?xml version="1.0" encoding="UTF-8"?>
+<ncx xmlns="http://www.daisy.org/z3986/2005/ncx/" version="2005-1">
+  <head><meta name="dtb:uid" content="{identifier}"/></head>
+  <docTitle><text>{title}</text></docTitle>
+  <navMap>
+{points}
+  </navMap>
+</ncx>
+"""
@@ -0,0 +1,168 @@
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+# Every chapter that finished downloading, so the same chapter isn't fetched
+# twice: once by URL (looked up before any network I/O) and once by the
+# comic/chapter the page turned out to be (catches mirrors and reshuffled
+# URLs after only the chapter page has been fetched).
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chapters (
+    url TEXT PRIMARY KEY,
+    comic TEXT NOT NULL,
+    chapter TEXT NOT NULL,
+    output_dir TEXT NOT NULL,
+    pages INTEGER NOT NULL,
+    bytes INTEGER NOT NULL,
+    archives TEXT NOT NULL,
+    page_hashes TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    downloaded REAL NOT NULL,
+    urls_hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS chapters_identity ON chapters (comic, chapter);
+"""
+
+# Query parameters that never change which chapter a URL points at
+_TRACKING = {"fbclid", "gclid", "ref", "source"}
+
+
+def canonical_url(url: str) -> str:
+    """Same chapter, same string: no fragment, www., tracking junk or trailing /."""
+    parts = urlparse(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = sorted(
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in _TRACKING
+    )
+    return urlunparse(
+        (
+            parts.scheme.lower() or "https",
+            host,
+            parts.path.rstrip("/") or "/",
+            "",
+            urlencode(query),
+            "",
+        )
+    )
+
+
+def content_hash(page_hashes: list) -> str:
+    return hashlib.sha256("\n".join(page_hashes).encode("ascii")).hexdigest()
+
+
+def urls_hash(image_urls) -> str:
+    return hashlib.sha256("\n".join(sorted(image_urls)).encode("utf-8")).hexdigest()
+
+
+class HistoryIndex:
+    """
+    SQLite history of finished chapters. lookup() is a primary key hit on
+    the canonical URL; entries whose files have all been deleted since
+    don't count.
+    """
+
+    def __init__(self, db_path):
+        import sqlite3
+
+        self.db_path = Path(db_path).expanduser()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.executescript(_SCHEMA)
+
+    def lookup(self, url: str):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT * FROM chapters WHERE url = ?", (canonical_url(url),)
+            ).fetchone()
+        return self._present(row)
+
+    def lookup_identity(self, comic: str, chapter: str, image_urls: list):
+        """
+        A finished chapter with the same comic/chapter names that also has
+        the same image URLs (the same chapter under a new slug or another
+        mirror of the page). Names alone aren't enough, sites with vague
+        titles give every chapter the same ones, and neither is the page
+        count.
+        """
+        if not image_urls:
+            return None
+        wanted = urls_hash(image_urls)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT * FROM chapters WHERE comic = ? AND chapter = ?"
+                " AND urls_hash = ? ORDER BY downloaded DESC",
+                (comic, chapter, wanted),
+            ).fetchall()
+        for row in rows:
+            entry = self._present(row)
+            if entry is not None:
+                return entry
+        return None
+
+    def record(
+        self,
+        url: str,
+        comic: str,
+        chapter: str,
+        output_dir,
+        pages: int,
+        total_bytes: int,
+        archives: list,
+        page_hashes: list,
+        image_urls: list,
+    ):
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO chapters"
+                " (url, comic, chapter, output_dir, pages, bytes, archives,"
+                " page_hashes, content_hash, downloaded, urls_hash)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    canonical_url(url),
+                    comic,
+                    chapter,
+                    str(output_dir),
+                    pages,
+                    total_bytes,
+                    json.dumps([str(a) for a in archives]),
+                    json.dumps(page_hashes),
+                    content_hash(page_hashes),
+                    time.time(),
+                    urls_hash(image_urls),
+                ),
+            )
+
+    def forget(self, url: str) -> bool:
+        with self._lock, self._db:
+            cur = self._db.execute(
+                "DELETE FROM chapters WHERE url = ?", (canonical_url(url),)
+            )
+        return cur.rowcount > 0
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    @staticmethod
+    def _present(row):
+        if row is None:
+            return None
+        entry = dict(row)
+        entry["archives"] = json.loads(entry["archives"])
+        entry["page_hashes"] = json.loads(entry["page_hashes"])
+        # Gone from disk (moved, deleted): download it again
+        if not any(Path(a).is_file() for a in entry["archives"]):
+            out = Path(entry["output_dir"])
+            if not out.is_dir() or not any(out.iterdir()):
+                return None
+        return entry
@@ -0,0 +1,100 @@
+import struct
+
+# Reads width/height straight out of the image header so the size checks
+# don't need Pillow (or the whole file). Everything here works on the first
+# few hundred bytes; None means "not enough data / don't know this format".
+
+_JPEG_SOF = {
+    0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7,
+    0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF,
+}  # fmt: skip
+
+
+def image_size(data: bytes):
+    """Returns (format, width, height) from the header bytes, or None."""
+    if not data or len(data) < 10:
+        return None
+    try:
+        if data.startswith(b"\x89PNG\r\n\x1a\n"):
+            return _png(data)
+        if data[:2] == b"\xff\xd8":
+            info = jpeg_info(data)
+            return ("jpeg", info[0], info[1]) if info else None
+        if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+            return _webp(data)
+        if data[:6] in (b"GIF87a", b"GIF89a"):
+            w, h = struct.unpack("<HH", data[6:10])
+            return ("gif", w, h)
+        if data[4:8] == b"ftyp":
+            return _avif(data)
+    except struct.error:
+        return None
+    return None
+
+
+def _png(data):
+    if data[12:16] != b"IHDR" or len(data) < 24:
+        return None
+    w, h = struct.unpack(">II", data[16:24])
+    return ("png", w, h)
+
+
+def jpeg_info(data: bytes):
+    """(width, height, components) from a JPEG's SOF marker, or None."""
+    if data[:2] != b"\xff\xd8":
+        return None
+    i = 2
+    n = len(data)
+    while i + 4 <= n:
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            i += 2
+            continue
+        if marker in (0xD9, 0xDA):  # EOI / start of scan, no SOF before it
+            return None
+        (length,) = struct.unpack(">H", data[i + 2 : i + 4])
+        if marker in _JPEG_SOF:
+            if i + 10 > n:
+                return None
+            h, w = struct.unpack(">HH", data[i + 5 : i + 9])
+            return (w, h, data[i + 9])
+        i += 2 + length
+    return None
+
+
+def _webp(data):
+    chunk = data[12:16]
+    if chunk == b"VP8 " and len(data) >= 30:
+        if data[23:26] != b"\x9d\x01\x2a":
+            return None
+        w, h = struct.unpack("<HH", data[26:30])
+        return ("webp", w & 0x3FFF, h & 0x3FFF)
+    if chunk == b"VP8L" and len(data) >= 25:
+        if data[20] != 0x2F:
+            return None
+        b0, b1, b2, b3 = data[21:25]
+        w = 1 + (b0 | (b1 & 0x3F) << 8)
+        h = 1 + ((b1 >> 6) | (b2 << 2) | (b3 & 0x0F) << 10)
+        return ("webp", w, h)
+    if chunk == b"VP8X" and len(data) >= 30:
+        w = 1 + int.from_bytes(data[24:27], "little")
+        h = 1 + int.from_bytes(data[27:30], "little")
+        return ("webp", w, h)
+    return None
+
+
+def _avif(data):
+    brands = data[8:12] + data[16:32]
+    if not any(b in brands for b in (b"avif", b"avis", b"heic", b"mif1")):
+        return None
+    # ispe (image spatial extent) lives in the meta box right after ftyp
+    i = data.find(b"ispe")
+    if i < 0 or i + 16 > len(data):
+        return None
+    w, h = struct.unpack(">II", data[i + 8 : i + 16])
+    return ("avif", w, h)
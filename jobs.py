@@ -0,0 +1,306 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from convert import ConversionStage
+
+# A persistent queue of chapter downloads. Jobs are rows in SQLite, so a
+# queue survives restarts and can be fed by the GUI and the CLI (or several
+# CLI workers) at the same time. Each job carries a snapshot of the settings
+# it was queued with.
+#
+#   queued -> running -> done | partial | failed | cancelled
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL,
+    output_dir TEXT NOT NULL,
+    settings TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    result TEXT,
+    added REAL NOT NULL,
+    started REAL,
+    finished REAL,
+    heartbeat REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, id);
+"""
+
+# download_task's result status -> job state
+_STATES = {
+    "ok": "done",
+    "partial": "partial",
+    "empty": "failed",
+    "failed": "failed",
+    "cancelled": "cancelled",
+    "skipped": "done",
+}
+
+JOBS_DB = Path.home() / ".cache" / "comic-downloader" / "jobs.db"
+
+# A running job whose worker hasn't checked in for this long is assumed to
+# belong to a process that died, and goes back in the queue
+STALE_AFTER = 120
+HEARTBEAT_EVERY = 30
+
+
+def parse_urls(text: str) -> list:
+    """URLs from pasted text or a list file: whitespace separated, # comments."""
+    urls = []
+    for line in text.splitlines():
+        if line.lstrip().startswith("#"):
+            continue
+        for word in line.split():
+            if word.startswith(("http://", "https://")) and word not in urls:
+                urls.append(word)
+    return urls
+
+
+class JobQueue:
+    """SQLite-backed job list. Pass ":memory:" for a throwaway one."""
+
+    def __init__(self, db_path):
+        import sqlite3
+
+        if str(db_path) != ":memory:":
+            db_path = Path(db_path).expanduser()
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        # Autocommit, claim() opens its own write transaction so two
+        # processes can never grab the same job
+        self._db = sqlite3.connect(
+            str(db_path), timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._db.row_factory = sqlite3.Row
+        self._db.executescript(_SCHEMA)
+
+    def add(self, urls: list, output_dir: str, settings: dict) -> list:
+        """Queues urls, returns the new job ids. URLs already waiting are skipped."""
+        ids = []
+        now = time.time()
+        with self._lock:
+            for url in urls:
+                waiting = self._db.execute(
+                    "SELECT 1 FROM jobs WHERE url = ? AND state IN ('queued', 'running')",
+                    (url,),
+                ).fetchone()
+                if waiting:
+                    continue
+                cur = self._db.execute(
+                    "INSERT INTO jobs (url, output_dir, settings, added)"
+                    " VALUES (?, ?, ?, ?)",
+                    (url, str(output_dir), json.dumps(settings), now),
+                )
+                ids.append(cur.lastrowid)
+        return ids
+
+    def claim(self):
+        """Marks the oldest queued job as running and returns it (or None)."""
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute(
+                    "SELECT * FROM jobs WHERE state = 'queued' ORDER BY id LIMIT 1"
+                ).fetchone()
+                if row is not None:
+                    self._db.execute(
+                        "UPDATE jobs SET state = 'running', attempts = attempts + 1,"
+                        " error = NULL, started = ?, heartbeat = ? WHERE id = ?",
+                        (now, now, row["id"]),
+                    )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return self._to_dict(row) if row is not None else None
+
+    def finish(self, job_id: int, result: dict):
+        state = _STATES.get(result.get("status"), "failed")
+        error = result.get("error")
+        if state == "failed" and not error and result.get("status") == "empty":
+            error = "no images found"
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET state = ?, error = ?, result = ?, finished = ?"
+                " WHERE id = ?",
+                (state, error, json.dumps(result), time.time(), job_id),
+            )
+
+    def touch(self, job_ids: list):
+        if not job_ids:
+            return
+        with self._lock:
+            self._db.executemany(
+                "UPDATE jobs SET heartbeat = ? WHERE id = ? AND state = 'running'",
+                [(time.time(), i) for i in job_ids],
+            )
+
+    def recover(self, stale_after: float = STALE_AFTER) -> int:
+        """Requeues running jobs whose worker stopped checking in."""
+        with self._lock:
+            cur = self._db.execute(
+                "UPDATE jobs SET state = 'queued', error = 'worker went away'"
+                " WHERE state = 'running' AND heartbeat < ?",
+                (time.time() - stale_after,),
+            )
+        return cur.rowcount
+
+    def retry(self, states=("failed", "partial", "cancelled")) -> int:
+        marks = ", ".join("?" * len(states))
+        with self._lock:
+            cur = self._db.execute(
+                f"UPDATE jobs SET state = 'queued' WHERE state IN ({marks})",
+                tuple(states),
+            )
+        return cur.rowcount
+
+    def clear(self, states=("done",)) -> int:
+        marks = ", ".join("?" * len(states))
+        with self._lock:
+            cur = self._db.execute(
+                f"DELETE FROM jobs WHERE state IN ({marks})", tuple(states)
+            )
+        return cur.rowcount
+
+    def jobs(self, states=None) -> list:
+        query, args = "SELECT * FROM jobs", ()
+        if states:
+            query += f" WHERE state IN ({', '.join('?' * len(states))})"
+            args = tuple(states)
+        with self._lock:
+            rows = self._db.execute(query + " ORDER BY id", args).fetchall()
+        return [self._to_dict(r) for r in rows]
+
+    def counts(self) -> dict:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT state, COUNT(*) FROM jobs GROUP BY state"
+            ).fetchall()
+        return {state: n for state, n in rows}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    @staticmethod
+    def _to_dict(row) -> dict:
+        job = dict(row)
+        job["settings"] = json.loads(job["settings"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+
+class JobRunner:
+    """
+    Drains a JobQueue with up to `workers` chapters downloading at once.
+    Every job gets a fresh engine from make_engine(job), since an engine
+    holds the state of one download. All of them share one semaphore of
+    `connections` open requests, so more parallel chapters means fewer
+    requests each rather than more load on the sites, and the CPUs are split
+    between their conversion pools.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        make_engine,
+        workers: int = 2,
+        connections: int = 8,
+        on_update=None,
+    ):
+        self.queue = queue
+        self.make_engine = make_engine
+        self.workers = max(1, workers)
+        self.connections = threading.BoundedSemaphore(max(1, connections))
+        self.on_update = on_update
+        self.results = []
+        self._active = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def run(self) -> list:
+        """Runs until the queue is empty or stop() is called, returns the results."""
+        # Just this run's, a --watch-loop runner is reused pass after pass
+        self.results = []
+        self.queue.recover()
+        cpu_share = max(1, ((os.cpu_count() or 2) - 1) // self.workers)
+        threads = [
+            threading.Thread(target=self._worker, args=(cpu_share,), daemon=True)
+            for _ in range(self.workers)
+        ]
+        for t in threads:
+            t.start()
+        while any(t.is_alive() for t in threads):
+            # Doubles as the heartbeat for jobs this process is running
+            for t in threads:
+                t.join(HEARTBEAT_EVERY / len(threads))
+            with self._lock:
+                self.queue.touch(list(self._active))
+        self.results.sort(key=lambda r: r["job"])
+        return self.results
+
+    def stop(self):
+        """Stops claiming jobs and cancels the ones in flight."""
+        self._stopped.set()
+        with self._lock:
+            engines = list(self._active.values())
+        for engine in engines:
+            engine.cancel()
+
+    @property
+    def stopped(self) -> bool:
+        return self._stopped.is_set()
+
+    def wait_stopped(self, timeout: float) -> bool:
+        """Sleeps up to timeout seconds, returns early (True) on stop()."""
+        return self._stopped.wait(timeout)
+
+    def _worker(self, cpu_share: int):
+        while not self._stopped.is_set():
+            job = self.queue.claim()
+            if job is None:
+                return
+            engine = self.make_engine(job)
+            engine.apply_settings(job["settings"])
+            engine.connections = self.connections
+            engine.converter = ConversionStage(workers=cpu_share)
+            engine.running = True
+            engine._download_start = time.time()
+            with self._lock:
+                self._active[job["id"]] = engine
+            if self._stopped.is_set():
+                engine.cancel()
+            try:
+                result = engine.download_task(job["url"], job["output_dir"])
+            except Exception as e:
+                result = {
+                    "url": job["url"],
+                    "status": "failed",
+                    "output_dir": None,
+                    "found": 0,
+                    "saved": 0,
+                    "failed": 0,
+                    "exports": [],
+                    "error": str(e),
+                }
+            finally:
+                with self._lock:
+                    self._active.pop(job["id"], None)
+                engine.converter.shutdown()
+                if engine.page_index is not None:
+                    engine.page_index.close()
+                if engine.history is not None:
+                    engine.history.close()
+            result = {"job": job["id"], **result}
+            self.queue.finish(job["id"], result)
+            with self._lock:
+                self.results.append(result)
+            if self.on_update:
+                self.on_update(job, result)
@@ -0,0 +1,284 @@
+import json
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+# Timings and counters for one chapter (Metrics) and for everything this
+# process has downloaded (REGISTRY, which serve() exposes over HTTP for
+# long-running workers). Stage names are dotted: page_fetch.browser,
+# image.ttfb, export.pdf...
+
+# Histogram bucket upper bounds, in milliseconds
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class Histogram:
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, seconds: float):
+        ms = seconds * 1000
+        i = 0
+        while i < len(BUCKETS_MS) and ms > BUCKETS_MS[i]:
+            i += 1
+        self.buckets[i] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def merge(self, other: "Histogram"):
+        for i, n in enumerate(other.buckets):
+            self.buckets[i] += n
+        self.count += other.count
+        self.total += other.total
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, q: float):
+        """Upper bound (ms) of the bucket holding the q-th value, or None."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                return BUCKETS_MS[i] if i < len(BUCKETS_MS) else self.max * 1000
+        return self.max * 1000
+
+    def to_dict(self) -> dict:
+        labels = [f"<={b}ms" for b in BUCKETS_MS] + ["+inf"]
+        return {
+            "count": self.count,
+            "total_s": round(self.total, 3),
+            "mean_ms": round(self.total / self.count * 1000, 1) if self.count else None,
+            "min_ms": round(self.min * 1000, 1) if self.min is not None else None,
+            "max_ms": round(self.max * 1000, 1) if self.max is not None else None,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "buckets": {label: n for label, n in zip(labels, self.buckets) if n},
+        }
+
+
+class Metrics:
+    """Everything measured while downloading one chapter. Thread-safe."""
+
+    def __init__(self):
+        self.started = time.time()
+        self.finished = None
+        self.stages = {}
+        self.counters = Counter()
+        self.bytes_by_host = Counter()
+        self.caches = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            self.stages.setdefault(name, Histogram()).observe(seconds)
+
+    def count(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] += n
+
+    def add_bytes(self, url: str, n: int):
+        with self._lock:
+            self.bytes_by_host[urlparse(url).netloc.lower()] += n
+
+    def cache(self, name: str, hit: bool, n: int = 1):
+        with self._lock:
+            entry = self.caches.setdefault(name, [0, 0])
+            entry[0 if hit else 1] += n
+
+    def finish(self):
+        self.finished = self.finished or time.time()
+
+    def report(self) -> dict:
+        with self._lock:
+            wall = (self.finished or time.time()) - self.started
+            total_bytes = sum(self.bytes_by_host.values())
+            return {
+                "started": self.started,
+                "wall_s": round(wall, 3),
+                "stages": {k: h.to_dict() for k, h in sorted(self.stages.items())},
+                "counters": dict(self.counters),
+                "bytes_by_host": dict(self.bytes_by_host),
+                "bytes_total": total_bytes,
+                "throughput": {
+                    "bytes_per_s": round(total_bytes / wall) if wall > 0 else None,
+                    "images_per_s": (
+                        round(self.counters["images"] / wall, 2) if wall > 0 else None
+                    ),
+                },
+                "caches": {
+                    name: {
+                        "hits": hits,
+                        "misses": misses,
+                        "hit_rate": round(hits / (hits + misses), 3),
+                    }
+                    for name, (hits, misses) in self.caches.items()
+                    if hits + misses
+                },
+            }
+
+    def summary(self) -> str:
+        """One line for the log: the big stages and throughput."""
+        report = self.report()
+        stages = report["stages"]
+        parts = []
+        for label, prefix in (
+            ("page", "page_fetch."),
+            ("extract", "extract"),
+            ("browser", "browser_pass"),
+            ("images", "image"),
+            ("exports", "export."),
+        ):
+            matches = [
+                v
+                for k, v in stages.items()
+                if k == prefix or (prefix.endswith(".") and k.startswith(prefix))
+            ]
+            if not matches:
+                continue
+            seconds = sum(m["total_s"] for m in matches)
+            text = f"{label} {seconds:.1f}s"
+            if prefix == "image":
+                text += f" (p95 {matches[0]['p95_ms']:g}ms)"
+            parts.append(text)
+        mb_s = (report["throughput"]["bytes_per_s"] or 0) / 1024 / 1024
+        parts.append(f"{mb_s:.2f} MB/s")
+        return " · ".join(parts)
+
+
+class MetricsRegistry:
+    """Running totals for the whole process, fed one finished chapter at a time."""
+
+    def __init__(self):
+        self.started = time.time()
+        self.active = 0
+        self.chapters = Counter()
+        self.stages = {}
+        self.counters = Counter()
+        self.bytes_by_host = Counter()
+        self.caches = {}
+        self._lock = threading.Lock()
+
+    def chapter_started(self):
+        with self._lock:
+            self.active += 1
+
+    def chapter_finished(self, metrics: Metrics, status: str):
+        with metrics._lock, self._lock:
+            self.active -= 1
+            self.chapters[status] += 1
+            for name, hist in metrics.stages.items():
+                self.stages.setdefault(name, Histogram()).merge(hist)
+            self.counters.update(metrics.counters)
+            self.bytes_by_host.update(metrics.bytes_by_host)
+            for name, (hits, misses) in metrics.caches.items():
+                entry = self.caches.setdefault(name, [0, 0])
+                entry[0] += hits
+                entry[1] += misses
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "uptime_s": round(time.time() - self.started, 1),
+                "active_chapters": self.active,
+                "chapters": dict(self.chapters),
+                "stages": {k: h.to_dict() for k, h in sorted(self.stages.items())},
+                "counters": dict(self.counters),
+                "bytes_by_host": dict(self.bytes_by_host),
+                "caches": {
+                    k: {"hits": h, "misses": m} for k, (h, m) in self.caches.items()
+                },
+            }
+
+    def prometheus(self) -> str:
+        """The same numbers in Prometheus' text format."""
+        snap = self.snapshot()
+        lines = [
+            f"comic_uptime_seconds {snap['uptime_s']}",
+            f"comic_active_chapters {snap['active_chapters']}",
+        ]
+        for status, n in snap["chapters"].items():
+            lines.append(f'comic_chapters_total{{status="{status}"}} {n}')
+        for name, n in snap["counters"].items():
+            lines.append(f'comic_events_total{{name="{name}"}} {n}')
+        for host, n in snap["bytes_by_host"].items():
+            lines.append(f'comic_bytes_total{{host="{host}"}} {n}')
+        for name, c in snap["caches"].items():
+            lines.append(f'comic_cache_hits_total{{cache="{name}"}} {c["hits"]}')
+            lines.append(f'comic_cache_misses_total{{cache="{name}"}} {c["misses"]}')
+        with self._lock:
+            stages = {k: h for k, h in self.stages.items()}
+            for name, hist in sorted(stages.items()):
+                seen = 0
+                for bound, n in zip(BUCKETS_MS, hist.buckets):
+                    seen += n
+                    lines.append(
+                        f'comic_stage_seconds_bucket{{stage="{name}",le="{bound / 1000:g}"}} {seen}'
+                    )
+                lines.append(
+                    f'comic_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {hist.count}'
+                )
+                lines.append(
+                    f'comic_stage_seconds_sum{{stage="{name}"}} {hist.total:.6f}'
+                )
+                lines.append(
+                    f'comic_stage_seconds_count{{stage="{name}"}} {hist.count}'
+                )
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def serve(port: int, registry: MetricsRegistry = REGISTRY, host: str = "127.0.0.1"):
+    """
+    Serves /metrics (Prometheus text) and /metrics.json from a daemon
+    thread. Only binds to localhost unless told otherwise. Returns the
+    server; shutdown() stops it.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body = registry.prometheus().encode("utf-8")
+                kind = "text/plain; version=0.0.4"
+            elif self.path == "/metrics.json":
+                body = json.dumps(registry.snapshot()).encode("utf-8")
+                kind = "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", kind)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
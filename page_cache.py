@@ -0,0 +1,89 @@
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+
+
+class PageCache:
+    """
+    Keeps the rendered HTML + extracted image list for a chapter so Test URL
+    and Start Download don't both pay for a full browser render.
+
+    Entries are keyed by URL and the settings that change extraction. If
+    persist_dir is given, entries are also written there as JSON so they
+    survive a restart (still bound by the TTL).
+    """
+
+    def __init__(self, ttl: float = 900, persist_dir=None):
+        self.ttl = ttl
+        self.persist_dir = Path(persist_dir).expanduser() if persist_dir else None
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(url: str, **settings) -> str:
+        parts = [url.strip()] + [f"{k}={settings[k]}" for k in sorted(settings)]
+        return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None and self.persist_dir:
+            entry = self._load(key)
+            if entry is not None:
+                with self._lock:
+                    self._entries[key] = entry
+        if entry is None:
+            return None
+        if time.time() - entry["created"] > self.ttl:
+            self.invalidate(key)
+            return None
+        return entry
+
+    def put(self, key: str, url: str, html: str, image_urls: list):
+        entry = {
+            "url": url,
+            "html": html,
+            "image_urls": list(image_urls),
+            "created": time.time(),
+        }
+        with self._lock:
+            self._entries[key] = entry
+        if self.persist_dir:
+            try:
+                self.persist_dir.mkdir(parents=True, exist_ok=True)
+                tmp = self._path(key).with_suffix(".tmp")
+                tmp.write_text(json.dumps(entry), encoding="utf-8")
+                tmp.replace(self._path(key))
+            except OSError:
+                pass
+        return entry
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.persist_dir:
+            try:
+                self._path(key).unlink()
+            except OSError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.persist_dir and self.persist_dir.is_dir():
+            for p in self.persist_dir.glob("*.json"):
+                try:
+                    p.unlink()
+                except OSError:
+                    pass
+
+    def _path(self, key: str) -> Path:
+        return self.persist_dir / f"{key}.json"
+
+    def _load(self, key: str):
+        try:
+            return json.loads(self._path(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
@@ -0,0 +1,230 @@
+import io
+import os
+import re
+import shutil
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+
+from convert import ConversionStage, flatten
+
+# Output profiles shrink pages to what the target screen can actually show.
+# Resizing happens once at export time, in the conversion pool, instead of
+# on the reader every time a page is turned.
+
+
+class OutputProfile:
+    """
+    width/height is the screen in portrait pixels. Pages are fitted inside it
+    (never upscaled); long strips are fitted to the width only, and cut into
+    screen-sized slices when slice_height is set.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        width: int,
+        height: int,
+        grayscale: bool = False,
+        quality: int = 85,
+        slice_height: int = 0,
+    ):
+        self.name = name
+        self.width = width
+        self.height = height
+        self.grayscale = grayscale
+        self.quality = quality
+        self.slice_height = slice_height
+
+    @property
+    def slug(self) -> str:
+        return re.sub(r"[^a-z0-9]+", "-", self.name.lower()).strip("-")
+
+    def __repr__(self):
+        return f"OutputProfile({self.name!r}, {self.width}x{self.height})"
+
+
+ORIGINAL = "Original"
+
+PROFILES = {
+    p.name: p
+    for p in (
+        OutputProfile("Kindle Paperwhite", 1236, 1648, grayscale=True, quality=80),
+        OutputProfile("Kindle Basic", 1072, 1448, grayscale=True, quality=80),
+        OutputProfile("Kobo Clara", 1072, 1448, grayscale=True, quality=80),
+        OutputProfile("Kobo Libra Colour", 1264, 1680, quality=82),
+        OutputProfile("Phone", 1080, 2340, quality=85),
+        OutputProfile("Phone (sliced)", 1080, 2340, quality=85, slice_height=2340),
+        OutputProfile("Tablet", 1600, 2560, quality=88),
+    )
+}
+
+
+def get_profile(name):
+    """The profile called name, or None for "Original"/unknown names."""
+    if not name or name == ORIGINAL:
+        return None
+    return PROFILES.get(name)
+
+
+def _is_strip(w: int, h: int, profile: OutputProfile) -> bool:
+    # Way taller than the screen's own aspect ratio: a webtoon strip, which
+    # is read by scrolling, so it only has to fit the width
+    return h * profile.width > 2 * w * profile.height
+
+
+def _target_size(w: int, h: int, profile: OutputProfile):
+    scale = min(1.0, profile.width / w)
+    if not _is_strip(w, h, profile):
+        scale = min(scale, profile.height / h)
+    return max(1, round(w * scale)), max(1, round(h * scale))
+
+
+def _render(img, profile: OutputProfile) -> list:
+    from PIL import Image
+
+    mode = "L" if profile.grayscale else "RGB"
+    tw, th = _target_size(img.width, img.height, profile)
+
+    if img.format == "JPEG":
+        # libjpeg decodes at 1/2, 1/4 or 1/8 scale directly (and straight to
+        # grayscale), so a 4000px page never gets decoded at full size
+        img.draft(mode, (tw, th))
+    img.load()
+    if img.mode not in ("L", "RGB", "RGBA", "LA"):
+        # Palette/CMYK/16-bit images can't be reduce()d as they are
+        img = flatten(img, mode)
+    factor = min(img.width // tw, img.height // th)
+    if factor >= 2:
+        # Cheap box reduce by the integer part, Lanczos only does the rest
+        img = img.reduce(factor)
+
+    img = flatten(img, mode)
+    if img.size != (tw, th):
+        img = img.resize((tw, th), Image.LANCZOS)
+
+    if not profile.slice_height or th <= profile.slice_height:
+        return [img]
+    return [
+        img.crop((0, top, tw, min(th, top + profile.slice_height)))
+        for top in range(0, th, profile.slice_height)
+    ]
+
+
+def render_bytes(data: bytes, profile: OutputProfile) -> list:
+    """Renders one page in memory, returns the JPEG bytes of every slice."""
+    from PIL import Image
+
+    out = []
+    for part in _render(Image.open(io.BytesIO(data)), profile):
+        buf = io.BytesIO()
+        part.save(buf, format="JPEG", quality=profile.quality, optimize=True)
+        out.append(buf.getvalue())
+    return out
+
+
+def render_file(src: str, dest_stem: str, profile: OutputProfile) -> list:
+    """
+    Renders src to dest_stem.jpg (or dest_stem-01.jpg, -02.jpg... when the
+    page is sliced). Runs in a worker process, so only plain values go in
+    and out.
+    """
+    from PIL import Image
+
+    with Image.open(src) as img:
+        parts = _render(img, profile)
+    names = (
+        [f"{dest_stem}.jpg"]
+        if len(parts) == 1
+        else [f"{dest_stem}-{n:02d}.jpg" for n in range(1, len(parts) + 1)]
+    )
+    for part, name in zip(parts, names):
+        tmp = name + ".part"
+        part.save(tmp, format="JPEG", quality=profile.quality, optimize=True)
+        os.replace(tmp, name)
+    return names
+
+
+class ProfileRenderer:
+    """
+    Resized copies of one job's pages for one profile, rendered in parallel
+    through a ConversionStage. Every source page is rendered once however
+    many exports ask for it; rendered files live in cache_dir until close().
+    """
+
+    def __init__(self, stage: ConversionStage, cache_dir, profile: OutputProfile):
+        self.stage = stage
+        self.cache_dir = Path(cache_dir)
+        self.profile = profile
+        self._futures = {}
+        self._names = set()
+        self._lock = threading.Lock()
+
+    def submit_path(self, source_path) -> Future:
+        source_path = Path(source_path)
+        with self._lock:
+            proxy = self._futures.get(str(source_path))
+            if proxy is not None:
+                return proxy
+            proxy = Future()
+            self._futures[str(source_path)] = proxy
+            # 001.png and 001.webp from one chapter mustn't render over each
+            # other, the second one keeps its full name
+            name = source_path.stem
+            if name in self._names:
+                name = source_path.name
+            self._names.add(name)
+
+        def relay(f):
+            if f.cancelled():
+                proxy.cancel()
+            elif f.exception() is not None:
+                proxy.set_exception(f.exception())
+            else:
+                proxy.set_result([Path(p) for p in f.result()])
+
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self.stage.submit(
+                render_file,
+                str(source_path),
+                str(self.cache_dir / name),
+                self.profile,
+                on_done=relay,
+            )
+        except Exception as e:
+            proxy.set_exception(e)
+        return proxy
+
+    def render_all(self, pages: list) -> list:
+        """
+        Rendered paths for pages, in the same order (slices inline). Pages
+        that are already renders from this cache are passed through, so
+        exports can call this on a list run_exports has rendered before.
+        A page that fails to render is exported as the original.
+        """
+        todo = [p for p in pages if Path(p).parent != self.cache_dir]
+        for p in todo:
+            self.submit_path(p)
+        out = []
+        for p in pages:
+            if Path(p).parent == self.cache_dir:
+                out.append(Path(p))
+                continue
+            try:
+                out.extend(self.submit_path(p).result())
+            except Exception:
+                out.append(Path(p))
+        return out
+
+    def close(self):
+        with self._lock:
+            futures = list(self._futures.values())
+            self._futures.clear()
+            self._names.clear()
+        for f in futures:
+            try:
+                f.result()
+            except Exception:
+                pass
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
@@ -0,0 +1,161 @@
+import io
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+# Opt-in profiling of the slow parts of a download (page fetch, extraction,
+# the image loop, exports), for when a chapter is slow and "it's slow" isn't
+# enough of a bug report. Every section gets its own cProfile.Profile that
+# accumulates over the whole run; write() leaves a .prof per section (open
+# with pstats or snakeviz) and a summary.txt with the top functions.
+#
+# Before Python 3.12 a cProfile.Profile only sees the thread that enabled
+# it, so every thread gets its own per section (merged in write()) and the
+# browser's page fetch and the image loop it feeds are profiled side by
+# side. 3.12+ allows one active profiler per process: there sections that
+# start while another one is running go unprofiled and are counted as
+# missed. Sections nested in the same thread are always missed. Memory is
+# traced process wide, overlapping sections share their allocations.
+
+PER_THREAD = sys.version_info < (3, 12)
+
+
+class Profiler:
+    def __init__(self, out_dir, memory: bool = False, top: int = 25):
+        self.out_dir = Path(out_dir).expanduser()
+        self.memory = memory
+        self.top = top
+        self.started = time.time()
+        self._profiles = {}
+        self._calls = Counter()
+        self._missed = Counter()
+        self._wall = Counter()
+        self._allocated = {}
+        self._peaks = Counter()
+        self._lock = threading.Lock()
+        self._busy = threading.Lock()
+        self._local = threading.local()
+        self._tracing = False
+        if memory:
+            import tracemalloc
+
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(10)
+                self._tracing = True
+
+    @contextmanager
+    def section(self, name: str):
+        if not self._claim():
+            with self._lock:
+                self._missed[name] += 1
+            yield
+            return
+        try:
+            import cProfile
+
+            with self._lock:
+                profiles = self._profiles.setdefault(name, {})
+                profile = profiles.get(threading.get_ident())
+                if profile is None:
+                    profile = profiles[threading.get_ident()] = cProfile.Profile()
+            before = self._snapshot()
+            started = time.perf_counter()
+            profile.enable()
+            try:
+                yield
+            finally:
+                profile.disable()
+                with self._lock:
+                    self._wall[name] += time.perf_counter() - started
+                    self._calls[name] += 1
+                if before is not None:
+                    self._record_memory(name, before)
+        finally:
+            self._local.active = False
+            if not PER_THREAD:
+                self._busy.release()
+
+    def _claim(self) -> bool:
+        if getattr(self._local, "active", False):
+            return False
+        if not PER_THREAD and not self._busy.acquire(blocking=False):
+            return False
+        self._local.active = True
+        return True
+
+    def iterate(self, name: str, iterable):
+        """Yields from iterable with the whole loop (waits included) profiled."""
+        with self.section(name):
+            yield from iterable
+
+    def _snapshot(self):
+        if not self.memory:
+            return None
+        import tracemalloc
+
+        tracemalloc.reset_peak()
+        return tracemalloc.take_snapshot()
+
+    def _record_memory(self, name: str, before):
+        import tracemalloc
+
+        _, peak = tracemalloc.get_traced_memory()
+        diff = tracemalloc.take_snapshot().compare_to(before, "lineno")
+        with self._lock:
+            self._peaks[name] = max(self._peaks[name], peak)
+            allocated = self._allocated.setdefault(name, Counter())
+            for stat in diff:
+                if stat.size_diff > 0:
+                    allocated[str(stat.traceback[0])] += stat.size_diff
+
+    def write(self) -> Path:
+        """Dumps everything collected so far, returns the summary file."""
+        import pstats
+
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        lines = [
+            f"Profile of a {time.time() - self.started:.1f}s run,"
+            f" started {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.started))}",
+            "",
+        ]
+        for name in sorted(set(self._profiles) | set(self._missed)):
+            lines.append("=" * 78)
+            lines.append(
+                f"{name}: {self._calls[name]} call(s), {self._wall[name]:.2f}s wall"
+                + (
+                    f", {self._missed[name]} missed (overlapped)"
+                    if self._missed[name]
+                    else ""
+                )
+            )
+            lines.append("=" * 78)
+            profiles = list(self._profiles.get(name, {}).values())
+            if not profiles:
+                lines.append("")
+                continue
+            out = io.StringIO()
+            stats = pstats.Stats(*profiles, stream=out)
+            stats.dump_stats(str(self.out_dir / f"{name}.prof"))
+            stats.strip_dirs().sort_stats("cumulative").print_stats(self.top)
+            lines.append(out.getvalue().strip())
+            if name in self._allocated:
+                lines.append("")
+                lines.append(
+                    f"Memory: peak {self._peaks[name] / 1024 / 1024:.1f} MB, top allocations:"
+                )
+                for where, size in self._allocated[name].most_common(self.top):
+                    lines.append(f"  {size / 1024:10.1f} KB  {where}")
+            lines.append("")
+        summary = self.out_dir / "summary.txt"
+        summary.write_text("\n".join(lines), encoding="utf-8")
+        return summary
+
+    def close(self):
+        if self._tracing:
+            import tracemalloc
+
+            tracemalloc.stop()
+            self._tracing = False
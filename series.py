@@ -0,0 +1,207 @@
+import json
+import re
+from urllib.parse import urldefrag, urljoin, urlparse
+
+# Turns a title/series page into its list of chapter URLs. Same idea as the
+# image extractor: known chapter-list selectors first, then whatever JSON the
+# page embeds (Next.js data, ld+json), then any link that looks like a
+# chapter. Chapters are numbered from their link text or URL, sorted and
+# deduplicated.
+
+CHAPTER_SELECTORS = [
+    # Madara theme (most WordPress manga sites)
+    "li.wp-manga-chapter a",
+    ".listing-chapters_wrap a",
+    ".version-chap a",
+    # MangaStream / MangaReader themes (rawkuma etc)
+    "#chapterlist li a",
+    ".eplister li a",
+    ".cl li a",
+    # Naver / Kakao style episode lists
+    "a[href*='detail?titleId']",
+    "a[href*='/viewer/']",
+    # uhhh just patterns
+    ".chapter-list a",
+    ".chapters a",
+    ".list-chapter a",
+    "ul.chapter a",
+    "#chapter-list a",
+    "[class*='chapter-list'] a",
+    "[class*='chapterList'] a",
+    "[class*='episode'] a",
+]
+
+_CHAPTER_WORD = r"\b(?:chapter|chap|ch|episode|ep|no)"
+_NUMBER_PATTERNS = [
+    _CHAPTER_WORD + r"[\s._\-=#/]*(\d+(?:[.\-_]\d+)?)",
+    r"[?&](?:no|ep|episode|chapter)=(\d+)",
+    r"(?:^|\s)#?(\d+(?:\.\d+)?)\s*$",
+]
+_CHAPTERISH = re.compile(_CHAPTER_WORD + r"[\s._\-=#/]*\d", re.I)
+_JSON_URL_KEYS = ("url", "href", "link", "permalink", "chapterUrl", "chapter_url")
+_JSON_NUM_KEYS = (
+    "chapter",
+    "number",
+    "chapterNumber",
+    "chapter_number",
+    "chap",
+    "no",
+    "episode",
+    "episodeNo",
+)
+
+
+class Chapter:
+    def __init__(self, url: str, number=None, title: str = ""):
+        self.url = url
+        self.number = number
+        self.title = title
+
+    def __repr__(self):
+        return f"Chapter({self.number}, {self.url!r})"
+
+
+def chapter_number(*texts):
+    """First chapter number found in texts (link text, then URL), or None."""
+    for text in texts:
+        if not text:
+            continue
+        low = text.lower()
+        for pattern in _NUMBER_PATTERNS:
+            m = re.search(pattern, low)
+            if m:
+                # "12-5" / "12_5" in slugs means 12.5
+                return float(re.sub(r"[\-_]", ".", m.group(1)))
+    return None
+
+
+def parse_range(spec: str) -> list:
+    """
+    "1-50", "120-" (120 onwards), "-10", "5,7,9-12" -> list of (lo, hi).
+    Raises ValueError on anything else.
+    """
+    ranges = []
+    for part in (spec or "").replace(" ", "").split(","):
+        if not part:
+            continue
+        m = re.fullmatch(r"(\d+(?:\.\d+)?)?(-)?(\d+(?:\.\d+)?)?", part)
+        if not m or not (m.group(1) or m.group(3)):
+            raise ValueError(f"Bad chapter range: {part!r}")
+        lo = float(m.group(1)) if m.group(1) else float("-inf")
+        if m.group(2):
+            hi = float(m.group(3)) if m.group(3) else float("inf")
+        else:
+            hi = lo
+        ranges.append((lo, hi))
+    return ranges
+
+
+def in_range(chapter: Chapter, ranges: list) -> bool:
+    if not ranges:
+        return True
+    if chapter.number is None:
+        return False
+    return any(lo <= chapter.number <= hi for lo, hi in ranges)
+
+
+def _canonical(url: str) -> str:
+    return urldefrag(url)[0].rstrip("/")
+
+
+def _host(url: str) -> str:
+    host = urlparse(url).netloc.lower().split(":")[0]
+    return host[4:] if host.startswith("www.") else host
+
+
+def _same_site(url: str, base_url: str) -> bool:
+    host, base = _host(url), _host(base_url)
+    return host == base or host.endswith("." + base) or base.endswith("." + host)
+
+
+def _from_links(links, base_url: str, need_chapterish: bool) -> list:
+    found = []
+    for a in links:
+        href = (a.get("href") or "").strip()
+        if not href or href.startswith(("#", "javascript:", "mailto:")):
+            continue
+        url = urljoin(base_url, href)
+        if not url.startswith(("http://", "https://")):
+            continue
+        text = " ".join(a.get_text(" ").split())
+        if need_chapterish and not (
+            _CHAPTERISH.search(text) or _CHAPTERISH.search(urlparse(url).path)
+        ):
+            continue
+        found.append(Chapter(url, chapter_number(text, url), text))
+    return found
+
+
+def _walk_json(data, base_url: str, out: list):
+    if isinstance(data, dict):
+        url = next(
+            (data[k] for k in _JSON_URL_KEYS if isinstance(data.get(k), str)), None
+        )
+        num = next((data[k] for k in _JSON_NUM_KEYS if k in data), None)
+        if url and num is not None:
+            try:
+                number = float(num)
+            except (TypeError, ValueError):
+                number = chapter_number(str(num))
+            out.append(
+                Chapter(urljoin(base_url, url), number, str(data.get("title", "")))
+            )
+        for value in data.values():
+            _walk_json(value, base_url, out)
+    elif isinstance(data, list):
+        for value in data:
+            _walk_json(value, base_url, out)
+
+
+def _from_json(soup, base_url: str) -> list:
+    found = []
+    for script in soup.find_all("script"):
+        kind = (script.get("type") or "").lower()
+        if "json" not in kind and script.get("id") != "__NEXT_DATA__":
+            continue
+        try:
+            data = json.loads(script.string or "")
+        except ValueError:
+            continue
+        _walk_json(data, base_url, found)
+    return found
+
+
+def find_chapters(html: str, base_url: str) -> list:
+    """Every chapter linked from a series page, oldest first, no repeats."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    chapters = []
+    for sel in CHAPTER_SELECTORS:
+        chapters = _from_links(soup.select(sel), base_url, need_chapterish=False)
+        if chapters:
+            break
+    if not chapters:
+        chapters = _from_json(soup, base_url)
+    if not chapters:
+        chapters = _from_links(soup.find_all("a"), base_url, need_chapterish=True)
+
+    series = _canonical(base_url)
+    seen_urls, seen_numbers, unique = set(), set(), []
+    for ch in chapters:
+        key = _canonical(ch.url)
+        if key == series or key in seen_urls or not _same_site(ch.url, base_url):
+            continue
+        # Lists often show the newest chapters twice ("latest" box + list)
+        if ch.number is not None and ch.number in seen_numbers:
+            continue
+        seen_urls.add(key)
+        ch.url = urldefrag(ch.url)[0]
+        if ch.number is not None:
+            seen_numbers.add(ch.number)
+        unique.append(ch)
+
+    numbered = sorted(
+        (c for c in unique if c.number is not None), key=lambda c: c.number
+    )
+    return numbered + [c for c in unique if c.number is None]
@@ -0,0 +1,157 @@
+import os
+from pathlib import Path
+
+from convert import flatten
+
+# Webtoon chapters arrive as a pile of tall strips whose edges cut straight
+# through panels. The stitcher treats them as one continuous strip and cuts
+# it again into reader-sized pages, preferring whitespace gutters. Only one
+# source strip plus about two pages' worth of rows are in memory at a time,
+# never the whole (often 50,000 px+) strip.
+
+STITCH_DIR = ".stitched"
+
+
+def flat_rows(img, threshold: int = 12) -> list:
+    """One bool per row: True when the row is a single flat colour."""
+    from PIL import Image
+
+    # Squash every row down to 128 samples first, that's plenty to see
+    # speech bubbles and line art while keeping this cheap
+    probe = img.convert("L").resize((128, img.height), Image.BOX).tobytes()
+    rows = []
+    for y in range(img.height):
+        row = probe[y * 128 : (y + 1) * 128]
+        rows.append(max(row) - min(row) <= threshold)
+    return rows
+
+
+def is_blank(img, threshold: int = 12) -> bool:
+    """True when the whole image is close to one flat colour."""
+    from PIL import Image
+
+    # Averaged down first so JPEG noise and stray specks don't count
+    probe = img.convert("L").resize((128, max(1, img.height // 16)), Image.BOX)
+    low, high = probe.getextrema()
+    return high - low <= threshold
+
+
+class StripStitcher:
+    """
+    feed() strips in reading order, then close(). Pages are written to
+    dest_dir as 001.jpg, 002.jpg... and returned by close().
+
+    Cuts land in the middle of the lowest gutter between half a page and a
+    full page down; if there is no gutter in that window the page is cut at
+    exactly page_height. A leftover shorter than a quarter page is not cut
+    off into a page of its own, it stays on the end of the page before it.
+    Pages that are all one colour are dropped.
+    """
+
+    def __init__(
+        self,
+        dest_dir,
+        width: int,
+        page_height: int,
+        grayscale: bool = False,
+        quality: int = 90,
+    ):
+        self.dest_dir = Path(dest_dir)
+        self.width = width
+        self.page_height = page_height
+        self.mode = "L" if grayscale else "RGB"
+        self.quality = quality
+        self.min_tail = page_height // 4
+        self.pages = []
+        self.dropped = 0
+        self._carry = None
+
+    def feed(self, path):
+        from PIL import Image
+
+        with Image.open(path) as img:
+            img.load()
+            img = flatten(img, self.mode)
+        if img.width != self.width:
+            height = max(1, round(img.height * self.width / img.width))
+            img = img.resize((self.width, height), Image.LANCZOS)
+
+        # Hand the strip over a page-sized tile at a time so the carry
+        # buffer never grows past two pages
+        for top in range(0, img.height, self.page_height):
+            tile = img.crop(
+                (0, top, self.width, min(img.height, top + self.page_height))
+            )
+            self._append(tile)
+            # Cut only once the rest is sure to be at least min_tail tall
+            while self._carry.height >= self.page_height + self.min_tail:
+                self._cut()
+
+    def close(self) -> list:
+        while (
+            self._carry is not None
+            and self._carry.height >= self.page_height + self.min_tail
+        ):
+            self._cut()
+        if self._carry is not None and self._carry.height:
+            self._emit(self._carry)
+        self._carry = None
+        return self.pages
+
+    def _append(self, tile):
+        from PIL import Image
+
+        if self._carry is None:
+            self._carry = tile
+            return
+        joined = Image.new(self.mode, (self.width, self._carry.height + tile.height))
+        joined.paste(self._carry, (0, 0))
+        joined.paste(tile, (0, self._carry.height))
+        self._carry = joined
+
+    def _cut(self):
+        carry = self._carry
+        lo = self.page_height // 2
+        hi = min(carry.height, self.page_height)
+        window = carry.crop((0, lo, self.width, hi))
+        flat = flat_rows(window)
+
+        cut = hi
+        end = len(flat) - 1
+        while end >= 0 and not flat[end]:
+            end -= 1
+        if end >= 0:
+            start = end
+            while start > 0 and flat[start - 1]:
+                start -= 1
+            cut = lo + (start + end + 1) // 2
+
+        self._emit(carry.crop((0, 0, self.width, cut)))
+        self._carry = carry.crop((0, cut, self.width, carry.height))
+
+    def _emit(self, page):
+        # Every row being flat isn't enough, a vertical gradient is that too
+        if is_blank(page):
+            self.dropped += 1
+            return
+        self.dest_dir.mkdir(parents=True, exist_ok=True)
+        dest = self.dest_dir / f"{len(self.pages) + 1:03d}.jpg"
+        tmp = dest.with_name(dest.name + ".part")
+        page.save(tmp, format="JPEG", quality=self.quality, optimize=True)
+        os.replace(tmp, dest)
+        self.pages.append(dest)
+
+
+def stitch_pages(
+    pages: list,
+    dest_dir,
+    width: int,
+    page_height: int,
+    grayscale: bool = False,
+    quality: int = 90,
+) -> StripStitcher:
+    stitcher = StripStitcher(dest_dir, width, page_height, grayscale, quality)
+    for p in pages:
+        stitcher.feed(p)
+    stitcher.close()
+    return stitcher
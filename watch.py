@@ -0,0 +1,253 @@
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import urlparse
+
+from cancel import Cancelled
+from series import find_chapters
+
+# Subscriptions: series pages that get re-checked on a schedule, with only
+# the chapters that weren't there last time going into the job queue.
+#
+# A check costs as little as the site allows: a conditional GET first (a 304
+# ends it right there), then a plain parse of the HTML. The series page is
+# only rendered in a browser when the plain HTML has no chapter list at all,
+# and the chapter list is hashed so an unchanged list is spotted without
+# diffing anything.
+
+WATCH_DB = Path.home() / ".cache" / "comic-downloader" / "watch.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS series (
+    url TEXT PRIMARY KEY,
+    output_dir TEXT NOT NULL,
+    settings TEXT NOT NULL,
+    interval REAL NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    list_hash TEXT,
+    chapters INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    added REAL NOT NULL,
+    last_checked REAL,
+    next_check REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS seen (
+    series TEXT NOT NULL,
+    url TEXT NOT NULL,
+    number REAL,
+    first_seen REAL NOT NULL,
+    PRIMARY KEY (series, url)
+);
+"""
+
+DEFAULT_INTERVAL = 6 * 3600
+
+
+def list_hash(chapters: list) -> str:
+    return hashlib.sha1("\n".join(c.url for c in chapters).encode("utf-8")).hexdigest()
+
+
+class WatchList:
+    """SQLite store of subscribed series and every chapter seen on them."""
+
+    def __init__(self, db_path):
+        import sqlite3
+
+        self.db_path = Path(db_path).expanduser()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.executescript(_SCHEMA)
+
+    def add(
+        self,
+        url: str,
+        output_dir: str,
+        settings: dict,
+        interval: float = DEFAULT_INTERVAL,
+    ) -> bool:
+        """Subscribes to url (due right away). False if it already was."""
+        with self._lock, self._db:
+            cur = self._db.execute(
+                "INSERT OR IGNORE INTO series"
+                " (url, output_dir, settings, interval, added, next_check)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (url, str(output_dir), json.dumps(settings), interval, time.time(), 0),
+            )
+        return cur.rowcount > 0
+
+    def remove(self, url: str) -> bool:
+        with self._lock, self._db:
+            cur = self._db.execute("DELETE FROM series WHERE url = ?", (url,))
+            self._db.execute("DELETE FROM seen WHERE series = ?", (url,))
+        return cur.rowcount > 0
+
+    def series(self, due_only: bool = False) -> list:
+        query = "SELECT * FROM series"
+        args = ()
+        if due_only:
+            query += " WHERE next_check <= ?"
+            args = (time.time(),)
+        with self._lock:
+            rows = self._db.execute(query + " ORDER BY next_check", args).fetchall()
+        subs = []
+        for row in rows:
+            sub = dict(row)
+            sub["settings"] = json.loads(sub["settings"])
+            subs.append(sub)
+        return subs
+
+    def next_due(self):
+        with self._lock:
+            (due,) = self._db.execute("SELECT MIN(next_check) FROM series").fetchone()
+        return due
+
+    def seen(self, url: str) -> set:
+        with self._lock:
+            rows = self._db.execute("SELECT url FROM seen WHERE series = ?", (url,))
+            return {r[0] for r in rows}
+
+    def mark_seen(self, url: str, chapters: list):
+        now = time.time()
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO seen (series, url, number, first_seen)"
+                " VALUES (?, ?, ?, ?)",
+                [(url, c.url, c.number, now) for c in chapters],
+            )
+
+    def update(self, url: str, **fields):
+        names = ", ".join(f"{k} = ?" for k in fields)
+        with self._lock, self._db:
+            self._db.execute(
+                f"UPDATE series SET {names} WHERE url = ?", (*fields.values(), url)
+            )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class Watcher:
+    """
+    Checks due subscriptions and puts their new chapters in a JobQueue.
+    Hosts are polled side by side, but the series on one host are checked
+    one after another with a random gap, and each host starts after a random
+    delay of up to `jitter` seconds so a cron job doesn't hit every site on
+    the same second. Next checks are spread by +-10% of the interval.
+    """
+
+    def __init__(self, watchlist: WatchList, queue, engine, jitter: float = 30.0):
+        self.watchlist = watchlist
+        self.queue = queue
+        self.engine = engine
+        self.jitter = jitter
+        self.host_gap = (2.0, 6.0)
+
+    def poll(self) -> dict:
+        """Checks every due series, returns {series url: [new chapter urls]}."""
+        by_host = defaultdict(list)
+        for sub in self.watchlist.series(due_only=True):
+            by_host[urlparse(sub["url"]).netloc.lower()].append(sub)
+        found = {}
+
+        def run_host(subs):
+            token = self.engine.cancel_token
+            try:
+                token.sleep(random.uniform(0, self.jitter))
+                for n, sub in enumerate(subs):
+                    if n:
+                        token.sleep(random.uniform(*self.host_gap))
+                    found[sub["url"]] = self.check(sub)
+            except Cancelled:
+                pass
+
+        threads = [
+            threading.Thread(target=run_host, args=(subs,), daemon=True)
+            for subs in by_host.values()
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return found
+
+    def check(self, sub: dict) -> list:
+        url = sub["url"]
+        now = time.time()
+        fields = {
+            "last_checked": now,
+            "next_check": now + sub["interval"] * random.uniform(0.9, 1.1),
+            "error": None,
+        }
+        try:
+            headers = {"User-Agent": "Mozilla/5.0"}
+            if sub["etag"]:
+                headers["If-None-Match"] = sub["etag"]
+            if sub["last_modified"]:
+                headers["If-Modified-Since"] = sub["last_modified"]
+            with self.engine._connection():
+                r = self.engine._request("get", url, headers=headers, timeout=25)
+            if r.status_code == 304:
+                self.engine.log_message(f"  {url}: not modified", "info")
+                return []
+            r.raise_for_status()
+            # Only saved once the check went all the way through, a stored
+            # ETag or list hash would hide chapters that never got queued
+            done = {
+                "etag": r.headers.get("ETag"),
+                "last_modified": r.headers.get("Last-Modified"),
+            }
+
+            chapters = find_chapters(r.text, url)
+            if not chapters and sub["settings"].get("use_browser"):
+                # JS-rendered list, only worth a browser once the plain HTML
+                # has changed (otherwise the 304 above would have hit)
+                chapters = self.engine.load_series(url, True)
+            if not chapters:
+                raise ValueError("no chapter list on the page anymore")
+
+            digest = list_hash(chapters)
+            if digest == sub["list_hash"]:
+                fields.update(done)
+                self.engine.log_message(f"  {url}: no new chapters", "info")
+                return []
+            done.update(list_hash=digest, chapters=len(chapters))
+
+            seen = self.watchlist.seen(url)
+            new = [c for c in chapters if c.url not in seen]
+            first_look = sub["list_hash"] is None and not seen
+            if new and not first_look:
+                # Queued before they're marked seen: if this fails they're
+                # still new next time (and the queue skips repeats anyway)
+                self.queue.add([c.url for c in new], sub["output_dir"], sub["settings"])
+            self.watchlist.mark_seen(url, new)
+            fields.update(done)
+            if first_look:
+                # First look: everything already out counts as read
+                self.engine.log_message(
+                    f"  {url}: watching, {len(chapters)} chapters out so far", "ok"
+                )
+                return []
+            if new:
+                self.engine.log_message(
+                    f"  ✓ {url}: {len(new)} new chapter(s) queued", "ok"
+                )
+            return [c.url for c in new]
+        except Cancelled:
+            # Never got checked, stays due
+            fields = None
+            raise
+        except Exception as e:
+            fields["error"] = str(e)[:300]
+            self.engine.log_message(f"  ✗ {url}: {str(e)[:150]}", "error")
+            return []
+        finally:
+            if fields is not None:
+                self.watchlist.update(url, **fields)